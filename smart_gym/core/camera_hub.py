@@ -0,0 +1,203 @@
+from __future__ import annotations
+import os, threading
+from typing import Callable, Dict, Optional
+
+try:
+    import gi
+    gi.require_version("Gst", "1.0")
+    from gi.repository import Gst, GLib
+except Exception:
+    Gst = GLib = None
+
+from . import settings as S
+
+# 카메라 1개 → 디코드 1회 → tee → 분기별 valve
+#   pose : YOLOv8-Pose (풀레이트)
+#   face : RetinaFace (videorate로 속도 제한 가능, 운동 중 저속 재식별용)
+# 분기는 valve로 켜고 끄며, 켜진 분기가 없으면 PAUSED로 내려 스트리밍만 멈춘다
+# (장치는 열린 채 유지 → 페이지 전환 시 open/close, 파이프라인 재구성 없음).
+BRANCHES = ("pose", "face")
+_MAX_RATE = 2147483647
+
+def _build_pipeline(io_mode: int, with_face: bool) -> str:
+    from .hailo_pose_stream import _pose_branch
+    desc = f"""
+v4l2src device={S.CAM} io-mode={io_mode} do-timestamp=true !
+image/jpeg, width={S.SRC_WIDTH}, height={S.SRC_HEIGHT} !
+jpegparse ! avdec_mjpeg !
+videoconvert ! videoscale !
+video/x-raw,format=RGB,width={S.SRC_WIDTH},height={S.SRC_HEIGHT} !
+tee name=cam_tee
+cam_tee. ! valve name=pose_valve drop=true ! queue name=pose_in_q leaky=downstream max-size-buffers=2 max-size-bytes=0 max-size-time=0 !
+{_pose_branch(sink_name="pose_sink")}
+"""
+    if with_face:
+        from .hailo_face_stream import _face_branch
+        desc += f"""
+cam_tee. ! valve name=face_valve drop=true ! queue name=face_in_q leaky=downstream max-size-buffers=1 max-size-bytes=0 max-size-time=0 !
+videorate name=face_rate drop-only=true max-rate={_MAX_RATE} !
+{_face_branch(S.FACE_DET_HEF, S.FACE_POST_SO, S.FACE_POST_FUNC, S.CROPPER_SO, prefix="face_", sink_name="face_sink")}
+"""
+    return desc
+
+class CameraHub:
+    """
+    공유 카메라 프로듀서. HailoPoseStream / HailoFaceStream이 attach()로
+    자기 appsink 콜백을 등록하고 set_enabled()로 분기를 여닫는다.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._pipe = None
+        self._loop: Optional[GLib.MainLoop] = None
+        self._sinks: Dict[str, object] = {}
+        self._valves: Dict[str, object] = {}
+        self._cb: Dict[str, Optional[Callable]] = {b: None for b in BRANCHES}
+        self._enabled: Dict[str, bool] = {b: False for b in BRANCHES}
+        self._playing = False
+
+    @property
+    def running(self) -> bool:
+        return self._pipe is not None
+
+    def has_branch(self, branch: str) -> bool:
+        self.start()
+        return branch in self._sinks
+
+    def start(self) -> None:
+        with self._lock:
+            if self._pipe is not None:
+                return
+            if Gst is None:
+                raise RuntimeError("CameraHub: GStreamer (gi) not available")
+            Gst.init(None)
+            with_face = bool(S.FACE_DET_HEF) and os.path.exists(S.FACE_DET_HEF)
+            pipe = None
+            last_err = None
+            for m in (0, 2):
+                try:
+                    pipe = Gst.parse_launch(_build_pipeline(io_mode=m, with_face=with_face))
+                    break
+                except Exception as e:
+                    last_err = e
+                    pipe = None
+            if pipe is None:
+                raise RuntimeError(f"CameraHub: pipeline build failed: {last_err}")
+
+            for b in BRANCHES:
+                sink = pipe.get_by_name(f"{b}_sink")
+                valve = pipe.get_by_name(f"{b}_valve")
+                if sink is None or valve is None:
+                    continue
+                try:
+                    sink.set_property("max-buffers", 1)
+                    sink.set_property("drop", True)
+                    sink.set_property("emit-signals", True)
+                except Exception:
+                    pass
+                sink.connect("new-sample", self._dispatch, b)
+                self._sinks[b] = sink
+                self._valves[b] = valve
+
+            self._loop = GLib.MainLoop()
+            self._attach_bus_watch(pipe)
+            if pipe.set_state(Gst.State.PAUSED) == Gst.StateChangeReturn.FAILURE:
+                pipe.set_state(Gst.State.NULL)
+                raise RuntimeError("CameraHub: pipeline start failed")
+            self._pipe = pipe
+            self._playing = False
+            threading.Thread(target=self._loop.run, daemon=True).start()
+
+    def attach(self, branch: str, on_sample: Callable) -> None:
+        """on_sample(sink, user_data) — 기존 appsink new-sample 콜백과 동일 시그니처"""
+        self.start()
+        with self._lock:
+            if branch not in self._sinks:
+                raise RuntimeError(f"CameraHub: branch '{branch}' not available")
+            self._cb[branch] = on_sample
+
+    def detach(self, branch: str) -> None:
+        self.set_enabled(branch, False)
+        with self._lock:
+            self._cb[branch] = None
+
+    def set_enabled(self, branch: str, on: bool) -> None:
+        with self._lock:
+            if self._pipe is None or branch not in self._valves:
+                return
+            self._enabled[branch] = bool(on)
+            self._valves[branch].set_property("drop", not on)
+            want = any(self._enabled.values())
+            if want != self._playing:
+                self._pipe.set_state(Gst.State.PLAYING if want else Gst.State.PAUSED)
+                self._playing = want
+
+    def set_rate(self, branch: str, fps: Optional[float]) -> None:
+        """분기 최대 프레임레이트 (None/0 → 제한 없음). 현재 face 분기만 지원."""
+        with self._lock:
+            if self._pipe is None:
+                return
+            rate = self._pipe.get_by_name(f"{branch}_rate")
+            if rate is not None:
+                rate.set_property("max-rate", int(fps) if fps and fps > 0 else _MAX_RATE)
+
+    def stop(self) -> None:
+        """장치 해제 (앱 종료 시)"""
+        with self._lock:
+            if self._pipe is not None:
+                for sink in self._sinks.values():
+                    try: sink.set_property("emit-signals", False)
+                    except Exception: pass
+                self._pipe.set_state(Gst.State.NULL)
+                self._pipe = None
+            self._sinks.clear()
+            self._valves.clear()
+            self._enabled = {b: False for b in BRANCHES}
+            self._playing = False
+            if self._loop is not None:
+                try: self._loop.quit()
+                except Exception: pass
+                self._loop = None
+
+    def _dispatch(self, sink, branch):
+        cb = self._cb.get(branch)
+        if cb is not None and self._enabled.get(branch):
+            try:
+                cb(sink, None)
+            except Exception as e:
+                print(f"[GST][hub] {branch} callback error: {e}", flush=True)
+        else:
+            # 분기가 닫히는 사이 도착한 샘플은 꺼내서 버림
+            sink.emit("pull-sample")
+        # tee 상류로 EOS/에러를 돌려주면 다른 분기까지 멈추므로 항상 OK
+        return Gst.FlowReturn.OK
+
+    def _attach_bus_watch(self, pipe):
+        bus = pipe.get_bus()
+        def on_msg(bus, msg):
+            if msg.type == Gst.MessageType.ERROR:
+                err, _dbg = msg.parse_error()
+                print(f"[GST][hub] ERROR: {err}", flush=True)
+            return True
+        bus.add_signal_watch()
+        bus.connect("message", on_msg)
+
+_hub: Optional[CameraHub] = None
+_hub_lock = threading.Lock()
+
+def get_hub() -> CameraHub:
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = CameraHub()
+        return _hub
+
+def shared_camera() -> bool:
+    """라이브 카메라를 허브로 공유할지 (SHARED_CAMERA=1 이고 Gst 사용 가능)"""
+    return bool(getattr(S, "SHARED_CAMERA", False)) and Gst is not None
+
+def stop_hub() -> None:
+    global _hub
+    with _hub_lock:
+        if _hub is not None:
+            _hub.stop()
+            _hub = None
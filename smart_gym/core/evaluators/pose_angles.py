@@ -1,11 +1,16 @@
 from __future__ import annotations
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 import numpy as np
 import math
 
 __all__ = [
+    "ANGLE_KEYS",
+    "joint_angles_raw",
+    "masked_angles",
     "compute_joint_angles",
+    "compute_joint_angles_batch",
     "update_meta_with_angles",
+    "SMOOTH_KEYS",
 ]
 
 # 내부 유틸
@@ -15,11 +20,144 @@ def _is_finite_number(x) -> bool:
     except Exception:
         return False
 
-def _angle_deg(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> Optional[float]:
+def _idx_map(n_kpts: int):
+    """COCO-17 vs BlazePose-33 자동 대응"""
+    if n_kpts >= 33:  # BlazePose/Mediapipe 계열
+        return dict(LSh=11, RSh=12, LEl=13, REl=14, LWr=15, RWr=16,
+                    LHp=23, RHp=24, LKn=25, RKn=26, LAn=27, RAn=28)
+    else:             # COCO-17 계열
+        return dict(LSh=5,  RSh=6,  LEl=7,  REl=8,  LWr=9,  RWr=10,
+                    LHp=11, RHp=12, LKn=13, RKn=14, LAn=15, RAn=16)
+
+# 각도 테이블 (ANGLE_KEYS 순서). 각 항목은 (A, B, C) 인덱스, B가 꼭짓점
+#   0~7  : Knee/Hip/Shoulder/Elbow (L,R)
+#   8~9  : HipLine(L,R)     허벅지(hip->knee)와 수평의 각(0~90), C 자리는 수평 단위벡터
+#   10~11: TorsoPelvis(L,R) 어깨-엉덩이-반대쪽 엉덩이 (HailoCamAdapter hipline)
+ANGLE_KEYS = (
+    "Knee(L)", "Knee(R)", "Hip(L)", "Hip(R)",
+    "Shoulder(L)", "Shoulder(R)", "Elbow(L)", "Elbow(R)",
+    "HipLine(L)", "HipLine(R)", "TorsoPelvis(L)", "TorsoPelvis(R)",
+)
+_N_STD = 10   # compute_joint_angles 출력 범위 (0~9)
+_THIGH = slice(8, 10)
+
+_TRIPLES = (
+    ("LHp", "LKn", "LAn"), ("RHp", "RKn", "RAn"),
+    ("LSh", "LHp", "LKn"), ("RSh", "RHp", "RKn"),
+    ("LHp", "LSh", "LEl"), ("RHp", "RSh", "REl"),
+    ("LSh", "LEl", "LWr"), ("RSh", "REl", "RWr"),
+    ("LKn", "LHp", "LHp"), ("RKn", "RHp", "RHp"),
+    ("LSh", "LHp", "RHp"), ("RSh", "RHp", "LHp"),
+)
+# HipLine의 v2(=C-B=0)에 더할 수평 단위벡터
+_UNIT_X = np.zeros((len(_TRIPLES), 2))
+_UNIT_X[_THIGH, 0] = 1.0
+
+_TABLES: Dict[bool, np.ndarray] = {}
+
+def _table(n_kpts: int) -> np.ndarray:
+    """(3, 12) 키포인트 인덱스 [A; B; C]"""
+    key = n_kpts >= 33
+    t = _TABLES.get(key)
+    if t is None:
+        i = _idx_map(n_kpts)
+        t = _TABLES[key] = np.array([[i[tr[j]] for tr in _TRIPLES] for j in range(3)], np.intp)
+    return t
+
+def joint_angles_raw(kxy: np.ndarray, kcf: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    벡터화 각도 커널. 모든 관절을 한 번의 gather + 배열 연산으로 계산.
+    입력: kxy (..., K, 2), kcf (..., K)  (앞쪽 배치 차원 허용)
+    출력: (ang, conf) 둘 다 (..., 12) float64, 순서는 ANGLE_KEYS
+      - ang : 도 단위, 길이 0 벡터 / NaN 좌표는 NaN
+      - conf: 각도에 쓰인 키포인트 conf 최솟값
+    K가 테이블보다 짧으면(예: K<17) 없는 키포인트를 쓰는 각도는 ang/conf 모두 NaN.
+    임계값 마스킹은 masked_angles()로 → 같은 결과를 임계값별로 재사용.
+    """
+    kxy = np.asarray(kxy, dtype=np.float64)
+    kcf = np.asarray(kcf, dtype=np.float64)
+    K = kxy.shape[-2]
+    t = _table(K)
+    need = int(t.max()) + 1
+    if K < need:
+        # 잘린 키포인트 세트 → 없는 관절은 NaN으로 채워 그 관절을 쓰는 각도만 NaN (기존 동작과 동일)
+        kxy = np.concatenate([kxy, np.full(kxy.shape[:-2] + (need - K, 2), np.nan)], axis=-2)
+        kcf = np.concatenate([kcf, np.full(kcf.shape[:-1] + (need - K,), np.nan)], axis=-1)
+
+    p = kxy[..., t, :]                      # (..., 3, 12, 2)
+    b = p[..., 1, :, :]
+    v1 = p[..., 0, :, :] - b
+    v2 = p[..., 2, :, :] - b + _UNIT_X
+    dot = v1[..., 0] * v2[..., 0] + v1[..., 1] * v2[..., 1]
+    crs = v1[..., 0] * v2[..., 1] - v1[..., 1] * v2[..., 0]
+    # 허벅지는 수평과의 예각(0~90) → |dot|
+    dot[..., _THIGH] = np.abs(dot[..., _THIGH])
+    ang = np.degrees(np.arctan2(np.abs(crs), dot))
+
+    n1 = v1[..., 0] ** 2 + v1[..., 1] ** 2
+    n2 = v2[..., 0] ** 2 + v2[..., 1] ** 2
+    ang[(n1 < 1e-12) | (n2 < 1e-12)] = np.nan
+
+    conf = kcf[..., t].min(axis=-2)
+    return ang, conf
+
+def masked_angles(raw, conf_thr: float) -> np.ndarray:
+    """joint_angles_raw 결과 → conf 미달/계산 불가는 NaN인 (..., 12)"""
+    ang, conf = raw
+    return np.where((conf >= conf_thr) & np.isfinite(ang), ang, np.nan)
+
+def compute_joint_angles(
+    kxy: np.ndarray,
+    kcf: np.ndarray,
+    conf_thr: float = 0.2
+) -> Dict[str, Optional[float]]:
+    """
+    입력:
+      - kxy: (K,2) float32/64 좌표 (픽셀)
+      - kcf: (K,) 각 키포인트 신뢰도
+    출력:
+      - 표기용 키: "Knee(L)", "Knee(R)", ..., "HipLine(R)"
+        (값 없으면 None; NaN 사용 안 함)
+    """
+    kxy = np.asarray(kxy, dtype=np.float64)
+    kcf = np.asarray(kcf, dtype=np.float64)
+    if kxy.ndim != 2 or kxy.shape[1] != 2 or kcf.ndim != 1:
+        raise ValueError("kxy shape must be (K,2) and kcf shape must be (K,)")
+    return _angles_dict(masked_angles(joint_angles_raw(kxy, kcf), conf_thr))
+
+def compute_joint_angles_batch(
+    kxy: np.ndarray,
+    kcf: np.ndarray,
+    conf_thr: float = 0.2,
+    chunk: int = 4096,
+) -> Dict[str, np.ndarray]:
     """
-    각도 ABC(중심 B) in degrees, 범위 0~180.
-    실패/불가 시 None 반환 (NaN 사용하지 않음).
+    오프라인 분석용 배치 버전 (녹화 세션 재채점, angle_data.json 임계값 스윕 등).
+    입력:
+      - kxy: (T,K,2) 좌표, kcf: (T,K) 신뢰도  (K=17 COCO / 33 BlazePose)
+    출력:
+      - compute_joint_angles와 같은 키 → (T,) float64 배열
+        (값 없으면 None 대신 NaN)
+    프레임 루프 없이 chunk 프레임 단위로 커널 실행 (중간 배열이 캐시에 머무는 크기).
     """
+    kxy = np.asarray(kxy)
+    kcf = np.asarray(kcf)
+    if kxy.ndim != 3 or kxy.shape[2] != 2 or kcf.shape != kxy.shape[:2]:
+        raise ValueError("kxy shape must be (T,K,2) and kcf shape must be (T,K)")
+    T = kxy.shape[0]
+    out = np.empty((T, len(ANGLE_KEYS)), np.float64)
+    for s in range(0, T, max(1, int(chunk))):
+        e = min(T, s + int(chunk))
+        out[s:e] = masked_angles(joint_angles_raw(kxy[s:e], kcf[s:e]), conf_thr)
+    return {k: out[:, j] for j, k in enumerate(ANGLE_KEYS[:_N_STD])}
+
+def _angles_dict(masked: np.ndarray) -> Dict[str, Optional[float]]:
+    vals = masked[:_N_STD].tolist()
+    return {k: (None if v != v else v) for k, v in zip(ANGLE_KEYS, vals)}
+
+# --- 기존 스칼라 구현 (검증/벤치마크용, tools/bench_angles) ---
+def _angle_deg(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> Optional[float]:
+    """각도 ABC(중심 B) in degrees, 범위 0~180. 실패/불가 시 None"""
     try:
         ba = a - b
         bc = c - b
@@ -28,7 +166,6 @@ def _angle_deg(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> Optional[float]:
         if nba < 1e-6 or nbc < 1e-6:
             return None
         cosv = float(np.dot(ba, bc) / (nba * nbc))
-        # 수치오차 방지
         cosv = max(-1.0, min(1.0, cosv))
         ang = math.degrees(math.acos(cosv))
         return ang if math.isfinite(ang) else None
@@ -36,9 +173,7 @@ def _angle_deg(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> Optional[float]:
         return None
 
 def _ok(kxy: np.ndarray, kcf: np.ndarray, idxs, thr: float) -> bool:
-    """
-    좌표는 음수 가능(크롭/오프셋 고려). NaN/Inf 배제 + conf 체크.
-    """
+    """좌표 NaN/Inf 배제 + conf 체크 (인덱스 범위 밖이면 False)"""
     try:
         for i in idxs:
             if not (i < kxy.shape[0] and i < kcf.shape[0]):
@@ -51,19 +186,8 @@ def _ok(kxy: np.ndarray, kcf: np.ndarray, idxs, thr: float) -> bool:
     except Exception:
         return False
 
-def _idx_map(n_kpts: int):
-    """COCO-17 vs BlazePose-33 자동 대응"""
-    if n_kpts >= 33:  # BlazePose/Mediapipe 계열
-        return dict(LSh=11, RSh=12, LEl=13, REl=14, LWr=15, RWr=16,
-                    LHp=23, RHp=24, LKn=25, RKn=26, LAn=27, RAn=28)
-    else:             # COCO-17 계열
-        return dict(LSh=5,  RSh=6,  LEl=7,  REl=8,  LWr=9,  RWr=10,
-                    LHp=11, RHp=12, LKn=13, RKn=14, LAn=15, RAn=16)
-
 def _hip_line_angle(hip: np.ndarray, knee: np.ndarray) -> Optional[float]:
-    """
-    허벅지 벡터(hip->knee)와 수평의 각(0~90). 실패 시 None.
-    """
+    """허벅지 벡터(hip->knee)와 수평의 각(0~90). 실패 시 None"""
     try:
         dx, dy = float(knee[0] - hip[0]), float(knee[1] - hip[1])
         if abs(dx) < 1e-6 and abs(dy) < 1e-6:
@@ -73,50 +197,35 @@ def _hip_line_angle(hip: np.ndarray, knee: np.ndarray) -> Optional[float]:
     except Exception:
         return None
 
-def compute_joint_angles(
+def compute_joint_angles_ref(
     kxy: np.ndarray,
     kcf: np.ndarray,
     conf_thr: float = 0.2
 ) -> Dict[str, Optional[float]]:
-    """
-    입력:
-      - kxy: (K,2) float32/64 좌표 (픽셀)
-      - kcf: (K,) 각 키포인트 신뢰도
-    출력:
-      - 표기용 키: "Knee(L)", "Knee(R)", ..., "HipLine(R)"
-        (값 없으면 None; NaN 사용 안 함)
-    """
+    """벡터화 이전의 관절별 스칼라 구현. compute_joint_angles와 같은 입출력"""
     kxy = np.asarray(kxy, dtype=np.float64)
     kcf = np.asarray(kcf, dtype=np.float64)
     if kxy.ndim != 2 or kxy.shape[1] != 2 or kcf.ndim != 1:
         raise ValueError("kxy shape must be (K,2) and kcf shape must be (K,)")
 
     idx = _idx_map(kxy.shape[0])
-    LSh, RSh, LEl, REl, LWr, RWr, LHp, RHp, LKn, RKn, LAn, RAn = (
-        idx["LSh"], idx["RSh"], idx["LEl"], idx["REl"], idx["LWr"], idx["RWr"],
-        idx["LHp"], idx["RHp"], idx["LKn"], idx["RKn"], idx["LAn"], idx["RAn"]
-    )
-
     ang: Dict[str, Optional[float]] = {}
-
-    # 무릎
-    ang["Knee(L)"] = _angle_deg(kxy[LHp], kxy[LKn], kxy[LAn]) if _ok(kxy, kcf, [LHp, LKn, LAn], conf_thr) else None
-    ang["Knee(R)"] = _angle_deg(kxy[RHp], kxy[RKn], kxy[RAn]) if _ok(kxy, kcf, [RHp, RKn, RAn], conf_thr) else None
-    # 힙
-    ang["Hip(L)"]  = _angle_deg(kxy[LSh], kxy[LHp], kxy[LKn]) if _ok(kxy, kcf, [LSh, LHp, LKn], conf_thr) else None
-    ang["Hip(R)"]  = _angle_deg(kxy[RSh], kxy[RHp], kxy[RKn]) if _ok(kxy, kcf, [RSh, RHp, RKn], conf_thr) else None
-    # 어깨
-    ang["Shoulder(L)"] = _angle_deg(kxy[LHp], kxy[LSh], kxy[LEl]) if _ok(kxy, kcf, [LHp, LSh, LEl], conf_thr) else None
-    ang["Shoulder(R)"] = _angle_deg(kxy[RHp], kxy[RSh], kxy[REl]) if _ok(kxy, kcf, [RHp, RSh, REl], conf_thr) else None
-    # 팔꿈치
-    ang["Elbow(L)"] = _angle_deg(kxy[LSh], kxy[LEl], kxy[LWr]) if _ok(kxy, kcf, [LSh, LEl, LWr], conf_thr) else None
-    ang["Elbow(R)"] = _angle_deg(kxy[RSh], kxy[REl], kxy[RWr]) if _ok(kxy, kcf, [RSh, REl, RWr], conf_thr) else None
-    # 힙라인(허벅지 vs 수평)
-    ang["HipLine(L)"] = _hip_line_angle(kxy[LHp], kxy[LKn]) if _ok(kxy, kcf, [LHp, LKn], conf_thr) else None
-    ang["HipLine(R)"] = _hip_line_angle(kxy[RHp], kxy[RKn]) if _ok(kxy, kcf, [RHp, RKn], conf_thr) else None
-
+    for key, (a, b, c) in zip(ANGLE_KEYS[:8], _TRIPLES[:8]):
+        ia, ib, ic = idx[a], idx[b], idx[c]
+        ang[key] = _angle_deg(kxy[ia], kxy[ib], kxy[ic]) if _ok(kxy, kcf, [ia, ib, ic], conf_thr) else None
+    for key, hp, kn in (("HipLine(L)", idx["LHp"], idx["LKn"]), ("HipLine(R)", idx["RHp"], idx["RKn"])):
+        ang[key] = _hip_line_angle(kxy[hp], kxy[kn]) if _ok(kxy, kcf, [hp, kn], conf_thr) else None
     return ang
 
+# update_meta_with_angles 출력 채널 (표기용 10개 + 좌우 평균 5개) → 필터 벡터 순서
+SMOOTH_KEYS = ANGLE_KEYS[:_N_STD] + ("Knee", "Hip", "Shoulder", "Elbow", "HipLine")
+_SNAKE = (
+    "knee_l_deg", "knee_r_deg", "hip_l_deg", "hip_r_deg",
+    "shoulder_l_deg", "shoulder_r_deg", "elbow_l_deg", "elbow_r_deg",
+    "hipline_l_deg", "hipline_r_deg",
+    "knee_avg_deg", "hip_avg_deg", "shoulder_avg_deg", "elbow_avg_deg", "hipline_avg_deg",
+)
+
 def update_meta_with_angles(
     meta: Dict,
     kxy: np.ndarray,
@@ -124,68 +233,49 @@ def update_meta_with_angles(
     conf_thr: float = 0.2,
     ema: float = 0.0,
     prev: Optional[Dict[str, Optional[float]]] = None,
+    raw=None,
+    filt=None,
 ) -> Dict[str, Optional[float]]:
     """
     compute_joint_angles() 결과를 기반으로:
       1) 좌우 평균 필드("Knee","Hip","Shoulder","Elbow","HipLine") 추가
-      2) EMA 스무딩(선택)
+      2) 스무딩(선택): filt(core.filters 필터, SMOOTH_KEYS 순서 15채널) 또는 prev 기반 EMA
       3) meta에 유효(유한수) 값만 동기화
       4) 스네이크 케이스 메타키도 함께 기록 (knee_l_deg 등)
 
+    raw: 이미 계산된 joint_angles_raw 결과 (예: PoseFrame.angles()) → 재계산 생략
+    filt: 주어지면 ema/prev는 무시 (필터가 이전 상태를 보관)
+
     반환: 각도 dict (표기용 + 평균키), 값 없으면 None
     """
-    ang = compute_joint_angles(kxy, kcf, conf_thr=conf_thr)
+    if raw is None:
+        kxy = np.asarray(kxy, dtype=np.float64)
+        kcf = np.asarray(kcf, dtype=np.float64)
+        if kxy.ndim != 2 or kxy.shape[1] != 2 or kcf.ndim != 1:
+            raise ValueError("kxy shape must be (K,2) and kcf shape must be (K,)")
+        raw = joint_angles_raw(kxy, kcf)
+    lr = masked_angles(raw, conf_thr)[:_N_STD]
 
     # 좌/우 평균(가능한 값만)
-    def _avg_pair(a_key: str, b_key: str) -> Optional[float]:
-        a = ang.get(a_key, None)
-        b = ang.get(b_key, None)
-        if _is_finite_number(a) and _is_finite_number(b):
-            return (float(a) + float(b)) / 2.0
-        if _is_finite_number(a):
-            return float(a)
-        if _is_finite_number(b):
-            return float(b)
-        return None
+    l, r = lr[0::2], lr[1::2]
+    lo, ro = np.isfinite(l), np.isfinite(r)
+    avg = np.where(lo & ro, 0.5 * (l + r), np.where(lo, l, r))
+    vec = np.concatenate([lr, avg])
 
-    ang["Knee"]     = _avg_pair("Knee(L)", "Knee(R)")
-    ang["Hip"]      = _avg_pair("Hip(L)", "Hip(R)")
-    ang["Shoulder"] = _avg_pair("Shoulder(L)", "Shoulder(R)")
-    ang["Elbow"]    = _avg_pair("Elbow(L)", "Elbow(R)")
-    ang["HipLine"]  = _avg_pair("HipLine(L)", "HipLine(R)")
-
-    # EMA 스무딩 (0 < ema < 1)
-    if prev and (0.0 < ema < 1.0):
-        smoothed: Dict[str, Optional[float]] = {}
-        for k, v in ang.items():
-            pv = prev.get(k) if isinstance(prev, dict) else None
-            if not _is_finite_number(v) and not _is_finite_number(pv):
-                smoothed[k] = None
-            elif not _is_finite_number(v) and _is_finite_number(pv):
-                smoothed[k] = float(pv)
-            elif _is_finite_number(v) and not _is_finite_number(pv):
-                smoothed[k] = float(v)
-            else:
-                smoothed[k] = float((1.0 - ema) * float(pv) + ema * float(v))
-        ang = smoothed
-
-    # meta에 동기화: 유효한 값만
-    # 표기용 키 + 스네이크 케이스 키 모두 기록
-    snake_map = {
-        "Knee(L)": "knee_l_deg",       "Knee(R)": "knee_r_deg",
-        "Hip(L)": "hip_l_deg",         "Hip(R)": "hip_r_deg",
-        "Shoulder(L)": "shoulder_l_deg","Shoulder(R)": "shoulder_r_deg",
-        "Elbow(L)": "elbow_l_deg",     "Elbow(R)": "elbow_r_deg",
-        "HipLine(L)": "hipline_l_deg", "HipLine(R)": "hipline_r_deg",
-        "Knee": "knee_avg_deg",        "Hip": "hip_avg_deg",
-        "Shoulder": "shoulder_avg_deg","Elbow": "elbow_avg_deg",
-        "HipLine": "hipline_avg_deg",
-    }
-
-    for k, v in ang.items():
-        if _is_finite_number(v):
-            meta[k] = float(v)
-            if k in snake_map:
-                meta[snake_map[k]] = float(v)
+    # 스무딩
+    if filt is not None:
+        vec = filt(vec)
+    elif prev and (0.0 < ema < 1.0):
+        pv = np.array([prev.get(k) if _is_finite_number(prev.get(k)) else np.nan
+                       for k in SMOOTH_KEYS], np.float64)
+        vo, po = np.isfinite(vec), np.isfinite(pv)
+        vec = np.where(vo & po, (1.0 - ema) * pv + ema * vec, np.where(vo, vec, pv))
 
+    # meta에 동기화: 유효한 값만 (표기용 키 + 스네이크 케이스 키)
+    ang: Dict[str, Optional[float]] = {}
+    for k, sk, v in zip(SMOOTH_KEYS, _SNAKE, vec.tolist()):
+        if v != v:
+            ang[k] = None
+        else:
+            ang[k] = meta[k] = meta[sk] = v
     return ang
@@ -91,9 +91,9 @@ class HailoFaceBackend(FaceBackendBase):
     def ok(self) -> bool:
         return bool(self._ok and (self.stream is not None) and (self._rec is not None))
 
-    def start(self):
+    def start(self, rate: Optional[float] = None):
         if self.stream:
-            self.stream.start()
+            self.stream.start(rate=rate)
 
     def stop(self):
         if self.stream:
@@ -30,9 +30,10 @@ class FaceService:
         self._cache = []
         self._rebuild_cache()
 
-    def start_stream(self):
+    def start_stream(self, rate: Optional[float] = None):
+        """rate: 얼굴 검출 최대 fps (운동 중 저속 재식별용, 공유 카메라 모드)"""
         if self.enabled and self.backend:
-            try: self.backend.start()
+            try: self.backend.start(rate=rate)
             except Exception: pass
 
     def stop_stream(self):
@@ -0,0 +1,152 @@
+from __future__ import annotations
+import inspect, math
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple, Union
+import numpy as np
+
+# 배열 기반 스무딩 필터. 채널(각도/키포인트 좌표/클래스 확률)을 벡터 하나로 묶어
+# 프레임당 1회 호출. NaN은 "이번 프레임 값 없음"으로 취급:
+#   - 입력 NaN, 이전 값 있음 → 이전 출력 유지
+#   - 이전 값 없음        → 입력으로 초기화
+#   - 둘 다 없음          → NaN
+# 파라미터(alpha, min_cutoff, beta ...)는 스칼라 또는 채널별 배열.
+
+Shape = Union[int, Tuple[int, ...]]
+Param = Union[float, np.ndarray]
+
+class ArrayFilter(ABC):
+    def __init__(self, shape: Shape):
+        self.shape: Tuple[int, ...] = (shape,) if isinstance(shape, int) else tuple(shape)
+        self._y: Optional[np.ndarray] = None
+
+    def reset(self) -> None:
+        self._y = None
+
+    @property
+    def value(self) -> Optional[np.ndarray]:
+        return self._y
+
+    def __call__(self, x: np.ndarray, t: Optional[float] = None) -> np.ndarray:
+        """x: shape 배열 (NaN = 값 없음), t: 초 단위 시각 (One-Euro만 사용)"""
+        x = np.asarray(x, dtype=np.float64).reshape(self.shape)
+        if self._y is None:
+            self._y = x.copy()
+            self._first(x, t)
+            return self._y.copy()
+        y = self._step(x, t)
+        ok = np.isfinite(x)
+        self._y = np.where(ok, np.where(np.isfinite(self._y), y, x), self._y)
+        return self._y.copy()
+
+    def _first(self, x: np.ndarray, t: Optional[float]) -> None:
+        pass
+
+    @abstractmethod
+    def _step(self, x: np.ndarray, t: Optional[float]) -> np.ndarray:
+        """이전 출력(self._y)이 유효한 채널에 쓰일 새 값"""
+        ...
+
+class PassThrough(ArrayFilter):
+    """스무딩 없음 (NaN 유지 규칙만 적용)"""
+    def _step(self, x, t):
+        return x
+
+class EMAFilter(ArrayFilter):
+    """y = (1 - alpha) * y + alpha * x"""
+    def __init__(self, shape: Shape, alpha: Param = 0.2):
+        super().__init__(shape)
+        self.alpha = np.broadcast_to(np.asarray(alpha, np.float64), self.shape)
+
+    def _step(self, x, t):
+        return self._y + self.alpha * (x - self._y)
+
+class OneEuroFilter(ArrayFilter):
+    """
+    One-Euro 필터 (Casiez et al., CHI 2012).
+    느릴 때는 min_cutoff로 떨림을 강하게 누르고, 빠를 때는 beta * |속도|만큼
+    컷오프를 올려 지연을 줄인다. t를 주면 실제 프레임 간격, 없으면 1/freq.
+    """
+    def __init__(self, shape: Shape, freq: float = 30.0, min_cutoff: Param = 1.0,
+                 beta: Param = 0.0, d_cutoff: Param = 1.0):
+        super().__init__(shape)
+        self.freq = float(freq)
+        self.min_cutoff = np.broadcast_to(np.asarray(min_cutoff, np.float64), self.shape)
+        self.beta = np.broadcast_to(np.asarray(beta, np.float64), self.shape)
+        self.d_cutoff = np.broadcast_to(np.asarray(d_cutoff, np.float64), self.shape)
+        self._dx = np.zeros(self.shape, np.float64)
+        self._t: Optional[float] = None
+
+    def reset(self) -> None:
+        super().reset()
+        self._dx[...] = 0.0
+        self._t = None
+
+    @staticmethod
+    def _alpha(cutoff: np.ndarray, dt: float) -> np.ndarray:
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def _first(self, x, t):
+        self._t = t
+
+    def _step(self, x, t):
+        dt = 1.0 / self.freq
+        if t is not None and self._t is not None and t > self._t:
+            dt = t - self._t
+        if t is not None:
+            self._t = t
+        dx = (x - self._y) / dt
+        dx_hat = self._dx + self._alpha(self.d_cutoff, dt) * (dx - self._dx)
+        self._dx = np.where(np.isfinite(dx_hat), dx_hat, self._dx)
+        a = self._alpha(self.min_cutoff + self.beta * np.abs(self._dx), dt)
+        return self._y + a * (x - self._y)
+
+class MedianFilter(ArrayFilter):
+    """최근 win 프레임 채널별 중앙값 (NaN 제외). 라벨/확률의 튐 제거용."""
+    def __init__(self, shape: Shape, win: int = 5):
+        super().__init__(shape)
+        self.win = max(1, int(win))
+        self._ring = np.full((self.win,) + self.shape, np.nan)
+        self._n = 0
+
+    def reset(self) -> None:
+        super().reset()
+        self._ring[...] = np.nan
+        self._n = 0
+
+    def _first(self, x, t):
+        self._push(x)
+
+    def _push(self, x: np.ndarray) -> np.ndarray:
+        self._ring[self._n % self.win] = x
+        self._n += 1
+        s = np.sort(self._ring, axis=0)            # NaN은 뒤로
+        c = np.isfinite(self._ring).sum(axis=0)
+        lo = np.maximum((c - 1) // 2, 0)[None]
+        hi = np.maximum(c // 2, 0)[None]
+        med = 0.5 * (np.take_along_axis(s, lo, 0)[0] + np.take_along_axis(s, hi, 0)[0])
+        return np.where(c > 0, med, np.nan)
+
+    def _step(self, x, t):
+        return self._push(x)
+
+FILTERS = {
+    "none": PassThrough,
+    "ema": EMAFilter,
+    "oneeuro": OneEuroFilter,
+    "median": MedianFilter,
+}
+
+def make_filter(kind: str, shape: Shape, **params) -> ArrayFilter:
+    """kind: none | ema | oneeuro | median. 해당 필터가 받지 않는 params는 무시."""
+    cls = FILTERS.get(str(kind or "none").lower())
+    if cls is None:
+        raise ValueError(f"unknown filter: {kind}")
+    names = inspect.signature(cls.__init__).parameters
+    return cls(shape, **{k: v for k, v in params.items() if k in names})
+
+def angle_filter(n: int) -> ArrayFilter:
+    """settings(ANGLE_*) 기준 관절 각도 필터"""
+    from . import settings as S
+    return make_filter(S.ANGLE_FILTER, n, freq=S.SRC_FPS, alpha=S.ANGLE_EMA_ALPHA,
+                       min_cutoff=S.ANGLE_MIN_CUTOFF, beta=S.ANGLE_BETA, win=S.ANGLE_MEDIAN_WIN)
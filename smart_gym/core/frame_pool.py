@@ -0,0 +1,83 @@
+from __future__ import annotations
+import threading
+from typing import List, Optional, Tuple
+import numpy as np
+
+class FrameBuffer:
+    """
+    풀에서 빌려온 프레임 버퍼 (BGR, uint8, (H,W,3)).
+    - retain()/release() 참조 카운트가 0이 되면 풀로 반환
+    - array는 재사용되므로 release 이후에는 접근 금지
+    """
+    __slots__ = ("pool", "array", "frame_id", "_refs")
+
+    def __init__(self, pool: "FramePool", shape: Tuple[int, int, int]):
+        self.pool = pool
+        self.array = np.empty(shape, dtype=np.uint8)
+        self.frame_id = -1
+        self._refs = 0
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.array.shape
+
+    def retain(self) -> "FrameBuffer":
+        with self.pool._lock:
+            self._refs += 1
+        return self
+
+    def release(self) -> None:
+        pool = self.pool
+        with pool._lock:
+            if self._refs <= 0:
+                return
+            self._refs -= 1
+            if self._refs == 0 and self.array.shape == pool.shape:
+                pool._free.append(self)
+
+    def rgb(self) -> np.ndarray:
+        """RGB 복사본 (레거시 호출자용)"""
+        return self.array[:, :, ::-1].copy()
+
+class FramePool:
+    """
+    고정 개수의 프레임 버퍼를 미리 할당해 두고 돌려쓰는 풀.
+    appsink → worker → adapter → canvas 까지 같은 버퍼를 참조로 넘겨
+    프레임 단위 전체 복사를 없앤다. 버퍼가 모두 사용 중이면 acquire()는 None(프레임 드롭).
+    """
+    def __init__(self, shape: Tuple[int, int, int], count: int = 8):
+        self._lock = threading.Lock()
+        self.shape: Tuple[int, int, int] = tuple(shape)
+        self.count = max(2, int(count))
+        self.dropped = 0
+        self._next_id = 0
+        self._free: List[FrameBuffer] = [FrameBuffer(self, self.shape) for _ in range(self.count)]
+
+    def ensure_shape(self, shape: Tuple[int, int, int]) -> None:
+        """해상도가 바뀌면 버퍼 재할당 (사용 중인 버퍼는 release 시 버려짐)"""
+        shape = tuple(shape)
+        with self._lock:
+            if shape == self.shape:
+                return
+            self.shape = shape
+            self._free = [FrameBuffer(self, shape) for _ in range(self.count)]
+
+    def acquire(self) -> Optional[FrameBuffer]:
+        with self._lock:
+            if not self._free:
+                self.dropped += 1
+                return None
+            fb = self._free.pop()
+            fb._refs = 1
+            fb.frame_id = self._next_id
+            self._next_id += 1
+            return fb
+
+    def available(self) -> int:
+        with self._lock:
+            return len(self._free)
+
+def release(fb) -> None:
+    """None/ndarray 허용 release 헬퍼"""
+    if isinstance(fb, FrameBuffer):
+        fb.release()
@@ -1,34 +1,36 @@
 from __future__ import annotations
-import math, threading
-from typing import Any, Dict, List, Optional, Tuple
+import os, threading, time
+from typing import Any, Dict, Optional, Tuple
+from dataclasses import dataclass
 import numpy as np
 
 from . import settings as S
-from .hailo_pose_stream import start_stream, read_latest, stop_stream
-
-# COCO-17 인덱스
-L_SHO, R_SHO = 5, 6
-L_ELB, R_ELB = 7, 8
-L_WRI, R_WRI = 9, 10
-L_HIP, R_HIP = 11, 12
-L_KNE, R_KNE = 13, 14
-L_ANK, R_ANK = 15, 16
-
-def _pt(pts, idx, thr):
-    if idx >= len(pts): return None
-    x, y = int(pts[idx][0]), int(pts[idx][1])
-    c = float(pts[idx][2]) if len(pts[idx]) >= 3 else 1.0
-    return (x, y) if c >= thr else None
-
-def _angle(a, b, c) -> Optional[float]:
-    if a is None or b is None or c is None: return None
-    ax, ay = a; bx, by = b; cx, cy = c
-    v1 = np.array([ax-bx, ay-by], dtype=np.float32)
-    v2 = np.array([cx-bx, cy-by], dtype=np.float32)
-    n1 = np.linalg.norm(v1); n2 = np.linalg.norm(v2)
-    if n1 < 1e-6 or n2 < 1e-6: return None
-    cosv = float(np.clip(np.dot(v1, v2) / (n1*n2), -1.0, 1.0))
-    return float(math.degrees(math.acos(cosv)))
+from .frame_pool import FrameBuffer, release
+from .pose_types import PoseFrame
+from .evaluators.pose_angles import masked_angles
+from .hailo_pose_stream import start_stream, read_latest_packet, stop_stream, pause_stream, resume_stream
+
+# meta 키 ← pose_angles.ANGLE_KEYS 인덱스 (L, R)
+_META_ANGLES = (
+    ("knee", 0), ("hip", 2), ("shoulder", 4), ("elbow", 6), ("hipline", 10),
+)
+
+@dataclass
+class CamSnapshot:
+    frame: Optional[FrameBuffer]          # BGR 풀 버퍼 (retain됨, release 필요)
+    pose: PoseFrame
+    cls: Optional[Dict[str, Any]]
+    meta: Dict[str, Any]
+    size: Tuple[int, int]
+    stamps: Optional[Dict[str, float]] = None
+
+    @property
+    def frame_id(self) -> int:
+        return self.frame.frame_id if self.frame is not None else -1
+
+    def release(self) -> None:
+        fr, self.frame = self.frame, None
+        release(fr)
 
 class HailoCamAdapter:
     def __init__(self, conf_thr: float = 0.65, stride: int = 1,
@@ -36,92 +38,145 @@ class HailoCamAdapter:
         self.conf_thr = conf_thr if conf_thr <= 1.5 else conf_thr/100.0
         self.stride = int(max(1, stride))
         self._lock = threading.Lock()
-        self._frame_rgb: Optional[np.ndarray] = None
-        self._people: List[Dict[str, Any]] = []
+        self._frame: Optional[FrameBuffer] = None
+        self._people: PoseFrame = PoseFrame()
         self._cls: Optional[Dict[str, Any]] = None
         self._size: Tuple[int,int] = (S.SRC_WIDTH, S.SRC_HEIGHT)
+        self._stamps: Optional[Dict[str, float]] = None
         self._running = False
+        self._paused = False
 
         self._tcn_onnx = onnx_path or getattr(S, "TCN_ONNX", None)
         self._tcn_json = json_path or getattr(S, "TCN_JSON", None)
 
+    @staticmethod
+    def _record_path() -> Optional[str]:
+        if not getattr(S, "POSE_REC_DIR", ""):
+            return None
+        return os.path.join(S.POSE_REC_DIR, time.strftime("pose_%Y%m%d_%H%M%S.kplog"))
+
     def start(self):
+        """스트림 시작. pause() 상태면 파이프라인/세션을 재사용해 바로 재개."""
         if self._running: return
+        if self._paused and resume_stream(record_path=self._record_path()):
+            self._paused = False; self._running = True
+            return
         kwargs = dict(conf_thr=self.conf_thr, stride=self.stride)
+        if getattr(S, "POSE_SOURCE", ""):
+            kwargs.update(source=S.POSE_SOURCE, speed=S.POSE_REPLAY_SPEED)
+        rec_path = self._record_path()
+        if rec_path:
+            kwargs.update(record_path=rec_path)
         if self._tcn_onnx and self._tcn_json:
             kwargs.update(onnx_path=self._tcn_onnx, json_path=self._tcn_json)
-        start_stream(**kwargs); self._running = True
+        start_stream(**kwargs); self._running = True; self._paused = False
 
-    def stop(self):
+    def pause(self):
+        """페이지 이탈용. Hailo/ONNX/파이프라인은 유지하고 프레임 처리만 멈춤."""
         if not self._running: return
-        stop_stream(); self._running = False
+        pause_stream(); self._running = False; self._paused = True
+        self._drop_latest()
 
-    def _pull_once(self) -> bool:
-        fr, people, cls, size = read_latest(timeout=0.01)
-        if fr is None: return False
+    def stop(self):
+        """카메라 장치까지 해제 (얼굴 인식 스트림 전환, 앱 종료)"""
+        if not (self._running or self._paused): return
+        stop_stream(); self._running = False; self._paused = False
+        self._drop_latest()
+
+    def yield_camera(self):
+        """얼굴 스트림으로 전환할 때 호출. 공유 카메라면 일시정지만, 아니면 장치까지 해제."""
+        if getattr(S, "SHARED_CAMERA", False):
+            self.pause()
+        else:
+            self.stop()
+
+    def _drop_latest(self):
         with self._lock:
-            self._frame_rgb = fr
-            self._people = people
+            release(self._frame)
+            self._frame = None
+            self._people = PoseFrame()
+            self._cls = None
+
+    def _pull_once(self, timeout: float = 0.01) -> bool:
+        pkt = read_latest_packet(timeout=timeout)
+        if pkt is None: return False
+        fr, people, cls = pkt["frame"], pkt["people"], pkt["cls"]
+        if fr is None and not people and cls is None:
+            return False
+        with self._lock:
+            old, self._frame = self._frame, fr
+            self._people = people if isinstance(people, PoseFrame) else PoseFrame.of(people)
             self._cls = cls
-            self._size = size
+            self._size = pkt["size"]
+            self._stamps = pkt["t"]
+        release(old)
         return True
 
+    def stamps(self) -> Optional[Dict[str, float]]:
+        """현재 프레임의 단계별 시각 (core.latency 참고)"""
+        with self._lock:
+            return self._stamps
+
     def frame(self) -> Optional[np.ndarray]:
+        """RGB 복사본 (레거시). 무복사 경로는 frame_ref() 사용."""
         self._pull_once()
         with self._lock:
-            return None if self._frame_rgb is None else self._frame_rgb.copy()
+            return None if self._frame is None else self._frame.rgb()
 
-    def people(self) -> List[Dict[str, Any]]:
+    def frame_ref(self) -> Optional[FrameBuffer]:
+        """
+        최신 BGR 프레임 버퍼를 복사 없이 반환 (참조 1 증가).
+        호출자는 사용 후 release() 해야 한다.
+        """
         self._pull_once()
         with self._lock:
-            return list(self._people)
+            return None if self._frame is None else self._frame.retain()
+
+    def people(self) -> PoseFrame:
+        """최신 PoseFrame (list[dict]처럼도 사용 가능). 공유 객체이므로 수정 금지."""
+        self._pull_once()
+        with self._lock:
+            return self._people
+
+    pose = people
+
+    def snapshot(self, block: bool = False, timeout: float = 0.01) -> CamSnapshot:
+        """
+        프레임/포즈/분류/meta를 같은 프레임 기준으로 한 번에 반환 (큐 폴링 1회, 락 1회).
+        block=False면 새 결과를 기다리지 않고 현재 최신 상태를 돌려준다.
+        block=True면 새 결과를 최대 timeout초 기다린다 (전용 스레드용).
+        snapshot.frame은 retain된 버퍼 → 사용 후 snapshot.release()
+        """
+        self._pull_once(timeout=timeout if block else 0.0)
+        with self._lock:
+            fr = None if self._frame is None else self._frame.retain()
+            return CamSnapshot(frame=fr, pose=self._people, cls=self._cls, meta=self._meta_locked(),
+                               size=self._size, stamps=self._stamps)
 
     def meta(self) -> Dict[str, Any]:
         self._pull_once()
         with self._lock:
-            ok = bool(self._people)
-            w, h = self._size
-            label = self._cls.get("label") if isinstance(self._cls, dict) else None
-            score = float(self._cls.get("score")) if isinstance(self._cls, dict) and "score" in self._cls else None
-
-            knees = (None, None)
-            shoulders = (None, None)
-            elbows = (None, None)
-            hips = (None, None)
-            hiplines = (None, None)
-
-            if self._people:
-                p = self._people[0]
-                pts = p.get("kpt", [])
-
-                l_knee = _angle(_pt(pts, L_HIP, self.conf_thr), _pt(pts, L_KNE, self.conf_thr), _pt(pts, L_ANK, self.conf_thr))
-                r_knee = _angle(_pt(pts, R_HIP, self.conf_thr), _pt(pts, R_KNE, self.conf_thr), _pt(pts, R_ANK, self.conf_thr))
-                knees = (l_knee, r_knee)
-
-                l_sho = _angle(_pt(pts, L_HIP, self.conf_thr), _pt(pts, L_SHO, self.conf_thr), _pt(pts, L_ELB, self.conf_thr))
-                r_sho = _angle(_pt(pts, R_HIP, self.conf_thr), _pt(pts, R_SHO, self.conf_thr), _pt(pts, R_ELB, self.conf_thr))
-                shoulders = (l_sho, r_sho)
-
-                l_elb = _angle(_pt(pts, L_SHO, self.conf_thr), _pt(pts, L_ELB, self.conf_thr), _pt(pts, L_WRI, self.conf_thr))
-                r_elb = _angle(_pt(pts, R_SHO, self.conf_thr), _pt(pts, R_ELB, self.conf_thr), _pt(pts, R_WRI, self.conf_thr))
-                elbows = (l_elb, r_elb)
-
-                l_hip = _angle(_pt(pts, L_SHO, self.conf_thr), _pt(pts, L_HIP, self.conf_thr), _pt(pts, L_KNE, self.conf_thr))
-                r_hip = _angle(_pt(pts, R_SHO, self.conf_thr), _pt(pts, R_HIP, self.conf_thr), _pt(pts, R_KNE, self.conf_thr))
-                hips = (l_hip, r_hip)
-
-                l_hl = _angle(_pt(pts, L_SHO, self.conf_thr), _pt(pts, L_HIP, self.conf_thr), _pt(pts, R_HIP, self.conf_thr))
-                r_hl = _angle(_pt(pts, R_SHO, self.conf_thr), _pt(pts, R_HIP, self.conf_thr), _pt(pts, L_HIP, self.conf_thr))
-                hiplines = (l_hl, r_hl)
-
-            return {
-                "ok": ok,
-                "src_w": w, "src_h": h,
-                "label": label,
-                "score": score,
-                "knee_l_deg": knees[0], "knee_r_deg": knees[1],
-                "shoulder_l_deg": shoulders[0], "shoulder_r_deg": shoulders[1],
-                "elbow_l_deg": elbows[0], "elbow_r_deg": elbows[1],
-                "hip_l_deg": hips[0], "hip_r_deg": hips[1],
-                "hipline_l_deg": hiplines[0], "hipline_r_deg": hiplines[1],
-            }
+            return self._meta_locked()
+
+    def _meta_locked(self) -> Dict[str, Any]:
+        """lock 보유 상태에서 호출"""
+        ok = bool(self._people)
+        w, h = self._size
+        # 평가기 전환용 라벨은 LabelSmoother 안정 라벨 (없으면 원본)
+        label = (self._cls.get("label_smooth") or self._cls.get("label")) if isinstance(self._cls, dict) else None
+        score = float(self._cls.get("score")) if isinstance(self._cls, dict) and "score" in self._cls else None
+
+        out = {
+            "ok": ok,
+            "src_w": w, "src_h": h,
+            "label": label,
+            "score": score,
+        }
+        vals = [None] * 12
+        if self._people:
+            # 프레임당 1회 계산된 각도를 공유 (임계값 마스킹만 여기서)
+            vals = [None if v != v else v for v in masked_angles(self._people.angles(self._people.target), self.conf_thr).tolist()]
+        for name, j in _META_ANGLES:
+            out[f"{name}_l_deg"] = vals[j]
+            out[f"{name}_r_deg"] = vals[j + 1]
+        return out
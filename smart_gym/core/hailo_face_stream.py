@@ -7,9 +7,26 @@ gi.require_version("Gst", "1.0")
 from gi.repository import Gst, GLib
 
 from . import settings as S
+from .camera_hub import get_hub, shared_camera
+from .pose_types import RoiDecoder
 
 os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
 
+def _face_branch(hef_path: str, post_so: str, post_func: str, cropper_so: str,
+                 prefix: str = "", sink_name: str = "data_sink") -> str:
+    """RGB 프레임 입력 이후의 얼굴 검출 분기 (CameraHub tee 분기로도 사용)"""
+    return f"""hailocropper name={prefix}crop so-path={cropper_so} function-name=create_crops use-letterbox=true resize-method=inter-area internal-offset=true
+hailoaggregator name={prefix}agg
+{prefix}crop. ! queue max-size-buffers=5 max-size-bytes=0 max-size-time=0 ! {prefix}agg.sink_0
+{prefix}crop. ! queue max-size-buffers=5 max-size-bytes=0 max-size-time=0 !
+hailonet name={prefix}det hef-path={hef_path} batch-size=2 vdevice-group-id=1 force-writable=true !
+queue max-size-buffers=5 max-size-bytes=0 !
+hailofilter name={prefix}post so-path={post_so} function-name={post_func} qos=false !
+queue max-size-buffers=5 max-size-bytes=0 ! {prefix}agg.sink_1
+{prefix}agg. ! queue max-size-buffers=5 max-size-bytes=0 !
+videoconvert ! video/x-raw,format=BGR !
+appsink name={sink_name} caps=video/x-raw,format=BGR emit-signals=true sync=false max-buffers=2 drop=true"""
+
 def _build_pipeline(cam: str, src_w: int, src_h: int, hef_path: str, post_so: str, post_func: str, cropper_so: str, io_mode: int = 2) -> str:
     return f"""
 v4l2src device={cam} io-mode={io_mode} do-timestamp=true !
@@ -17,54 +34,9 @@ image/jpeg, width={src_w}, height={src_h} !
 jpegparse ! avdec_mjpeg !
 videoconvert ! videoscale !
 video/x-raw,format=RGB,width={src_w},height={src_h} !
-hailocropper name=crop so-path={cropper_so} function-name=create_crops use-letterbox=true resize-method=inter-area internal-offset=true
-hailoaggregator name=agg
-crop. ! queue max-size-buffers=5 max-size-bytes=0 max-size-time=0 ! agg.sink_0
-crop. ! queue max-size-buffers=5 max-size-bytes=0 max-size-time=0 !
-hailonet name=det hef-path={hef_path} batch-size=2 vdevice-group-id=1 force-writable=true !
-queue max-size-buffers=5 max-size-bytes=0 !
-hailofilter name=post so-path={post_so} function-name={post_func} qos=false !
-queue max-size-buffers=5 max-size-bytes=0 ! agg.sink_1
-agg. ! queue max-size-buffers=5 max-size-bytes=0 !
-videoconvert ! video/x-raw,format=BGR !
-appsink name=data_sink caps=video/x-raw,format=BGR emit-signals=true sync=false max-buffers=2 drop=true
+{_face_branch(hef_path, post_so, post_func, cropper_so)}
 """
 
-def _get_faces_from_buf(buf, w, h) -> List[Dict[str, Any]]:
-    faces: List[Dict[str, Any]] = []
-    try:
-        import hailo
-        roi = hailo.get_roi_from_buffer(buf)
-        if not roi:
-            return faces
-        dets = roi.get_objects_typed(hailo.HAILO_DETECTION)
-        for d in dets:
-            b = d.get_bbox()
-            xmin, ymin = float(b.xmin()), float(b.ymin())
-            bw, bh    = float(b.width()), float(b.height())
-
-            k5 = None
-            lms = d.get_objects_typed(hailo.HAILO_LANDMARKS)
-            if lms:
-                pts = []
-                for p in lms[0].get_points():
-                    px = int((p.x()*bw + xmin) * w)
-                    py = int((p.y()*bh + ymin) * h)
-                    pts.append((px, py))
-                if len(pts) >= 5:
-                    k5 = pts[:5]
-
-            faces.append({
-                "bbox": [int(xmin*w), int(ymin*h), int((xmin+bw)*w), int((ymin+bh)*h)],
-                "kpt5": k5
-            })
-    except Exception:
-        pass
-    return faces
-
-def _bbox_area(b):
-    return max(0, b[2]-b[0]) * max(0, b[3]-b[1])
-
 class HailoFaceStream:
     def __init__(self,
                  hef_path: str,
@@ -85,14 +57,34 @@ class HailoFaceStream:
         self._appsink = None
         self._stop = threading.Event()
         self._running = False
+        self._hub = None
+        self._decoder = RoiDecoder()
+        self.rate: Optional[float] = None
 
         self._out_q: "queue.Queue[Tuple[Optional[np.ndarray], List[Dict[str,Any]], Tuple[int,int]]]" = queue.Queue(maxsize=1)
 
-    def start(self):
+    def start(self, rate: Optional[float] = None):
+        """rate: 최대 처리 fps (None → 카메라 속도). 공유 카메라 모드에서만 적용."""
+        self.rate = rate
         if self._running:
+            if self._hub is not None:
+                self._hub.set_rate("face", rate)
             return
         self._stop.clear()
 
+        if shared_camera():
+            try:
+                hub = get_hub()
+                if hub.has_branch("face"):
+                    hub.attach("face", self._on_new_sample)
+                    hub.set_rate("face", rate)
+                    hub.set_enabled("face", True)
+                    self._hub = hub
+                    self._running = True
+                    return
+            except Exception as e:
+                print(f"[face] shared camera unavailable, using own pipeline: {e}", flush=True)
+
         Gst.init(None)
         last_err = None
         self._pipe = None
@@ -147,6 +139,9 @@ class HailoFaceStream:
         if not self._running:
             return
         self._stop.set()
+        if self._hub is not None:
+            self._hub.detach("face")
+            self._hub = None
         try:
             if self._appsink is not None:
                 self._appsink.set_property("emit-signals", False)
@@ -207,10 +202,9 @@ class HailoFaceStream:
         except Exception:
             pass
 
-        faces = _get_faces_from_buf(buf, w, h)
-        if faces:
-            faces.sort(key=lambda f: _bbox_area(f.get("bbox", [0,0,0,0])), reverse=True)
-            faces = [faces[0]]
+        dets = self._decoder.faces(buf, w, h)
+        big = dets.largest()
+        faces = [dets[big]] if big >= 0 else []
 
         bgr = None
         ok, mi = buf.map(Gst.MapFlags.READ)
@@ -1,25 +1,40 @@
 from __future__ import annotations
-import os, threading, queue
-from typing import Any, Dict, List, Optional, Tuple
+import os, time, threading, queue
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import numpy as np
-import gi
-gi.require_version("Gst", "1.0")
-from gi.repository import Gst, GLib
+try:
+    import gi
+    gi.require_version("Gst", "1.0")
+    from gi.repository import Gst, GLib
+except Exception:   # Gst 없는 환경(노트북 등)에서는 키포인트 리플레이만 가능
+    Gst = GLib = None
 
 from . import settings as S
+from .camera_hub import get_hub, shared_camera
+from .frame_pool import FramePool, release
+from .latency import STATS, now
+from .pose_recorder import PoseRecorder
+from .pose_types import People, PoseFrame, RoiDecoder
+from .pose_replay import open_source
+from .infer_scheduler import default_threads, release_shared, shared_scheduler
+from .label_smoother import LabelSmoother
 from .tcn_classifier import TCNOnnxClassifier
+from .tracker import PoseTracker
 
 os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
 
-def _build_pipeline(io_mode: int = 2) -> str:
-    return f"""
-v4l2src device={S.CAM} io-mode={io_mode} do-timestamp=true !
+def _source_head(io_mode: int, video: Optional[str]) -> str:
+    if video:
+        # 녹화 영상 리플레이 (Hailo 추론은 동일하게 수행)
+        return f"filesrc location={video} ! decodebin !"
+    return f"""v4l2src device={S.CAM} io-mode={io_mode} do-timestamp=true !
 image/jpeg, width={S.SRC_WIDTH}, height={S.SRC_HEIGHT} !
-jpegparse ! avdec_mjpeg !
-videoconvert ! videoscale !
-video/x-raw,format=RGB,width={S.SRC_WIDTH},height={S.SRC_HEIGHT} !
-queue name=inference_wrapper_input_q leaky=no max-size-buffers=5 max-size-bytes=0 max-size-time=0 !
+jpegparse ! avdec_mjpeg !"""
+
+def _pose_branch(sink_name: str = "data_sink", sync: bool = False) -> str:
+    """RGB 프레임 입력 이후의 포즈 추론 분기 (CameraHub tee 분기로도 사용)"""
+    return f"""queue name=inference_wrapper_input_q leaky=no max-size-buffers=5 max-size-bytes=0 max-size-time=0 !
 hailocropper name=crop so-path={S.CROPPER_SO} function-name=create_crops use-letterbox=true resize-method=inter-area internal-offset=true
 hailoaggregator name=agg
 crop. ! queue name=bypass_q leaky=no max-size-buffers=20 max-size-bytes=0 max-size-time=0 ! agg.sink_0
@@ -32,58 +47,21 @@ queue name=inf_out_q leaky=no max-size-buffers=5 max-size-bytes=0 ! agg.sink_1
 agg. ! queue leaky=no max-size-buffers=5 max-size-bytes=0 !
 videoconvert n-threads=2 qos=false !
 video/x-raw,format=BGR !
-appsink name=data_sink caps=video/x-raw,format=BGR emit-signals=true sync=false max-buffers=2 drop=true
+appsink name={sink_name} caps=video/x-raw,format=BGR emit-signals=true sync={str(sync).lower()} max-buffers=2 drop=true"""
+
+def _build_pipeline(io_mode: int = 2, video: Optional[str] = None, sync: bool = False) -> str:
+    return f"""
+{_source_head(io_mode, video)}
+videoconvert ! videoscale !
+video/x-raw,format=RGB,width={S.SRC_WIDTH},height={S.SRC_HEIGHT} !
+{_pose_branch(sync=sync)}
 """
 
-def _f(obj, name):
-    attr = getattr(obj, name, None)
-    return float(attr() if callable(attr) else attr)
-
-def _maybe(obj, name):
-    a = getattr(obj, name, None)
-    if a is None: return None
-    try: return a() if callable(a) else a
-    except Exception: return None
-
-def extract_people_from_buf(buf, w, h) -> List[Dict[str, Any]]:
-    people: List[Dict[str, Any]] = []
-    try:
-        import hailo
-        roi = hailo.get_roi_from_buffer(buf)
-        if not roi: return people
-        dets = roi.get_objects_typed(hailo.HAILO_DETECTION)
-        for d in dets:
-            lms = d.get_objects_typed(hailo.HAILO_LANDMARKS)
-            if not lms: continue
-            b = d.get_bbox()
-            xmin, ymin, bw, bh = _f(b,"xmin"), _f(b,"ymin"), _f(b,"width"), _f(b,"height")
-            pts = []
-            for p in lms[0].get_points():
-                px = int((p.x()*bw + xmin) * w)
-                py = int((p.y()*bh + ymin) * h)
-                c = _maybe(p, "confidence") or _maybe(p, "score") or _maybe(p, "visibility") or 0.5
-                pts.append((px, py, float(c)))
-            people.append({
-                "bbox": [int(xmin*w), int(ymin*h), int((xmin+bw)*w), int((ymin+bh)*h)],
-                "kpt": pts
-            })
-    except Exception:
-        pass
-    return people
-
-def _conf_mean(person: Dict[str, Any]) -> float:
-    k = person.get("kpt", [])
-    vals = [float(pt[2]) for pt in k if len(pt) >= 3]
-    return float(np.mean(vals)) if vals else 0.0
-
-def _bbox_area(b):
-    return max(0, b[2]-b[0]) * max(0, b[3]-b[1])
-
-def _select_best(people: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
-    if not people: return None
-    scored = [ (_conf_mean(p), _bbox_area(p.get("bbox",[0,0,0,0])), i, p) for i,p in enumerate(people) ]
-    scored.sort(key=lambda x: (x[0], x[1]), reverse=True)
-    return scored[0][3]
+def extract_people_from_buf(buf, w, h) -> People:
+    """레거시 진입점 (스트림 밖 호출용). 스트림은 자체 RoiDecoder 사용."""
+    return _DECODER.people(buf, w, h)
+
+_DECODER = RoiDecoder()
 
 def _iou(a, b) -> float:
     if not a or not b: return 0.0
@@ -98,26 +76,58 @@ def _iou(a, b) -> float:
     return inter/uni if uni>0 else 0.0
 
 class HailoPoseStream:
-    """Start → read → stop. Returns RGB frame, people, optional TCN result."""
+    """
+    Start → read → stop. Returns BGR FrameBuffer(풀 참조), PoseFrame(people), optional TCN result.
+    read()로 받은 FrameBuffer는 호출자가 release() 해야 풀로 돌아간다.
+
+    source: None이면 라이브 카메라, 경로가 주어지면 리플레이
+      - *.npz : 녹화된 키포인트 패킷 (Hailo/Gst 불필요)
+      - 그 외 : 동영상 파일을 filesrc로 재생해 Hailo 추론
+    speed : 0 이하면 최대 속도(무손실), 1.0이면 실시간
+    on_result(frame, pose, cls, size): 처리된 모든 프레임에 대해 worker 스레드에서 호출 (pose: PoseFrame)
+      (read()는 최신 1개만 유지하므로 벤치마크/정확도 측정은 콜백 사용)
+    record_path: 주어지면 프레임별 선택 인원/TCN 확률을 *.kplog 로 기록 (PoseRecorder)
+    """
     def __init__(self,
                  conf_thr: float = 0.65,
                  stride: int = 1,
                  iou_reset_th: float = 0.30,
                  onnx_path: Optional[str] = None,
-                 json_path: Optional[str] = None):
+                 json_path: Optional[str] = None,
+                 source: Optional[str] = None,
+                 speed: float = 1.0,
+                 on_result: Optional[Callable[..., None]] = None,
+                 record_path: Optional[str] = None):
         self.conf_thr = conf_thr if conf_thr <= 1.5 else conf_thr/100.0
         self.stride = max(1, int(stride))
         self.iou_reset_th = float(iou_reset_th)
 
+        self.source = source or None
+        self.speed = float(speed)
+        self.lossless = self.source is not None and self.speed <= 0
+        self.on_result = on_result
+        self.finished = threading.Event()
+        self._replay = open_source(self.source, self.speed) if self.source else None
+        self.record_path = record_path or None
+        self._rec: Optional[PoseRecorder] = None
+
         self._stop = threading.Event()
+        self._paused = threading.Event()
         self._loop: Optional[GLib.MainLoop] = None
         self._pipe = None
         self._appsink = None
+        self._hub = None
         self._data_q: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=2)
-        self._out_q: "queue.Queue[Tuple[Optional[np.ndarray], List[Dict[str, Any]], Optional[Dict[str, Any]], Tuple[int,int]]]" = queue.Queue(maxsize=1)
+        # (frame, people, cls, size, stamps)
+        self._out_q: "queue.Queue[Tuple[Any, PoseFrame, Optional[Dict[str, Any]], Tuple[int,int], Optional[Dict[str, float]]]]" = queue.Queue(maxsize=1)
         self._frame_i = 0
+        self._decoder = RoiDecoder()
+        self._labels = LabelSmoother.from_settings()   # 단일 인물 경로 전용 (추적 모드는 트랙별 smoother)
+        self._primary = None                           # 추적 모드: 마지막 코칭 대상 트랙
+        self._pool = FramePool((S.SRC_HEIGHT, S.SRC_WIDTH, 3), count=getattr(S, "FRAME_POOL_SIZE", 8))
 
         self._clf: Optional[TCNOnnxClassifier] = None
+        self._tracker: Optional[PoseTracker] = None
         self._prev_bbox = None
         if onnx_path is None:
             onnx_path = getattr(S, "TCN_ONNX", None)
@@ -125,19 +135,72 @@ class HailoPoseStream:
             json_path = getattr(S, "TCN_JSON", None)
         if onnx_path and json_path:
             try:
-                self._clf = TCNOnnxClassifier(onnx_path=onnx_path, json_path=json_path)
+                self._clf = TCNOnnxClassifier(onnx_path=onnx_path, json_path=json_path,
+                                              warmup=False,   # 추적/스케줄러 연결 후 아래에서 1회
+                                              prob_filter=getattr(S, "TCN_PROB_FILTER", "ema"),
+                                              threads=getattr(S, "TCN_THREADS", 0) or default_threads(),
+                                              variant=getattr(S, "TCN_VARIANT", "fp32"))
                 if not self._clf.ok:
                     self._clf = None
+                elif getattr(S, "TCN_SCHED", False):
+                    self._clf.scheduler = shared_scheduler(self._clf.infer, max_batch=S.TCN_MAX_BATCH,
+                                                           deadline_ms=S.TCN_DEADLINE_MS,
+                                                           key=(self._clf.onnx_path, self._clf.variant))
             except Exception:
                 self._clf = None
+        if self._clf is not None and getattr(S, "POSE_TRACKING", False):
+            self._tracker = PoseTracker(max_tracks=getattr(S, "POSE_MAX_TRACKS", 4),
+                                        iou_th=self.iou_reset_th,
+                                        max_misses=getattr(S, "TRACK_MAX_MISSES", 15),
+                                        switch_margin=getattr(S, "TRACK_SWITCH_MARGIN", 0.05),
+                                        make_state=self._clf.new_state)
+        if self._clf is not None and getattr(S, "TCN_WARMUP", False):
+            # warm-up은 1회만. 배치를 만들 일이 있으면(추적/스케줄러) 2행으로 돌려 배치 지원 확인을 겸함
+            batched = self._tracker is not None or self._clf.scheduler is not None
+            self._clf.warmup(batch=2 if batched else 1)
+
+    def _open_recorder(self) -> None:
+        if not self.record_path:
+            return
+        try:
+            classes = self._clf.classes if self._clf is not None else []
+            self._rec = PoseRecorder(self.record_path, classes, (S.SRC_WIDTH, S.SRC_HEIGHT))
+        except Exception as e:
+            print(f"[pose] recorder disabled: {e}", flush=True)
+            self._rec = None
+
+    def _close_recorder(self) -> None:
+        rec, self._rec = self._rec, None
+        if rec is not None:
+            rec.close()
 
     def start(self):
+        self._open_recorder()
+
+        if self._replay is not None:
+            threading.Thread(target=self._replay.run, args=(self._put_packet, self._stop), daemon=True).start()
+            threading.Thread(target=self._worker, daemon=True).start()
+            return
+
+        if self.source is None and shared_camera():
+            try:
+                hub = get_hub()
+                hub.attach("pose", self._on_new_sample)
+                hub.set_enabled("pose", True)
+                self._hub = hub
+                threading.Thread(target=self._worker, daemon=True).start()
+                return
+            except Exception as e:
+                print(f"[pose] shared camera unavailable, using own pipeline: {e}", flush=True)
+
+        if Gst is None:
+            raise RuntimeError("GStreamer (gi) not available; only *.npz keypoint replay is supported")
         Gst.init(None)
         pipe = None
         last_err = None
         for m in (0, 2):
             try:
-                desc = _build_pipeline(io_mode=m)
+                desc = _build_pipeline(io_mode=m, video=self.source, sync=(self.source is not None and not self.lossless))
                 pipe = Gst.parse_launch(desc)
                 break
             except Exception as e:
@@ -153,7 +216,7 @@ class HailoPoseStream:
         self._appsink = sink
         try:
             sink.set_property("max-buffers", 1)
-            sink.set_property("drop", True)
+            sink.set_property("drop", not self.lossless)
             sink.set_property("emit-signals", True)
         except Exception:
             pass
@@ -170,15 +233,113 @@ class HailoPoseStream:
         threading.Thread(target=self._loop.run, daemon=True).start()
         threading.Thread(target=self._worker, daemon=True).start()
 
+    @property
+    def paused(self) -> bool:
+        return self._paused.is_set()
+
+    def pause(self) -> None:
+        """
+        세션 사이 대기. 파이프라인(Hailo vdevice/HEF)과 ONNX 세션은 그대로 두고
+        appsink 신호만 끊은 뒤 READY로 내려 카메라 스트리밍을 멈춘다.
+        공유 카메라(CameraHub)면 pose 분기 valve만 닫는다.
+        """
+        if self._stop.is_set() or self._paused.is_set():
+            return
+        self._paused.set()
+        if self._hub is not None:
+            self._hub.set_enabled("pose", False)
+        try:
+            if self._appsink is not None:
+                self._appsink.set_property("emit-signals", False)
+        except Exception:
+            pass
+        if self._pipe is not None:
+            self._pipe.set_state(Gst.State.READY)
+        self._close_recorder()
+        self._drain()
+
+    def resume(self, record_path: Optional[str] = None) -> None:
+        """pause() 이후 재개. 분류기/라벨 상태는 새 세션 기준으로 초기화."""
+        if self._stop.is_set() or not self._paused.is_set():
+            return
+        if self._clf is not None:
+            self._clf.reset()
+        self._prev_bbox = None
+        if self._tracker is not None:
+            self._tracker.reset()
+        self._primary = None
+        self._labels.reset()
+        self.record_path = record_path or self.record_path
+        self._open_recorder()
+        self._paused.clear()
+        if self._hub is not None:
+            self._hub.set_enabled("pose", True)
+        if self._pipe is not None:
+            try:
+                if self._appsink is not None:
+                    self._appsink.set_property("emit-signals", True)
+            except Exception:
+                pass
+            if self._pipe.set_state(Gst.State.PLAYING) == Gst.StateChangeReturn.FAILURE:
+                raise RuntimeError("pipeline resume failed")
+
     def read(self, timeout: Optional[float] = 0.0):
+        pkt = self.read_packet(timeout)
+        if pkt is None:
+            return None, [], None, (S.SRC_WIDTH, S.SRC_HEIGHT)
+        return pkt["frame"], pkt["people"], pkt["cls"], pkt["size"]
+
+    def read_packet(self, timeout: Optional[float] = 0.0) -> Optional[Dict[str, Any]]:
+        """최신 결과 패킷 {"frame","people","cls","size","t"} (t: 단계별 perf_counter 시각)"""
         try:
-            item = self._out_q.get(timeout=timeout) if (timeout and timeout>0) else self._out_q.get_nowait()
-            return item
+            frame, people, cls, size, t = self._out_q.get(timeout=timeout) if (timeout and timeout>0) else self._out_q.get_nowait()
         except queue.Empty:
-            return None, [], None, (S.SRC_WIDTH, S.SRC_HEIGHT)
+            return None
+        if t is not None:
+            STATS.since("handoff", t.get("out"))
+        return {"frame": frame, "people": people, "cls": cls, "size": size, "t": t}
+
+    def wait_done(self, timeout: Optional[float] = None) -> bool:
+        """리플레이가 끝나고 worker가 마지막 패킷까지 처리하면 True"""
+        return self.finished.wait(timeout)
+
+    def _put_packet(self, pkt: Optional[Dict[str, Any]]) -> bool:
+        """리플레이 입력. 무손실 모드에서는 큐가 빌 때까지 대기, None은 종료 표시."""
+        if pkt is not None and "t" not in pkt:
+            t0 = now()
+            pkt["t"] = {"cb": t0, "q": t0}
+        if pkt is not None and self._paused.is_set():
+            if self._replay is not None:
+                # 리플레이는 일시정지 동안 흘려보내지 않고 대기
+                while self._paused.is_set() and not self._stop.is_set():
+                    self._stop.wait(0.05)
+            else:
+                release(pkt["frame"])
+                return True
+        if pkt is None or self.lossless:
+            while not self._stop.is_set():
+                try:
+                    self._data_q.put(pkt, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        try:
+            self._data_q.put_nowait(pkt)
+        except queue.Full:
+            try:
+                old = self._data_q.get_nowait()
+                if old: release(old["frame"])
+            except queue.Empty: pass
+            try: self._data_q.put_nowait(pkt)
+            except queue.Full: release(pkt["frame"])
+        return True
 
     def stop(self):
         self._stop.set()
+        if self._hub is not None:
+            self._hub.detach("pose")
+            self._hub = None
         try:
             if self._appsink is not None:
                 self._appsink.set_property("emit-signals", False)
@@ -187,50 +348,74 @@ class HailoPoseStream:
         if self._pipe is not None:
             self._pipe.set_state(Gst.State.NULL)
             self._pipe = None
+        self._appsink = None
         if self._loop is not None:
             try: self._loop.quit()
             except Exception: pass
             self._loop = None
+        self._close_recorder()
+        self._drain()
+        sch = self._clf.scheduler if self._clf is not None else None
+        if sch is not None:
+            self._clf.scheduler = None
+            release_shared(sch)   # 다음 스트림은 새 분류기 세션으로 다시 등록
+
+    def _drain(self) -> None:
+        """큐에 남은 패킷/결과의 풀 버퍼 반환"""
         try:
-            while True: self._out_q.get_nowait()
+            while True: release(self._out_q.get_nowait()[0])
         except queue.Empty:
             pass
         try:
-            while True: self._data_q.get_nowait()
+            while True:
+                pkt = self._data_q.get_nowait()
+                if pkt: release(pkt["frame"])
         except queue.Empty:
             pass
 
     def _on_new_sample(self, sink, _ud):
         if self._stop.is_set():
             return Gst.FlowReturn.EOS
+        if self._paused.is_set():
+            return Gst.FlowReturn.OK
+        t0 = now()
         sample = sink.emit("pull-sample")
         if not sample:
             return Gst.FlowReturn.OK
 
         buf = sample.get_buffer()
+        try:
+            # 캡처 타임스탬프(running time) → 현재 파이프라인 시계
+            clk = sink.get_clock()
+            if clk is not None and buf.pts != Gst.CLOCK_TIME_NONE:
+                STATS.add("capture", (clk.get_time() - sink.get_base_time() - buf.pts) / 1e6)
+        except Exception:
+            pass
         caps = sample.get_caps()
         s0 = caps.get_structure(0)
         w  = int(s0.get_value('width'))
         h  = int(s0.get_value('height'))
 
+        # 풀 버퍼로 1회만 복사 (BGR 유지, RGB 변환/추가 복사 없음)
+        self._pool.ensure_shape((h, w, 3))
+        fb = self._pool.acquire()
+        if fb is None:
+            return Gst.FlowReturn.OK
         ok, mi = buf.map(Gst.MapFlags.READ)
         if not ok:
+            fb.release()
             return Gst.FlowReturn.OK
         try:
-            bgr = np.frombuffer(mi.data, np.uint8).reshape((h, w, 3)).copy()
+            np.copyto(fb.array, np.frombuffer(mi.data, np.uint8, count=h*w*3).reshape((h, w, 3)))
         finally:
             buf.unmap(mi)
 
-        rgb = bgr[:, :, ::-1]
-        people = extract_people_from_buf(buf, w, h)
-        pkt = {"size": (w,h), "people": people, "frame": rgb}
-        try:
-            self._data_q.put_nowait(pkt)
-        except queue.Full:
-            try: _ = self._data_q.get_nowait()
-            except queue.Empty: pass
-            try: self._data_q.put_nowait(pkt)
-            except queue.Full: pass
+        people = self._decoder.people(buf, w, h)
+        t1 = now()
+        STATS.add("extract", (t1 - t0) * 1000.0)
+        pkt = {"size": (w,h), "people": people, "frame": fb, "ts": time.time(), "t": {"cb": t0, "q": t1}}
+        if not self._put_packet(pkt):
+            fb.release()
         return Gst.FlowReturn.OK
 
     def _attach_bus_watch(self, loop, pipe):
@@ -242,75 +427,151 @@ class HailoPoseStream:
                 self._stop.set()
                 try: loop.quit()
                 except Exception: pass
+            elif msg.type == Gst.MessageType.EOS:
+                # 영상 리플레이 끝 → worker에 종료 표시
+                threading.Thread(target=self._put_packet, args=(None,), daemon=True).start()
             return True
         bus.add_signal_watch()
         bus.connect("message", on_msg)
 
-    def _push_latest(self, frame_rgb, people, cls_result, size):
+    def _push_latest(self, frame, people, cls_result, size, stamps=None):
         try:
-            while True: self._out_q.get_nowait()
+            while True: release(self._out_q.get_nowait()[0])
         except queue.Empty:
             pass
+        if stamps is not None:
+            stamps["out"] = now()
         try:
-            self._out_q.put_nowait((frame_rgb, people, cls_result, size))
+            self._out_q.put_nowait((frame, people, cls_result, size, stamps))
         except queue.Full:
-            pass
+            release(frame)
+
+    def _classify_tracks(self, pose: PoseFrame, size: Tuple[int, int]):
+        """
+        전원을 트랙별 TCN 상태로 분류 (session.run 1회).
+        pose.sel을 코칭 대상(가장 오래 추적된 트랙)의 검출로 맞추고
+        (대상 결과 또는 None, 이번 프레임 트랙별 결과 목록) 반환.
+        """
+        trk = self._tracker
+        tracks = trk.update(pose)
+        primary = trk.primary()
+        if primary is not None:
+            pose.sel = primary.det
+            self._primary = primary
+        if (self._frame_i % self.stride) != 0:
+            return None, None
+
+        cm = pose.conf_mean()
+        owners = []
+        items = []
+        for t in tracks:
+            if t.det < 0:
+                continue
+            if cm[t.det] < self.conf_thr:
+                t.state.reset()
+                continue
+            owners.append(t)
+            items.append((t.state, pose.kpt[t.det], pose.bbox[t.det]))
+        if not items:
+            return None, None
+
+        t_c = now()
+        preds = self._clf.update_batch(items, size)
+        STATS.since("tcn", t_c)
+
+        out = None
+        summary = []
+        for t, pred in zip(owners, preds):
+            if pred is None:
+                continue
+            pred["conf_mean"] = float(cm[t.det])
+            pred["bbox"] = [int(v) for v in pose.bbox[t.det]]
+            pred["track_id"] = t.id
+            pred["label_smooth"] = t.labels.push(pred["label"])
+            t.result = pred
+            summary.append({"id": t.id, "label": pred["label"], "label_smooth": pred["label_smooth"],
+                            "score": pred["score"], "bbox": pred["bbox"]})
+            if t is primary:
+                out = pred
+        return out, summary or None
 
     def _worker(self):
-        if not hasattr(self, "_label_hist"):
-            self._label_hist = []
-
+        labels = self._labels
         while not self._stop.is_set():
             try:
                 pkt = self._data_q.get(timeout=0.5)
             except queue.Empty:
                 continue
+            if pkt is None:
+                self.finished.set()
+                break
+            if self._paused.is_set():
+                release(pkt["frame"])
+                continue
 
-            frame_rgb = pkt["frame"]
+            stamps = pkt.get("t")
+            t_w = now()
+            if stamps is not None:
+                STATS.add("queue", (t_w - stamps["q"]) * 1000.0)
+            frame = pkt["frame"]
             w, h = pkt["size"]
-            people = pkt["people"]
-            sel = _select_best(people) if people else None
-
+            ts = pkt.get("ts")
+            pose = PoseFrame.of(pkt["people"], frame_id=self._frame_i,
+                                ts=time.time() if ts is None else ts, size=(w, h))
             cls_result = None
-            if self._clf is not None and sel is not None:
-                cmean = _conf_mean(sel)
-                cur_bbox = sel.get("bbox")
+            tracks = None
+            if self._tracker is not None:
+                cls_result, tracks = self._classify_tracks(pose, (w, h))
+            sel = pose.selected
+
+            if self._tracker is None and self._clf is not None and sel is not None:
+                cmean = float(pose.conf_mean()[pose.sel])
+                cur_bbox = pose.bbox[pose.sel].tolist()
                 if cmean >= self.conf_thr:
-                    if self._prev_bbox is not None and cur_bbox is not None:
+                    if self._prev_bbox is not None:
                         if _iou(self._prev_bbox, cur_bbox) < self.iou_reset_th:
                             self._clf.reset()
                     self._prev_bbox = cur_bbox
 
                     # 모델 추론 주기
                     if (self._frame_i % self.stride) == 0:
-                        pred = self._clf.update([sel], (w, h))
+                        t_c = now()
+                        pred = self._clf.update(pose, (w, h))
+                        STATS.since("tcn", t_c)
                         if pred is not None:
-                            cls_result = dict(pred)
+                            cls_result = pred
                             cls_result["conf_mean"] = float(cmean)
-                            cls_result["bbox"] = list(cur_bbox) if cur_bbox is not None else None
+                            cls_result["bbox"] = [int(v) for v in cur_bbox]
                 else:
                     self._clf.reset()
                     self._prev_bbox = None
 
-            
-            if cls_result is not None and "label" in cls_result:
-                self._label_hist.append(cls_result["label"])
-
-                # 최근 8프레임만 유지
-                if len(self._label_hist) > 8:
-                    self._label_hist.pop(0)
-
-                # 다수결 라벨
-                most_common = max(set(self._label_hist), key=self._label_hist.count)
-                cls_result["label_smooth"] = most_common
-
+            # 안정 라벨: 추적 모드는 대상 트랙 자신의 smoother (대상이 바뀌면 새 트랙의 이력 사용,
+            # 다른 사람 프레임이 섞이지 않음), 단일 인물 모드는 스트림 공용 smoother
+            if self._tracker is not None:
+                smoother = self._primary.labels if self._primary is not None else None
+                # _classify_tracks가 대상 결과에 label_smooth를 이미 넣음
             else:
-                # 새 결과가 없을 경우 이전 라벨 유지
-                if hasattr(self, "_label_hist") and self._label_hist:
-                    cls_result = {"label_smooth": self._label_hist[-1]}
+                smoother = labels
+                if cls_result is not None and "label" in cls_result:
+                    cls_result["label_smooth"] = labels.push(cls_result["label"])
+            if (cls_result is None or "label" not in cls_result) and smoother is not None and len(smoother):
+                # 새 결과가 없을 경우 이전 안정 라벨 유지
+                cls_result = smoother.held if not tracks else dict(smoother.held)
+            if tracks:
+                cls_result = cls_result if cls_result is not None else {}
+                cls_result["tracks"] = tracks
+
+            rec = self._rec
+            if rec is not None:
+                rec.write(pose.ts, pose.frame_id, sel, cls_result, len(pose))
 
             self._frame_i += 1
-            self._push_latest(frame_rgb, people, cls_result, (w, h))
+            if self.on_result is not None:
+                try: self.on_result(frame, pose, cls_result, (w, h))
+                except Exception as e: print(f"[pose] on_result error: {e}", flush=True)
+            STATS.since("worker", t_w)
+            self._push_latest(frame, pose, cls_result, (w, h), stamps)
 
 
 _stream_singleton: Optional[HailoPoseStream] = None
@@ -323,11 +584,30 @@ def start_stream(**kwargs) -> HailoPoseStream:
     _stream_singleton.start()
     return _stream_singleton
 
+def read_latest_packet(timeout: Optional[float] = 0.0) -> Optional[Dict[str, Any]]:
+    if _stream_singleton is None:
+        return None
+    return _stream_singleton.read_packet(timeout)
+
 def read_latest(timeout: Optional[float] = 0.0):
     if _stream_singleton is None:
         return (None, [], None, (S.SRC_WIDTH, S.SRC_HEIGHT))
     return _stream_singleton.read(timeout)
 
+def pause_stream() -> bool:
+    """스트림을 유지한 채 일시정지. 실행 중인 스트림이 없으면 False"""
+    if _stream_singleton is None:
+        return False
+    _stream_singleton.pause()
+    return True
+
+def resume_stream(record_path: Optional[str] = None) -> bool:
+    """일시정지된 스트림 재개. 재개할 스트림이 없으면 False → start_stream() 필요"""
+    if _stream_singleton is None or _stream_singleton._stop.is_set():
+        return False
+    _stream_singleton.resume(record_path=record_path)
+    return True
+
 def stop_stream():
     global _stream_singleton
     if _stream_singleton is not None:
@@ -0,0 +1,156 @@
+from __future__ import annotations
+import os, threading, time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+
+# 여러 소스(트랙/카메라/오프라인 리플레이)의 TCN 입력 창을 모아 배치 추론.
+#   - 첫 요청 도착 후 deadline_ms 안에 모인 요청을 최대 max_batch개까지 한 번에 실행
+#   - max_batch가 차면 기다리지 않고 바로 실행
+#   - 실행은 전용 스레드 1개 (ONNX 세션 내부 병렬화는 intra-op 스레드가 담당)
+
+def default_threads(reserve: int = 2) -> int:
+    """
+    onnxruntime intra-op 스레드 수. Pi 5(4코어) 기준 GStreamer 디코드/UI 몫으로
+    reserve개를 남기고 나머지를 추론에 쓴다 (최소 1, 최대 4).
+    """
+    n = os.cpu_count() or 1
+    return max(1, min(4, n - int(reserve)))
+
+class InferScheduler:
+    """
+    run_fn((N,C,T) float32) → (N, ...) 배열 을 배치로 호출하는 스케줄러.
+    submit()은 Future, run()은 여러 행을 제출하고 결과를 기다린다.
+    """
+    def __init__(self, run_fn: Callable[[np.ndarray], Optional[np.ndarray]],
+                 max_batch: int = 8, deadline_ms: float = 8.0):
+        self.run_fn = run_fn
+        self.max_batch = max(1, int(max_batch))
+        self.deadline = max(0.0, float(deadline_ms)) / 1000.0
+        self._q: Deque[Tuple[float, np.ndarray, Future]] = deque()
+        self._cv = threading.Condition()
+        self._stop = False
+        self._buf: Optional[np.ndarray] = None
+        self._thread: Optional[threading.Thread] = None
+        # 통계
+        self.batches = 0
+        self.items = 0
+
+    @property
+    def mean_batch(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop = False
+            self._thread = threading.Thread(target=self._loop, name="infer-sched", daemon=True)
+            self._thread.start()
+
+    def submit(self, window: np.ndarray) -> Future:
+        """window: (C,T) — 결과가 나올 때까지 호출자가 내용을 바꾸지 않아야 한다"""
+        fut: Future = Future()
+        with self._cv:
+            self._ensure_thread()
+            self._q.append((time.perf_counter(), window, fut))
+            self._cv.notify()
+        return fut
+
+    def run(self, x: np.ndarray, timeout: Optional[float] = 1.0) -> Optional[np.ndarray]:
+        """(N,C,T) → (N, ...) 결과. 실패/시간 초과면 None."""
+        futs = [self.submit(x[j]) for j in range(len(x))]
+        try:
+            return np.stack([f.result(timeout=timeout) for f in futs], axis=0)
+        except Exception:
+            return None
+
+    def close(self) -> None:
+        with self._cv:
+            self._stop = True
+            self._cv.notify_all()
+        t = self._thread
+        if t is not None:
+            t.join(timeout=1.0)
+        self._thread = None
+        while self._q:
+            self._q.popleft()[2].cancel()
+
+    def _take(self) -> List[Tuple[float, np.ndarray, Future]]:
+        with self._cv:
+            while not self._q and not self._stop:
+                self._cv.wait()
+            if self._stop:
+                return []
+            due = self._q[0][0] + self.deadline
+            while len(self._q) < self.max_batch and not self._stop:
+                left = due - time.perf_counter()
+                if left <= 0:
+                    break
+                self._cv.wait(left)
+            n = min(len(self._q), self.max_batch)
+            return [self._q.popleft() for _ in range(n)]
+
+    def _loop(self) -> None:
+        while True:
+            reqs = self._take()
+            if not reqs:
+                return
+            n = len(reqs)
+            shape = reqs[0][1].shape
+            if self._buf is None or self._buf.shape[1:] != shape or len(self._buf) < n:
+                self._buf = np.empty((self.max_batch,) + shape, np.float32)
+            x = self._buf[:n]
+            for j, (_t, w, _f) in enumerate(reqs):
+                x[j] = w
+            try:
+                out = self.run_fn(x)
+                if out is None:
+                    raise RuntimeError("inference failed")
+                for j, (_t, _w, f) in enumerate(reqs):
+                    f.set_result(out[j])
+            except Exception as e:
+                for _t, _w, f in reqs:
+                    if not f.done():
+                        f.set_exception(e)
+            self.batches += 1
+            self.items += n
+
+_shared: Dict[Hashable, List] = {}       # key → [InferScheduler, 사용자 수]
+_shared_lock = threading.Lock()
+
+def shared_scheduler(run_fn: Callable[[np.ndarray], Optional[np.ndarray]], max_batch: int = 8,
+                     deadline_ms: float = 8.0, key: Hashable = None) -> InferScheduler:
+    """
+    프로세스 공용 스케줄러. key(예: 모델 경로, variant)가 같은 소스끼리 공유한다.
+    이미 있으면 run_fn을 새로 등록한 것으로 교체 (스트림 재시작 후 새 세션 사용).
+    다 쓰면 release_shared()로 반환 → 마지막 사용자가 반환하면 스레드 종료.
+    """
+    with _shared_lock:
+        ent = _shared.get(key)
+        if ent is None:
+            ent = _shared[key] = [InferScheduler(run_fn, max_batch=max_batch, deadline_ms=deadline_ms), 0]
+        else:
+            ent[0].run_fn = run_fn
+        ent[1] += 1
+        return ent[0]
+
+def release_shared(sch: InferScheduler) -> None:
+    """shared_scheduler()로 받은 스케줄러 반환"""
+    with _shared_lock:
+        for key, ent in list(_shared.items()):
+            if ent[0] is sch:
+                ent[1] -= 1
+                if ent[1] > 0:
+                    return
+                del _shared[key]
+                break
+        else:
+            return
+    sch.close()
+
+def close_shared() -> None:
+    with _shared_lock:
+        ents = list(_shared.values())
+        _shared.clear()
+    for sch, _n in ents:
+        sch.close()
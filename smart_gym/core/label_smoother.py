@@ -0,0 +1,89 @@
+from __future__ import annotations
+from typing import Dict, List, Optional
+
+class LabelSmoother:
+    """
+    프레임별 TCN 라벨 → 안정 라벨 (히스테리시스 포함, 프레임당 O(1)).
+      - 최근 window개 라벨을 링 버퍼 + 라벨별 누적 카운트로 유지 (list.count 없음)
+      - 운동 → 다른 운동 : 후보가 창의 과반을 min_dwell 프레임 연속 유지해야 전환
+      - 운동 → idle     : 창 안의 idle 이 idle_enter 개 이상
+      - idle → 운동     : 창 안의 해당 라벨이 idle_exit 개 이상 (+ min_dwell)
+    평가기 전환(ExerciseFrameWorker)이 단발성 오분류로 흔들리지 않게 하는 용도.
+    """
+    def __init__(self, window: int = 8, min_dwell: int = 3, idle_enter: int = 6,
+                 idle_exit: int = 5, idle_label: str = "idle"):
+        self.window = max(1, int(window))
+        self.min_dwell = max(1, int(min_dwell))
+        self.idle_enter = min(self.window, max(1, int(idle_enter)))
+        self.idle_exit = min(self.window, max(1, int(idle_exit)))
+        self.idle_label = idle_label
+        self._ring: List[Optional[str]] = [None] * self.window
+        self._counts: Dict[str, int] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        self._ring[:] = [None] * self.window
+        self._counts.clear()
+        self._i = 0
+        self._n = 0
+        self._cand: Optional[str] = None
+        self._cand_run = 0
+        self.label: str = self.idle_label
+        self._held = {"label_smooth": self.label}
+
+    @property
+    def held(self) -> Dict[str, str]:
+        """새 분류 결과가 없는 프레임용 결과 dict (라벨이 바뀔 때만 새로 만듦, 읽기 전용)"""
+        return self._held
+
+    def __len__(self) -> int:
+        """창에 들어 있는 라벨 수 (최대 window)"""
+        return self._n
+
+    def count(self, label: str) -> int:
+        return self._counts.get(label, 0)
+
+    def push(self, label: str) -> str:
+        """새 라벨 1개 반영 → 현재 안정 라벨"""
+        counts = self._counts
+        old = self._ring[self._i]
+        if old is not None:
+            c = counts[old] - 1
+            if c:
+                counts[old] = c
+            else:
+                del counts[old]
+        self._ring[self._i] = label
+        self._i = (self._i + 1) % self.window
+        counts[label] = counts.get(label, 0) + 1
+        if self._n < self.window:
+            self._n += 1
+
+        # 창 안 최다 라벨 (클래스 수만큼만 순회, 창 길이와 무관)
+        top = max(counts, key=counts.__getitem__)
+        if top == self.label:
+            self._cand, self._cand_run = None, 0
+            return self.label
+        if top == self._cand:
+            self._cand_run += 1
+        else:
+            self._cand, self._cand_run = top, 1
+
+        n = counts[top]
+        if top == self.idle_label:
+            ok = n >= self.idle_enter
+        elif self.label == self.idle_label:
+            ok = n >= self.idle_exit and self._cand_run >= self.min_dwell
+        else:
+            ok = 2 * n > self._n and self._cand_run >= self.min_dwell
+        if ok:
+            self.label = top
+            self._cand, self._cand_run = None, 0
+            self._held = {"label_smooth": top}
+        return self.label
+
+    @classmethod
+    def from_settings(cls) -> "LabelSmoother":
+        from . import settings as S
+        return cls(window=S.LABEL_WINDOW, min_dwell=S.LABEL_MIN_DWELL,
+                   idle_enter=S.LABEL_IDLE_ENTER, idle_exit=S.LABEL_IDLE_EXIT)
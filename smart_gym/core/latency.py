@@ -0,0 +1,96 @@
+from __future__ import annotations
+import json, threading, time
+from typing import Dict, Optional
+import numpy as np
+
+from . import settings as S
+
+# 포즈 파이프라인 단계별 지연 (ms)
+#   capture : 카메라 타임스탬프(Gst PTS) → appsink 콜백 진입
+#   extract : appsink 콜백 (프레임 복사 + 키포인트 추출)
+#   queue   : 입력 큐 대기 (콜백 → worker)
+#   tcn     : TCN 분류기 update()
+#   worker  : worker 1프레임 처리 전체
+#   handoff : 결과 큐 대기 (worker → HailoCamAdapter._pull_once)
+#   ui      : ExerciseFrameWorker 그리기/각도/평가/스케일
+#   paint   : 워커 신호 → GUI 스레드 표시 (queued 신호 대기 포함)
+#   e2e     : appsink 콜백 진입 → UI 그리기 완료
+STAGES = ("capture", "extract", "queue", "tcn", "worker", "handoff", "ui", "paint", "e2e")
+
+def now() -> float:
+    return time.perf_counter()
+
+class LatencyStats:
+    """단계별 최근 window개 샘플을 링 버퍼로 유지하고 p50/p95/p99를 계산"""
+    def __init__(self, window: int = 2048):
+        self.window = max(16, int(window))
+        self._lock = threading.Lock()
+        self._buf: Dict[str, np.ndarray] = {}
+        self._n: Dict[str, int] = {}
+        self.started = time.time()
+
+    def add(self, stage: str, ms: float) -> None:
+        with self._lock:
+            buf = self._buf.get(stage)
+            if buf is None:
+                buf = self._buf[stage] = np.zeros((self.window,), np.float64)
+                self._n[stage] = 0
+            n = self._n[stage]
+            buf[n % self.window] = ms
+            self._n[stage] = n + 1
+
+    def since(self, stage: str, t0: Optional[float]) -> None:
+        """t0(perf_counter)부터 지금까지를 stage에 기록"""
+        if t0 is not None:
+            self.add(stage, (now() - t0) * 1000.0)
+
+    def percentiles(self, stage: str) -> Optional[Dict[str, float]]:
+        with self._lock:
+            buf = self._buf.get(stage)
+            if buf is None:
+                return None
+            n = self._n[stage]
+            x = buf[:min(n, self.window)].copy()
+        p50, p95, p99 = np.percentile(x, (50, 95, 99))
+        return {"n": n, "mean": float(x.mean()), "p50": float(p50), "p95": float(p95),
+                "p99": float(p99), "max": float(x.max())}
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            stages = [s for s in STAGES if s in self._buf] + [s for s in self._buf if s not in STAGES]
+        return {s: self.percentiles(s) for s in stages}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buf.clear()
+            self._n.clear()
+            self.started = time.time()
+
+    def format(self) -> str:
+        rows = [f"{'stage':<8} {'n':>7} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)"]
+        for s, p in self.summary().items():
+            rows.append(f"{s:<8} {p['n']:>7d} {p['mean']:>8.2f} {p['p50']:>8.2f} {p['p95']:>8.2f} {p['p99']:>8.2f} {p['max']:>8.2f}")
+        return "\n".join(rows)
+
+    def dump(self, path: Optional[str] = None) -> None:
+        """표를 출력하고, path(또는 LATENCY_DUMP)가 있으면 JSON으로 저장"""
+        if not self._buf:
+            return
+        print("[latency]\n" + self.format(), flush=True)
+        path = path or getattr(S, "LATENCY_DUMP", "")
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"started": self.started, "ended": time.time(), "stages": self.summary()}, f, indent=1)
+
+class _NullStats(LatencyStats):
+    """LATENCY_STATS=0 일 때 기록을 모두 무시"""
+    def add(self, stage: str, ms: float) -> None:
+        pass
+
+STATS: LatencyStats = LatencyStats() if getattr(S, "LATENCY_STATS", True) else _NullStats()
+
+def summary() -> Dict[str, Dict[str, float]]:
+    return STATS.summary()
+
+def dump(path: Optional[str] = None) -> None:
+    STATS.dump(path)
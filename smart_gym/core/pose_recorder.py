@@ -0,0 +1,111 @@
+from __future__ import annotations
+import os, struct, threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+from .pose_types import People
+
+# 세션 키포인트 로그 (*.kplog)
+#   [header] magic(4s) version(H) header_len(H) w(H) h(H) n_cls(H) + classes(utf-8, '\n' 구분)
+#   [records] record_dtype(n_cls) 고정 폭 레코드의 연속 (append-only)
+# np.memmap 으로 바로 열어 rec["kpt"], rec["probs"] 처럼 컬럼 단위로 읽는다.
+MAGIC = b"SGKP"
+VERSION = 1
+_HDR = struct.Struct("<4sHHHHH")
+NUM_KPTS = 17
+
+def record_dtype(n_cls: int) -> np.dtype:
+    return np.dtype([
+        ("ts",       "<f8"),
+        ("frame",    "<u4"),
+        ("n_people", "<u1"),
+        ("label",    "<i1"),            # classes 인덱스, 결과 없으면 -1
+        ("kpt",      "<f4", (NUM_KPTS, 3)),
+        ("bbox",     "<f4", (4,)),
+        ("probs",    "<f4", (max(1, n_cls),)),
+    ])
+
+class PoseRecorder:
+    """
+    HailoPoseStream worker에서 프레임마다 선택된 1인의 키포인트/bbox/TCN 확률을 기록.
+    레코드는 미리 할당한 배치 버퍼에 채운 뒤 batch 단위로 파일에 append (프레임당 수 µs).
+    """
+    def __init__(self, path: str, classes: Optional[Sequence[str]], size: Tuple[int, int], batch: int = 64):
+        self.path = path
+        self.classes: List[str] = list(classes or [])
+        self._cls_idx = {c: i for i, c in enumerate(self.classes)}
+        self.dtype = record_dtype(len(self.classes))
+        self._buf = np.zeros((max(1, int(batch)),), dtype=self.dtype)
+        self._n = 0
+        self._lock = threading.Lock()
+        self.count = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        names = "\n".join(self.classes).encode("utf-8")
+        self._fp = open(path, "wb")
+        self._fp.write(_HDR.pack(MAGIC, VERSION, _HDR.size + len(names), int(size[0]), int(size[1]), len(self.classes)))
+        self._fp.write(names)
+
+    def write(self, ts: float, frame_id: int, person: Union[People, Dict[str, Any], None],
+              cls_result: Optional[Dict[str, Any]], n_people: int = 0) -> None:
+        with self._lock:
+            if self._fp is None:
+                return
+            r = self._buf[self._n]
+            r["ts"] = ts
+            r["frame"] = frame_id
+            r["n_people"] = min(255, n_people)
+            if isinstance(person, People) and len(person):
+                r["kpt"] = person.kpt[0]
+                r["bbox"] = person.bbox[0]
+            elif isinstance(person, dict):
+                k = np.asarray(person.get("kpt", ()), np.float32).reshape(-1, 3)[:NUM_KPTS]
+                r["kpt"][:len(k)] = k
+                r["kpt"][len(k):] = 0.0
+                r["bbox"] = person.get("bbox") or (0, 0, 0, 0)
+            else:
+                r["kpt"] = 0.0
+                r["bbox"] = 0.0
+            probs = cls_result.get("probs") if isinstance(cls_result, dict) else None
+            if probs is not None and len(probs) == r["probs"].shape[0]:
+                r["probs"] = probs
+                r["label"] = self._cls_idx.get(cls_result.get("label"), -1)
+            else:
+                r["probs"] = np.nan
+                r["label"] = -1
+            self._n += 1
+            self.count += 1
+            if self._n == self._buf.shape[0]:
+                self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._n and self._fp is not None:
+            self._fp.write(self._buf[:self._n].tobytes())
+            self._fp.flush()
+        self._n = 0
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            if self._fp is not None:
+                self._fp.close()
+                self._fp = None
+
+def load_log(path: str) -> Tuple[Dict[str, Any], np.ndarray]:
+    """(header, records) 반환. records는 읽기 전용 memmap (T,)"""
+    with open(path, "rb") as f:
+        magic, ver, hlen, w, h, n_cls = _HDR.unpack(f.read(_HDR.size))
+        if magic != MAGIC:
+            raise ValueError(f"not a kplog file: {path}")
+        names = f.read(hlen - _HDR.size).decode("utf-8")
+    classes = names.split("\n") if n_cls else []
+    dt = record_dtype(n_cls)
+    n = (os.path.getsize(path) - hlen) // dt.itemsize
+    header = {"version": ver, "size": (w, h), "classes": classes}
+    if n <= 0:
+        return header, np.zeros((0,), dtype=dt)
+    return header, np.memmap(path, dtype=dt, mode="r", offset=hlen, shape=(n,))
@@ -0,0 +1,96 @@
+from __future__ import annotations
+import time, threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+from .pose_types import People
+
+# 녹화된 키포인트 패킷(npz) 포맷
+#   kpt  : (T, P, 17, 3) float32  x, y(픽셀), conf
+#   bbox : (T, P, 4)     float32  x1, y1, x2, y2
+#   n    : (T,)          int32    프레임별 유효 인원 수 (P 이하)
+#   ts   : (T,)          float64  초 단위 타임스탬프
+#   size : (2,)          int32    (w, h)
+
+def write_npz(path: str, frames: Sequence[Tuple[float, List[Dict[str, Any]]]], size: Tuple[int, int]) -> None:
+    """(ts, people) 리스트를 리플레이용 npz로 저장"""
+    T = len(frames)
+    P = max([len(p) for _ts, p in frames] + [1])
+    kpt = np.zeros((T, P, 17, 3), np.float32)
+    bbox = np.zeros((T, P, 4), np.float32)
+    n = np.zeros((T,), np.int32)
+    ts = np.zeros((T,), np.float64)
+    for t, (t_s, people) in enumerate(frames):
+        ts[t] = float(t_s)
+        n[t] = len(people)
+        for i, p in enumerate(people):
+            k = np.asarray(p.get("kpt", []), np.float32).reshape(-1, 3)[:17]
+            kpt[t, i, :len(k)] = k
+            bbox[t, i] = np.asarray(p.get("bbox", [0, 0, 0, 0]), np.float32)[:4]
+    np.savez_compressed(path, kpt=kpt, bbox=bbox, n=n, ts=ts, size=np.asarray(size, np.int32))
+
+class KeypointReplaySource:
+    """
+    녹화된 people/keypoint 패킷을 HailoPoseStream._worker 입력 큐로 흘려보내는 소스.
+    - speed <= 0 : 최대 속도(무손실, 큐가 비워질 때까지 대기)
+    - speed > 0  : 타임스탬프 기준 실시간 × speed
+    Hailo/GStreamer/카메라 없이 분류기 + 평가기 전체 경로를 재현할 때 사용.
+    """
+    def __init__(self, kpt: np.ndarray, bbox: np.ndarray, n: np.ndarray, ts: np.ndarray,
+                 size: Tuple[int, int], speed: float = 0.0):
+        self.kpt = np.asarray(kpt, np.float32)
+        self.bbox = np.asarray(bbox, np.float32)
+        self.n = np.asarray(n, np.int32)
+        self.ts = np.asarray(ts, np.float64)
+        self.size = (int(size[0]), int(size[1]))
+        self.speed = float(speed)
+
+    @classmethod
+    def from_file(cls, path: str, speed: float = 0.0) -> "KeypointReplaySource":
+        if str(path).lower().endswith(".kplog"):
+            return cls.from_log(path, speed=speed)
+        d = np.load(path)
+        return cls(d["kpt"], d["bbox"], d["n"], d["ts"], tuple(d["size"]), speed=speed)
+
+    @classmethod
+    def from_log(cls, path: str, speed: float = 0.0) -> "KeypointReplaySource":
+        """PoseRecorder 로그(*.kplog) — 프레임당 선택된 1인만 담겨 있음"""
+        from .pose_recorder import load_log
+        hdr, rec = load_log(path)
+        n = np.minimum(rec["n_people"], 1).astype(np.int32)
+        return cls(rec["kpt"][:, None], rec["bbox"][:, None], n, rec["ts"], hdr["size"], speed=speed)
+
+    def __len__(self) -> int:
+        return int(self.ts.shape[0])
+
+    @property
+    def lossless(self) -> bool:
+        return self.speed <= 0
+
+    def packets(self) -> Iterator[Dict[str, Any]]:
+        for t in range(len(self)):
+            n = int(self.n[t])
+            people = People(self.kpt[t, :n].copy(), self.bbox[t, :n].copy())
+            yield {"size": self.size, "people": people, "frame": None, "ts": float(self.ts[t])}
+
+    def run(self, put: Callable[[Optional[Dict[str, Any]]], bool], stop: threading.Event) -> None:
+        """패킷을 put()으로 전달. 끝나면 put(None)으로 종료 알림."""
+        t0_wall = time.perf_counter()
+        t0_rec = float(self.ts[0]) if len(self) else 0.0
+        for pkt in self.packets():
+            if stop.is_set():
+                break
+            if self.speed > 0:
+                due = (pkt["ts"] - t0_rec) / self.speed
+                wait = due - (time.perf_counter() - t0_wall)
+                if wait > 0 and stop.wait(wait):
+                    break
+            if not put(pkt):
+                break
+        put(None)
+
+def open_source(path: str, speed: float = 0.0) -> Optional[KeypointReplaySource]:
+    """키포인트 로그면 소스 객체, 그 외(동영상)는 None → Gst filesrc 경로"""
+    if str(path).lower().endswith((".npz", ".kplog")):
+        return KeypointReplaySource.from_file(path, speed=speed)
+    return None
@@ -0,0 +1,262 @@
+from __future__ import annotations
+import operator
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+NUM_KPTS = 17
+
+class People:
+    """
+    프레임 1장의 사람 검출 결과 (배열 기반).
+      kpt  : (N, 17, 3) float32  x, y(픽셀), conf
+      bbox : (N, 4)     float32  x1, y1, x2, y2 (픽셀)
+    레거시 호출자를 위해 list[dict] 처럼 동작한다 (len/bool/iter/[i]).
+    {"bbox": [...], "kpt": [(x, y, c), ...]} dict는 요청된 인덱스만 그때 만들어 캐시.
+    """
+    __slots__ = ("kpt", "bbox", "_dicts")
+
+    def __init__(self, kpt: Optional[np.ndarray] = None, bbox: Optional[np.ndarray] = None):
+        self.kpt = np.zeros((0, NUM_KPTS, 3), np.float32) if kpt is None else kpt
+        self.bbox = np.zeros((len(self.kpt), 4), np.float32) if bbox is None else bbox
+        self._dicts: Optional[List[Optional[Dict[str, Any]]]] = None
+
+    @classmethod
+    def from_dicts(cls, people: Sequence[Dict[str, Any]]) -> "People":
+        if isinstance(people, People):
+            return people
+        n = len(people)
+        kpt = np.zeros((n, NUM_KPTS, 3), np.float32)
+        bbox = np.zeros((n, 4), np.float32)
+        for i, p in enumerate(people):
+            k = np.asarray(p.get("kpt", ()), np.float32).reshape(-1, 3)[:NUM_KPTS]
+            kpt[i, :len(k)] = k
+            b = p.get("bbox")
+            if b is not None and len(b) >= 4:
+                bbox[i] = b[:4]
+        return cls(kpt, bbox)
+
+    def __len__(self) -> int:
+        return int(self.kpt.shape[0])
+
+    def __bool__(self) -> bool:
+        return self.kpt.shape[0] > 0
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        if self._dicts is None:
+            self._dicts = [None] * n
+        d = self._dicts[i]
+        if d is None:
+            xy = self.kpt[i, :, :2].astype(np.int64).tolist()
+            cf = self.kpt[i, :, 2].tolist()
+            d = self._dicts[i] = {
+                "bbox": self.bbox[i].astype(np.int64).tolist(),
+                "kpt": [(x, y, c) for (x, y), c in zip(xy, cf)],
+            }
+        return d
+
+    def conf_mean(self) -> np.ndarray:
+        """(N,) 사람별 키포인트 평균 conf"""
+        return self.kpt[:, :, 2].mean(axis=1) if len(self) else np.zeros((0,), np.float32)
+
+    def areas(self) -> np.ndarray:
+        b = self.bbox
+        return np.maximum(0.0, b[:, 2] - b[:, 0]) * np.maximum(0.0, b[:, 3] - b[:, 1])
+
+    def best(self) -> int:
+        """평균 conf 최대, 동률이면 bbox 면적 최대인 사람 인덱스 (없으면 -1)"""
+        if not len(self):
+            return -1
+        order = np.lexsort((-np.arange(len(self)), self.areas(), self.conf_mean()))
+        return int(order[-1])
+
+    def take(self, i: int) -> "People":
+        """i번째 사람만 담은 People (배열 뷰, 복사 없음)"""
+        return People(self.kpt[i:i + 1], self.bbox[i:i + 1])
+
+    def kxy(self, i: int = 0) -> np.ndarray:
+        """(17, 2) 좌표 뷰"""
+        return self.kpt[i, :, :2]
+
+    def kcf(self, i: int = 0) -> np.ndarray:
+        """(17,) conf 뷰"""
+        return self.kpt[i, :, 2]
+
+class PoseFrame(People):
+    """
+    스트림 → 분류기 → 각도/평가기 → UI 사이에서 주고받는 프레임 단위 포즈 패킷.
+    People 배열에 프레임 메타(번호, 시각, 크기)와 선택된 사람 인덱스(sel)를 더한다.
+    생성 후에는 읽기 전용으로 취급 (소비자 간 복사 없이 공유).
+    """
+    __slots__ = ("frame_id", "ts", "size", "sel", "_angles")
+
+    def __init__(self, kpt: Optional[np.ndarray] = None, bbox: Optional[np.ndarray] = None,
+                 frame_id: int = -1, ts: float = 0.0, size: Tuple[int, int] = (0, 0), sel: int = -1):
+        super().__init__(kpt, bbox)
+        self.frame_id = int(frame_id)
+        self.ts = float(ts)
+        self.size = (int(size[0]), int(size[1]))
+        self.sel = int(sel)
+        self._angles: Dict[int, tuple] = {}
+
+    @classmethod
+    def of(cls, people: Sequence[Dict[str, Any]], frame_id: int = -1, ts: float = 0.0,
+           size: Tuple[int, int] = (0, 0), sel: Optional[int] = None) -> "PoseFrame":
+        """People(또는 레거시 dict 리스트)를 배열 복사 없이 감싼다. sel=None이면 best()"""
+        p = People.from_dicts(people)
+        pf = cls(p.kpt, p.bbox, frame_id, ts, size)
+        pf.sel = p.best() if sel is None else int(sel)
+        return pf
+
+    @property
+    def selected(self) -> Optional[People]:
+        return self.take(self.sel) if 0 <= self.sel < len(self) else None
+
+    @property
+    def target(self) -> int:
+        """각도/평가 대상 인덱스 (sel, 선택이 없으면 0)"""
+        return self.sel if 0 <= self.sel < len(self) else 0
+
+    def angles(self, i: int = 0) -> tuple:
+        """
+        i번째 사람의 관절 각도 (joint_angles_raw 결과: (ang, conf) 각 (12,)).
+        프레임당 1회만 계산하고 캐시 → 어댑터 meta / 평가기 / 오버레이가 공유.
+        """
+        r = self._angles.get(i)
+        if r is None:
+            from .evaluators.pose_angles import joint_angles_raw
+            r = self._angles[i] = joint_angles_raw(self.kpt[i, :, :2], self.kpt[i, :, 2])
+        return r
+
+class Faces:
+    """
+    얼굴 검출 결과 (배열 기반).
+      bbox : (N, 4)    float32 픽셀
+      kpt5 : (N, 5, 2) float32 픽셀, has_kpt[i]가 False면 무효
+    [i] 는 레거시 {"bbox": [...], "kpt5": [(x, y)*5] | None} dict
+    """
+    __slots__ = ("bbox", "kpt5", "has_kpt")
+
+    def __init__(self, bbox: np.ndarray, kpt5: np.ndarray, has_kpt: np.ndarray):
+        self.bbox = bbox
+        self.kpt5 = kpt5
+        self.has_kpt = has_kpt
+
+    def __len__(self) -> int:
+        return int(self.bbox.shape[0])
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        k5 = [tuple(p) for p in self.kpt5[i].astype(np.int64).tolist()] if self.has_kpt[i] else None
+        return {"bbox": self.bbox[i].astype(np.int64).tolist(), "kpt5": k5}
+
+    def largest(self) -> int:
+        if not len(self):
+            return -1
+        b = self.bbox
+        return int(np.argmax(np.maximum(0.0, b[:, 2] - b[:, 0]) * np.maximum(0.0, b[:, 3] - b[:, 1])))
+
+def _num(obj, name) -> float:
+    a = getattr(obj, name)
+    return float(a() if callable(a) else a)
+
+def resolve_conf_getter(point) -> Callable[[Any], float]:
+    """
+    Hailo landmark 점의 confidence 접근자를 한 번만 결정.
+    confidence → score → visibility 순, 모두 없으면 0.5 고정.
+    """
+    for name in ("confidence", "score", "visibility"):
+        a = getattr(point, name, None)
+        if a is None:
+            continue
+        try:
+            float(a() if callable(a) else a)
+        except Exception:
+            continue
+        return operator.methodcaller(name) if callable(a) else operator.attrgetter(name)
+    return lambda p: 0.5
+
+class RoiDecoder:
+    """
+    Hailo ROI → People / Faces 배열 디코더. 파이프라인(스트림)마다 1개.
+    좌표 변환(정규화 bbox 기준 → 픽셀)은 배열 연산으로 한 번에 처리.
+    """
+    def __init__(self, n_kpts: int = NUM_KPTS):
+        self.n_kpts = int(n_kpts)
+        self._conf: Optional[Callable[[Any], float]] = None
+
+    @staticmethod
+    def _detections(buf):
+        import hailo
+        roi = hailo.get_roi_from_buffer(buf)
+        if not roi:
+            return hailo, []
+        return hailo, roi.get_objects_typed(hailo.HAILO_DETECTION)
+
+    @staticmethod
+    def _to_pixels(pts: np.ndarray, boxes: np.ndarray, w: int, h: int) -> None:
+        """pts (N,K,>=2) 정규화 bbox 내부 좌표 → 픽셀 (in-place, 정수 절삭)"""
+        xmin, ymin, bw, bh = (boxes[:, j:j + 1] for j in range(4))
+        pts[:, :, 0] = np.trunc((pts[:, :, 0] * bw + xmin) * w)
+        pts[:, :, 1] = np.trunc((pts[:, :, 1] * bh + ymin) * h)
+
+    @staticmethod
+    def _bbox_pixels(boxes: np.ndarray, w: int, h: int) -> np.ndarray:
+        xmin, ymin, bw, bh = boxes.T
+        return np.trunc(np.stack([xmin * w, ymin * h, (xmin + bw) * w, (ymin + bh) * h], axis=1))
+
+    def people(self, buf, w: int, h: int) -> People:
+        try:
+            hailo, dets = self._detections(buf)
+            K = self.n_kpts
+            flat: List[float] = []
+            boxes: List[tuple] = []
+            for d in dets:
+                lms = d.get_objects_typed(hailo.HAILO_LANDMARKS)
+                if not lms:
+                    continue
+                pts = lms[0].get_points()[:K]
+                if self._conf is None and len(pts):
+                    self._conf = resolve_conf_getter(pts[0])
+                conf = self._conf
+                b = d.get_bbox()
+                boxes.append((_num(b, "xmin"), _num(b, "ymin"), _num(b, "width"), _num(b, "height")))
+                for p in pts:
+                    flat += (p.x(), p.y(), conf(p))
+                flat += (0.0,) * (3 * (K - len(pts)))
+            if not boxes:
+                return People()
+            kpt = np.array(flat, np.float64).reshape(len(boxes), K, 3)
+            box = np.array(boxes, np.float64)
+            self._to_pixels(kpt, box, w, h)
+            return People(kpt.astype(np.float32), self._bbox_pixels(box, w, h).astype(np.float32))
+        except Exception:
+            return People()
+
+    def faces(self, buf, w: int, h: int) -> Faces:
+        try:
+            hailo, dets = self._detections(buf)
+            n = len(dets)
+            box = np.zeros((n, 4), np.float64)
+            k5 = np.zeros((n, 5, 2), np.float64)
+            has = np.zeros((n,), bool)
+            for i, d in enumerate(dets):
+                b = d.get_bbox()
+                box[i] = (float(b.xmin()), float(b.ymin()), float(b.width()), float(b.height()))
+                lms = d.get_objects_typed(hailo.HAILO_LANDMARKS)
+                if lms:
+                    pts = lms[0].get_points()
+                    if len(pts) >= 5:
+                        k5[i] = [(p.x(), p.y()) for p in pts[:5]]
+                        has[i] = True
+            self._to_pixels(k5, box, w, h)
+            return Faces(self._bbox_pixels(box, w, h).astype(np.float32), k5.astype(np.float32), has)
+        except Exception:
+            return Faces(np.zeros((0, 4), np.float32), np.zeros((0, 5, 2), np.float32), np.zeros((0,), bool))
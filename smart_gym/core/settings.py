@@ -16,6 +16,17 @@ SRC_WIDTH  = int(os.environ.get("SRC_WIDTH",  "1280"))
 SRC_HEIGHT = int(os.environ.get("SRC_HEIGHT", "720"))
 SRC_FPS    = int(os.environ.get("SRC_FPS",    "30"))
 
+# 카메라 1개를 tee로 포즈/얼굴 분기에 공유 (core/camera_hub.py). 0이면 스트림별 개별 파이프라인
+SHARED_CAMERA = os.environ.get("SHARED_CAMERA", "1") == "1"
+# 운동 중 얼굴 재식별 fps (공유 카메라 모드, 0이면 운동 중 얼굴 분기 끔)
+FACE_REID_FPS = float(os.environ.get("FACE_REID_FPS", "0"))
+
+# appsink → UI 로 넘기는 프레임 버퍼 풀 크기 (큐 단계 수 + 여유)
+FRAME_POOL_SIZE = int(os.environ.get("FRAME_POOL_SIZE", "8"))
+
+# 운동 화면 영상 캔버스: 1이면 OpenGL (ui/gl_canvas.py — 텍스처 업로드 + GPU 스케일 + 벡터 스켈레톤)
+UI_GL_CANVAS = os.environ.get("UI_GL_CANVAS", "0") == "1"
+
 # 포즈(Hailo YOLOv8-Pose) 
 HEF       = os.environ.get("HEF", str(MODELS_DIR / "yolov8s_pose.hef"))
 POST_SO   = os.environ.get("POST_SO", str(MODELS_DIR / "libyolov8pose_postprocess.so"))
@@ -27,9 +38,50 @@ CROPPER_SO = os.environ.get(
     "/usr/lib/aarch64-linux-gnu/hailo/tappas/post_processes/cropping_algorithms/libwhole_buffer.so"
 )
 
+# 리플레이 소스 (비우면 라이브 카메라)
+#   *.npz → 녹화 키포인트 패킷, 그 외 → 동영상 파일(filesrc)
+POSE_SOURCE       = os.environ.get("POSE_SOURCE", "")
+POSE_REPLAY_SPEED = float(os.environ.get("POSE_REPLAY_SPEED", "1.0"))   # 0 이하: 최대 속도
+
+# 세션 키포인트 기록 디렉토리 (비우면 기록 안 함) → pose_YYYYmmdd_HHMMSS.kplog
+POSE_REC_DIR = os.environ.get("POSE_REC_DIR", "")
+
+# 단계별 지연 통계 (core/latency.py). 종료 시 표 출력, LATENCY_DUMP 경로가 있으면 JSON 저장
+LATENCY_STATS = os.environ.get("LATENCY_STATS", "1") == "1"
+LATENCY_DUMP  = os.environ.get("LATENCY_DUMP", "")
+
+# 관절 각도 스무딩 (core/filters.py): ema | oneeuro | median | none
+ANGLE_FILTER     = os.environ.get("ANGLE_FILTER", "ema")
+ANGLE_EMA_ALPHA  = float(os.environ.get("ANGLE_EMA_ALPHA", "0.2"))
+ANGLE_MIN_CUTOFF = float(os.environ.get("ANGLE_MIN_CUTOFF", "1.0"))   # One-Euro, Hz
+ANGLE_BETA       = float(os.environ.get("ANGLE_BETA", "0.01"))        # One-Euro, 1/(deg/s)
+ANGLE_MEDIAN_WIN = int(os.environ.get("ANGLE_MEDIAN_WIN", "5"))
+
 # 동작 인식 TCN
 TCN_ONNX = os.environ.get("TCN_ONNX", str(MODELS_DIR / "tcn.onnx"))
 TCN_JSON = os.environ.get("TCN_JSON", str(MODELS_DIR / "tcn.json"))
+TCN_WARMUP = os.environ.get("TCN_WARMUP", "1") == "1"   # 시작 시 더미 추론 1회
+TCN_PROB_FILTER = os.environ.get("TCN_PROB_FILTER", "ema")   # 확률 스무딩 (ema | oneeuro | median | none)
+TCN_VARIANT = os.environ.get("TCN_VARIANT", "fp32")   # fp32 | opt (그래프 최적화 캐시) | int8 (tools.tcn_quantize)
+TCN_THREADS = int(os.environ.get("TCN_THREADS", "0"))        # onnxruntime intra-op 스레드 (0: 코어 수 - 2, 최대 4)
+# 배치 추론 스케줄러 (core/infer_scheduler.py): 여러 소스의 창을 deadline 안에서 묶어 1회 실행
+TCN_SCHED       = os.environ.get("TCN_SCHED", "0") == "1"
+TCN_MAX_BATCH   = int(os.environ.get("TCN_MAX_BATCH", "8"))
+TCN_DEADLINE_MS = float(os.environ.get("TCN_DEADLINE_MS", "8"))
+
+# 다인원 추적 (core/tracker.py): 트랙별 TCN 창을 유지하고 한 번의 배치 추론으로 분류
+#   0이면 기존 방식 (최고 conf 1명, bbox IoU 급변 시 분류기 리셋)
+#   코칭 대상은 두 방식 모두 conf → bbox 면적 순 (추적 모드는 최근 conf EMA + 교체 히스테리시스)
+POSE_TRACKING      = os.environ.get("POSE_TRACKING", "1") == "1"
+POSE_MAX_TRACKS    = int(os.environ.get("POSE_MAX_TRACKS", "4"))
+TRACK_MAX_MISSES   = int(os.environ.get("TRACK_MAX_MISSES", "15"))   # 연속 미검출 프레임 후 트랙 삭제
+TRACK_SWITCH_MARGIN = float(os.environ.get("TRACK_SWITCH_MARGIN", "0.05"))   # 코칭 대상 교체에 필요한 최근 conf 차이
+
+# TCN 라벨 안정화 (core/label_smoother.py): 최근 LABEL_WINDOW개 결과 기준
+LABEL_WINDOW     = int(os.environ.get("LABEL_WINDOW", "8"))
+LABEL_MIN_DWELL  = int(os.environ.get("LABEL_MIN_DWELL", "3"))    # 운동 전환 전 후보 유지 프레임
+LABEL_IDLE_ENTER = int(os.environ.get("LABEL_IDLE_ENTER", "6"))   # idle 진입에 필요한 idle 개수
+LABEL_IDLE_EXIT  = int(os.environ.get("LABEL_IDLE_EXIT", "5"))    # idle 이탈에 필요한 운동 라벨 개수
 
 # InsightFace 설정
 FACE_APP_NAME  = os.environ.get("FACE_APP_NAME", "buffalo_l")
@@ -1,10 +1,12 @@
 from __future__ import annotations
-import os, json
+import os, json, hashlib, threading
 from dataclasses import dataclass
-from collections import deque
 from typing import List, Tuple, Optional, Dict, Any, Sequence
 import numpy as np
 
+from .filters import ArrayFilter, make_filter
+from .pose_types import People, PoseFrame
+
 NUM_KPTS = 17
 
 def _softmax_axis(x: np.ndarray, axis: int) -> np.ndarray:
@@ -12,6 +14,234 @@ def _softmax_axis(x: np.ndarray, axis: int) -> np.ndarray:
     ex = np.exp(x)
     return ex / np.sum(ex, axis=axis, keepdims=True)
 
+# 레이아웃 캐시 (모델 sha1 → "nct"/"ntc"). 입력 shape 메타데이터로 결정할 수 없을 때만 사용.
+_LAYOUT_CACHE_PATH = os.environ.get(
+    "TCN_LAYOUT_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "smart_gym", "tcn_layout.json"))
+_LAYOUT_CACHE_LOCK = threading.Lock()
+
+def _file_sha1(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+# 모델 변형 (TCN_VARIANT)
+#   fp32 : 원본
+#   opt  : onnxruntime 오프라인 그래프 최적화 결과를 디스크에 캐시 (첫 사용 시 생성)
+#   int8 : 정적 양자화 모델 (tools/tcn_quantize.py로 녹화 키포인트 창을 보정 데이터로 생성)
+# 캐시 파일명은 원본 sha1 기준 → 원본 모델이 바뀌면 자동으로 새로 만든다.
+VARIANTS = ("fp32", "opt", "int8")
+_MODEL_CACHE_DIR = os.environ.get(
+    "TCN_MODEL_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "smart_gym"))
+
+def variant_path(onnx_path: str, variant: str) -> str:
+    """원본 모델 → 변형 모델 캐시 경로 (fp32면 원본 그대로)"""
+    if variant == "fp32":
+        return onnx_path
+    stem = os.path.splitext(os.path.basename(onnx_path))[0]
+    return os.path.join(_MODEL_CACHE_DIR, f"{stem}.{_file_sha1(onnx_path)[:12]}.{variant}.onnx")
+
+def optimize_model(src: str, dst: str) -> str:
+    """그래프 최적화(ORT_ENABLE_EXTENDED) 결과를 dst에 저장"""
+    import onnxruntime as ort
+    os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
+    tmp = dst + ".tmp.onnx"
+    so = ort.SessionOptions()
+    so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    so.optimized_model_filepath = tmp
+    ort.InferenceSession(src, sess_options=so, providers=["CPUExecutionProvider"])
+    os.replace(tmp, dst)
+    return dst
+
+def resolve_variant(onnx_path: str, variant: str = "fp32") -> Tuple[str, str]:
+    """
+    (실제 로드할 경로, 적용된 변형). opt는 없으면 만들고, int8이 아직 없으면 fp32로 폴백.
+    """
+    variant = (variant or "fp32").lower()
+    if variant not in VARIANTS:
+        raise ValueError(f"unknown TCN variant: {variant}")
+    if variant == "fp32" or not os.path.exists(onnx_path):
+        return onnx_path, "fp32"
+    path = variant_path(onnx_path, variant)
+    if os.path.exists(path):
+        return path, variant
+    if variant == "opt":
+        try:
+            return optimize_model(onnx_path, path), variant
+        except Exception as e:
+            print(f"[tcn] graph optimization failed, using fp32: {e}", flush=True)
+    else:
+        print(f"[tcn] {path} not found (run tools.tcn_quantize), using fp32", flush=True)
+    return onnx_path, "fp32"
+
+# 미분 커널 (시간축 cross-correlation 가중치, [t-r .. t+r], fps 곱하기 전)
+_DERIV_KERNELS: Dict[str, np.ndarray] = {
+    "central3": np.array([-1.0, 0.0, 1.0]) / 2.0,
+    "central5": np.array([1.0, -8.0, 0.0, 8.0, -1.0]) / 12.0,
+}
+
+class DerivStage:
+    """
+    기본 피처 채널(C0) 뒤에 속도(및 가속도) 채널을 스트리밍으로 붙인다.
+    - 새 프레임마다 완전히 결정된 열(t-r, 가속도는 t-2r)만 계산 → 프레임당 O(C0·k)
+    - 창 양 끝(패딩 영향 열)은 view() 시점에 창 기준으로 다시 계산해
+      학습 시의 창 단위 conv(pad_mode="zeros"/"replicate")와 같은 값을 만든다.
+    - 가속도는 속도 채널에 같은 미분을 한 번 더 적용
+    """
+    def __init__(self, base_channels: int, fps: float = 30.0, kernel: str = "central5",
+                 velocity: bool = True, acceleration: bool = False, pad_mode: str = "zeros"):
+        if kernel not in _DERIV_KERNELS:
+            raise ValueError(f"unknown deriv_kernel: {kernel}")
+        self.C0 = int(base_channels)
+        self.w = (_DERIV_KERNELS[kernel] * float(fps)).astype(np.float32)
+        self.r = len(self.w) // 2
+        self.acceleration = bool(acceleration)
+        self.orders = 1 + int(bool(velocity) or self.acceleration) + int(self.acceleration)
+        self.pad_mode = pad_mode
+
+    @property
+    def out_channels(self) -> int:
+        return self.C0 * self.orders
+
+    def on_push(self, ring: "FeatureRing") -> None:
+        r, k, T, C0 = self.r, len(self.w), ring.T, self.C0
+        newest = ring.pos - 1
+        if ring.pushed >= k:
+            cols = (newest - 2 * r + np.arange(k)) % T
+            ring.ring[C0:2 * C0, (newest - r) % T] = ring.ring[:C0, cols] @ self.w
+        if self.acceleration and ring.pushed >= 2 * k - 1:
+            cols = (newest - 3 * r + np.arange(k)) % T
+            ring.ring[2 * C0:3 * C0, (newest - 2 * r) % T] = ring.ring[C0:2 * C0, cols] @ self.w
+
+    def _edges(self, x: np.ndarray, out: np.ndarray, width: int) -> None:
+        r, T = self.r, x.shape[1]
+        if self.pad_mode == "replicate":
+            lpad = np.repeat(x[:, :1], r, axis=1)
+            rpad = np.repeat(x[:, -1:], r, axis=1)
+        else:
+            lpad = rpad = np.zeros((x.shape[0], r), np.float32)
+        left = np.concatenate([lpad, x[:, :width + r]], axis=1)
+        right = np.concatenate([x[:, T - width - r:], rpad], axis=1)
+        sw = np.lib.stride_tricks.sliding_window_view
+        out[:, :width] = sw(left, len(self.w), axis=1) @ self.w
+        out[:, T - width:] = sw(right, len(self.w), axis=1) @ self.w
+
+    def fix_edges(self, win: np.ndarray) -> None:
+        """win: 시간순 정렬된 (C, T) 창 (in-place)"""
+        C0, r = self.C0, self.r
+        self._edges(win[:C0], win[C0:2 * C0], r)
+        if self.acceleration:
+            self._edges(win[C0:2 * C0], win[2 * C0:3 * C0], 2 * r)
+
+class FeatureRing:
+    """
+    (C, T) 원형 버퍼. 매 프레임 피처 1열만 쓰고, 추론 시 (1, C, T) 입력 창을
+    미리 할당된 배열에 슬라이스 복사 2회로 채운다 (리스트/stack/transpose 없음).
+    deriv가 주어지면 push()는 기본 채널만 받고 미분 채널은 DerivStage가 채운다.
+    """
+    def __init__(self, channels: int, win: int, deriv: Optional[DerivStage] = None):
+        self.C = int(channels)
+        self.T = int(win)
+        self.deriv = deriv
+        self.base = deriv.C0 if deriv is not None else self.C
+        if deriv is not None and (deriv.out_channels != self.C or self.T < 4 * deriv.r + 1):
+            raise ValueError("FeatureRing: deriv stage does not fit (channels/window)")
+        self.ring = np.zeros((self.C, self.T), np.float32)
+        self.window = np.zeros((1, self.C, self.T), np.float32)
+        self.pos = 0      # 다음 쓰기 위치 (= 가장 오래된 열)
+        self.count = 0
+        self.pushed = 0   # clear() 이후 누적 프레임 수
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self) -> None:
+        self.pos = 0
+        self.count = 0
+        self.pushed = 0
+
+    def push(self, vec: np.ndarray) -> None:
+        self.ring[:self.base, self.pos] = vec
+        self.pos = (self.pos + 1) % self.T
+        self.pushed += 1
+        if self.count < self.T:
+            self.count += 1
+        if self.deriv is not None:
+            self.deriv.on_push(self)
+
+    def view(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        시간순 정렬된 (1, C, T) 창. 반환 배열은 다음 view() 호출 때 덮어써진다.
+        out((C, T), 예: 배치 입력의 한 행)이 주어지면 거기에 채우고 out 반환.
+        """
+        p, T = self.pos, self.T
+        w = self.window[0] if out is None else out
+        if p == 0:
+            w[...] = self.ring
+        else:
+            w[:, :T - p] = self.ring[:, p:]
+            w[:, T - p:] = self.ring[:, :p]
+        if self.deriv is not None:
+            self.deriv.fix_edges(w)
+        return self.window if out is None else out
+
+def kpt_features(kpts: np.ndarray, size: Tuple[int, int], bbox: Optional[Sequence[float]] = None,
+                 features: str = "xyconf", norm: str = "image") -> np.ndarray:
+    """
+    (17,3) 또는 (N,17,3) 키포인트 → TCN 입력 피처 (C,) / (N,C) float32.
+    - norm="bbox" 이고 bbox((4,) 또는 (N,4))가 있으면 bbox 기준, 아니면 이미지 크기 기준 정규화
+    - xyconf: [x0,y0,x1,y1,...,c0..c16] (51), xy: [x0,y0,...] (34)
+    - conf가 NaN(없음)이면 1.0
+    """
+    k = np.asarray(kpts, np.float64)
+    single = k.ndim == 2
+    if single:
+        k = k[None]
+    N = k.shape[0]
+    xy = k[:, :NUM_KPTS, :2]
+    if norm == "bbox" and bbox is not None and np.size(bbox) >= 4:
+        b = np.asarray(bbox, np.float64).reshape(-1, 4)[:, None, :]
+        xy = (xy - b[..., :2]) / np.maximum(1.0, b[..., 2:4] - b[..., :2])
+    else:
+        w, h = size
+        xy = xy / np.maximum(1.0, np.array([float(w), float(h)]))
+
+    if features == "xy":
+        out = xy.reshape(N, NUM_KPTS * 2).astype(np.float32)
+    else:
+        out = np.empty((N, NUM_KPTS * 3), np.float32)
+        out[:, :NUM_KPTS * 2] = xy.reshape(N, NUM_KPTS * 2)
+        c = k[:, :NUM_KPTS, 2]
+        out[:, NUM_KPTS * 2:] = np.where(np.isnan(c), 1.0, c)
+    return out[0] if single else out
+
+def _gather_index(kpt_order: Optional[List[int]], n: int = NUM_KPTS) -> np.ndarray:
+    """
+    dst → src 인덱스 (out[kpt_order[src]] = pts[src], src < n).
+    매핑 없는 dst는 패딩 행(NUM_KPTS)을 가리킨다.
+    """
+    if kpt_order is None:
+        return np.arange(NUM_KPTS)
+    idx = np.full(NUM_KPTS, NUM_KPTS, np.intp)
+    for i_src, i_dst in enumerate(kpt_order[:n]):
+        if 0 <= i_dst < NUM_KPTS:
+            idx[i_dst] = i_src
+    return idx
+
+class TCNState:
+    """사람(트랙) 1명분 분류기 상태: 입력 창 + 확률 스무딩 필터"""
+    __slots__ = ("ring", "filt")
+
+    def __init__(self, ring: FeatureRing):
+        self.ring = ring
+        self.filt: Optional[ArrayFilter] = None
+
+    def reset(self) -> None:
+        self.ring.clear()
+        if self.filt is not None:
+            self.filt.reset()
+
 @dataclass
 class TCNConfig:
     classes: Optional[List[str]] = None
@@ -21,6 +251,12 @@ class TCNConfig:
     input_channels: int = 51          # xyconf=51, xy=34
     kpt_order: Optional[List[int]] = None  # 길이 17, src->dst 인덱스 매핑
     smooth: int = 7                   # EMA window (1이면 비활성)
+    model_type: str = "plain"         # "deriv": 속도/가속도 피처 사용 모델
+    use_velocity: bool = False
+    use_acceleration: bool = False
+    deriv_kernel: str = "central5"
+    fps: float = 30.0
+    pad_mode: str = "zeros"
 
     @staticmethod
     def from_json(json_path: Optional[str]) -> "TCNConfig":
@@ -45,6 +281,12 @@ class TCNConfig:
             input_channels=int(cfg.get("input_channels", default_in_ch)),
             kpt_order=kpt_order,
             smooth=int(cfg.get("smooth", 7)),
+            model_type=str(cfg.get("model_type", "plain")),
+            use_velocity=bool(hp.get("use_velocity", False)),
+            use_acceleration=bool(hp.get("use_acceleration", False)),
+            deriv_kernel=str(hp.get("deriv_kernel", "central5")),
+            fps=float(hp.get("fps", 30.0)),
+            pad_mode=str(hp.get("pad_mode", "zeros")),
         )
 
 class TCNOnnxClassifier:
@@ -52,21 +294,34 @@ class TCNOnnxClassifier:
     ONNX TCN 기반 동작 분류기 (CPU 전용).
     - 입력: 최근 T개의 포즈 피처(window)
     - 출력: 클래스 확률, EMA 스무딩 선택적 적용
+    - update(): 선택된 1명 / update_batch(): 여러 트랙 상태(TCNState)를 (N,C,T) 한 번에 추론
     """
     def __init__(
         self,
         onnx_path: str,
         json_path: Optional[str] = None,
         session: Any = None,   # onnxruntime.InferenceSession 호환 객체 주입용
+        warmup: bool = False,
+        prob_filter: str = "ema",  # 확률 스무딩 (core.filters 종류, smooth<=1이면 비활성)
+        threads: int = 1,          # onnxruntime intra-op 스레드 수
+        variant: str = "fp32",     # fp32 | opt | int8 (VARIANTS)
     ):
+        self.variant = "fp32"
+        if session is None:
+            onnx_path, self.variant = resolve_variant(onnx_path, variant)
+        self.onnx_path: Optional[str] = onnx_path if session is None else None
         self.cfg = TCNConfig.from_json(json_path)
         self.classes: Optional[List[str]] = (self.cfg.classes[:] if self.cfg.classes else None)
 
-        self._ema: Optional[np.ndarray] = None
+        self._gather: Dict[int, np.ndarray] = {}   # 입력 점 개수별 gather 인덱스 캐시
         self._alpha: float = 1.0 if self.cfg.smooth <= 1 else 2.0 / float(self.cfg.smooth + 1)
+        self._prob_filter_kind = prob_filter
+        self._batch: Dict[int, np.ndarray] = {}   # 배치 크기별 입력 버퍼
+        self.max_batch: int = 0                   # 0: 제한 없음, 1: 고정 배치 모델 (로드 시 결정)
+        self._batch_fail: int = 0                 # 배치 실행 실패 → 1개씩 재시도한 횟수
+        self.scheduler = None                     # InferScheduler: 다른 소스와 묶어서 추론
 
         self.win: int = int(self.cfg.win)
-        self.buf: deque[np.ndarray] = deque(maxlen=self.win)
 
         self.session = None
         self.input_name: Optional[str] = None
@@ -80,40 +335,60 @@ class TCNOnnxClassifier:
             # onnxruntime (CPU) 필요
             import onnxruntime as ort
             so = ort.SessionOptions()
-            so.intra_op_num_threads = 1
+            so.intra_op_num_threads = max(1, int(threads))
             so.inter_op_num_threads = 1
+            if self.variant == "opt":
+                # 이미 최적화된 그래프 → 로드 시 재최적화 생략
+                so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_BASIC
             self.session = ort.InferenceSession(
                 onnx_path, sess_options=so, providers=["CPUExecutionProvider"]
             )
 
         self.input_name = self.session.get_inputs()[0].name
         self._infer_layout_and_dims()
+        self.max_batch = self._batch_limit()
 
         model_T = int(self.expected_T or self.win)
         if model_T > self.win:
             self.win = model_T
-            self.buf = deque(maxlen=self.win)
+        C_model = int(self.expected_C or self.cfg.input_channels)
+        self.deriv = self._make_deriv_stage(C_model)
+        self._C, self._T = C_model, model_T
+        self._state = self.new_state()
+        self.ring = self._state.ring
 
         self.ok: bool = True
         self.err: Optional[Exception] = None
+        if warmup:
+            self.warmup()
 
     def _infer_layout_and_dims(self) -> None:
+        """
+        입력 메타데이터(shape)로 레이아웃/차원 결정. 추론 실행 없음.
+        - [N, C, T] / [N, T, C] 중 C(JSON input_channels)와 맞는 축으로 판단
+        - 심볼릭 차원이라 판단이 안 되면 1회 프로브 → 결과를 모델 해시 키로 디스크 캐시
+        """
         C_json = int(self.cfg.input_channels)
-        T_try = int(self.cfg.win)
-
-        def _probe(shape_ntc: bool) -> bool:
-            x = np.zeros((1, C_json, T_try), np.float32) if not shape_ntc else np.zeros((1, T_try, C_json), np.float32)
-            try:
-                _ = self.session.run(None, {self.input_name: x})
-                return True
-            except Exception:
-                return False
-
-        ok_nct = _probe(shape_ntc=False)
-        ok_ntc = _probe(shape_ntc=True)
-
-        self.expected_C = C_json
-        self.expected_T = T_try if (ok_nct or ok_ntc) else T_try
+        T_json = int(self.cfg.win)
+        self.expected_C, self.expected_T = C_json, T_json
+
+        shape = list(self.session.get_inputs()[0].shape or [])
+        dims = [d if isinstance(d, int) and d > 0 else None for d in shape[1:3]]
+        layout = None
+        if len(shape) == 3:
+            d1, d2 = dims
+            if d1 == C_json or (d1 is None and d2 == T_json):
+                layout = "nct"
+            elif d2 == C_json or (d2 is None and d1 == T_json):
+                layout = "ntc"
+        if layout is None and len(shape) == 3:
+            layout = self._cached_layout(C_json, T_json)
+
+        self.channels_first = (layout != "ntc")
+        if len(shape) == 3:
+            c_dim, t_dim = (dims[0], dims[1]) if self.channels_first else (dims[1], dims[0])
+            self.expected_C = c_dim or C_json
+            self.expected_T = t_dim or T_json
 
         out0 = self.session.get_outputs()[0]
         oshape = out0.shape
@@ -124,10 +399,95 @@ class TCNOnnxClassifier:
                 while len(self.classes) < n_cls:
                     self.classes.append(f"class_{len(self.classes)}")
 
+    def _probe_layout(self, C: int, T: int) -> str:
+        """NCT 먼저 1회 실행, 실패할 때만 NTC 확인"""
+        try:
+            self.session.run(None, {self.input_name: np.zeros((1, C, T), np.float32)})
+            return "nct"
+        except Exception:
+            pass
+        try:
+            self.session.run(None, {self.input_name: np.zeros((1, T, C), np.float32)})
+            return "ntc"
+        except Exception:
+            return "nct"
+
+    def _cached_layout(self, C: int, T: int) -> str:
+        path = _LAYOUT_CACHE_PATH
+        key = f"{_file_sha1(self.onnx_path)}:{C}x{T}" if self.onnx_path else None
+        if key is None or not path:
+            return self._probe_layout(C, T)
+        with _LAYOUT_CACHE_LOCK:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    cache = json.load(f)
+            except Exception:
+                cache = {}
+            if cache.get(key) in ("nct", "ntc"):
+                return cache[key]
+            layout = self._probe_layout(C, T)
+            cache[key] = layout
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                tmp = path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(cache, f, indent=1)
+                os.replace(tmp, path)
+            except Exception:
+                pass
+            return layout
+
+    def _batch_limit(self) -> int:
+        """입력 메타데이터의 배치 축: 고정 1이면 1, 심볼릭/미지정이면 0 (warmup(batch=2)에서 확인)"""
+        shape = list(self.session.get_inputs()[0].shape or [])
+        return 1 if shape and shape[0] == 1 else 0
+
+    def warmup(self, batch: int = 1) -> None:
+        """
+        세션 초기화 비용(메모리 할당 등)을 첫 실제 프레임 전에 1회 소모.
+        batch>1 (추적/스케줄러로 배치를 만들 때): 그 1회를 batch행으로 실행해 배치 지원 여부도 확인
+        """
+        x = self._model_input(self.ring.view())
+        probe = batch > 1 and self.max_batch == 0
+        if probe:
+            x = np.repeat(x, int(batch), axis=0)
+        try:
+            self.session.run(None, {self.input_name: x})
+        except Exception as e:
+            if probe:
+                self.max_batch = 1
+                print(f"[tcn] batched run not supported, inferring one window at a time: {e}", flush=True)
+        self.ring.clear()
+
+    def _model_input(self, x: np.ndarray) -> np.ndarray:
+        """(1,C,T) 창 → 모델 입력 레이아웃"""
+        if self.channels_first:
+            return x
+        return np.ascontiguousarray(x.transpose(0, 2, 1))
+
+    def _make_deriv_stage(self, C_model: int) -> Optional[DerivStage]:
+        """
+        model_type="deriv" 모델 중 입력이 기본 피처 × (1+속도+가속도) 채널인 경우에만
+        미분 채널을 스트리밍으로 만들어 넣는다. 입력이 기본 채널 수와 같으면
+        그래프 안에서 미분을 계산하는 모델(예: tcn.onnx의 vel.conv)이므로 원본만 넣는다.
+        """
+        cfg = self.cfg
+        if cfg.model_type != "deriv" or not (cfg.use_velocity or cfg.use_acceleration):
+            return None
+        base = NUM_KPTS * (2 if cfg.features == "xy" else 3)
+        stage = DerivStage(base, fps=cfg.fps, kernel=cfg.deriv_kernel,
+                           velocity=cfg.use_velocity, acceleration=cfg.use_acceleration,
+                           pad_mode=cfg.pad_mode)
+        return stage if stage.out_channels == C_model else None
+
     @staticmethod
-    def _select_person(people: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    def _select_person(people) -> Optional[Tuple[Any, Any]]:
+        """(키포인트, bbox) 반환. People/PoseFrame은 배열 그대로, 레거시 dict 리스트도 허용."""
         if not people:
             return None
+        if isinstance(people, People):
+            i = people.sel if isinstance(people, PoseFrame) and people.sel >= 0 else people.best()
+            return people.kpt[i], people.bbox[i]
 
         def conf_mean(p: Dict[str, Any]) -> float:
             k = p.get("kpt", [])
@@ -143,90 +503,76 @@ class TCNOnnxClassifier:
             x1, y1, x2, y2 = bbox
             return max(0.0, float(x2 - x1)) * max(0.0, float(y2 - y1))
 
-        return max(people, key=lambda p: (conf_mean(p), area(p)))
-
-    def _reorder_kpts(self, pts: Sequence[Sequence[float]]) -> List[Tuple[float, float, Optional[float]]]:
-        if self.cfg.kpt_order is None:
-            return [tuple(p) if len(p) >= 3 else (p[0] if len(p) > 0 else 0.0,
-                                                  p[1] if len(p) > 1 else 0.0,
-                                                  None) for p in pts]
-
-        out = [(0.0, 0.0, None)] * NUM_KPTS
-        for i_src, i_dst in enumerate(self.cfg.kpt_order):
-            if i_src < len(pts) and 0 <= i_dst < NUM_KPTS:
-                p = pts[i_src]
-                if len(p) >= 3:
-                    out[i_dst] = (float(p[0]), float(p[1]), float(p[2]))
-                elif len(p) == 2:
-                    out[i_dst] = (float(p[0]), float(p[1]), None)
-                elif len(p) == 1:
-                    out[i_dst] = (float(p[0]), 0.0, None)
-        return out
-
-    def _norm_xy(self, x: float, y: float, w: int, h: int, bbox: Optional[Sequence[float]]) -> Tuple[float, float]:
-        if self.cfg.norm == "bbox" and bbox and len(bbox) >= 4:
-            x1, y1, x2, y2 = bbox[:4]
-            bw = max(1.0, float(x2 - x1))
-            bh = max(1.0, float(y2 - y1))
-            return ((x - x1) / bw, (y - y1) / bh)
-        return (x / max(1.0, float(w)), y / max(1.0, float(h)))
-
-    def _feat_xy(self, person: Dict[str, Any], size: Tuple[int, int]) -> np.ndarray:
-        w, h = size
-        pts = self._reorder_kpts(person.get("kpt", []))
-        bbox = person.get("bbox")
-
-        xy = np.zeros((NUM_KPTS * 2,), dtype=np.float32)
-        for i in range(NUM_KPTS):
-            if i < len(pts):
-                x, y, _c = pts[i]
-                xn, yn = self._norm_xy(float(x), float(y), w, h, bbox)
-                xy[2 * i] = xn
-                xy[2 * i + 1] = yn
-        return xy
-
-    def _feat_xyconf(self, person: Dict[str, Any], size: Tuple[int, int]) -> np.ndarray:
-        w, h = size
-        pts = self._reorder_kpts(person.get("kpt", []))
-        bbox = person.get("bbox")
-
-        X = np.zeros(NUM_KPTS, np.float32)
-        Y = np.zeros(NUM_KPTS, np.float32)
-        C = np.ones(NUM_KPTS, np.float32)
-
-        for i in range(NUM_KPTS):
-            if i < len(pts):
-                x, y, c = pts[i]
-                xn, yn = self._norm_xy(float(x), float(y), w, h, bbox)
-                X[i] = xn
-                Y[i] = yn
-                if c is not None:
-                    C[i] = float(c)
-
-        xy_interleaved = np.empty(NUM_KPTS * 2, np.float32)
-        xy_interleaved[0::2] = X
-        xy_interleaved[1::2] = Y
-        return np.concatenate([xy_interleaved, C], axis=0)
-
-    def _make_feat_vec(self, person: Dict[str, Any], size: Tuple[int, int]) -> np.ndarray:
-        if self.cfg.features == "xy":
-            vec = self._feat_xy(person, size)
-        else:
-            vec = self._feat_xyconf(person, size)
+        p = max(people, key=lambda p: (conf_mean(p), area(p)))
+        return p.get("kpt", []), p.get("bbox")
 
-        C = int(self.expected_C or self.cfg.input_channels or len(vec))
+    def _kpt_array(self, pts: Sequence[Sequence[float]]) -> Tuple[np.ndarray, int]:
+        """
+        키포인트 시퀀스 → kpt_order 적용된 (17,3) float64 배열 (conf 없음은 NaN), 원본 점 개수.
+        """
+        try:
+            a = np.asarray(pts, np.float64)
+        except (ValueError, TypeError):
+            a = None
+        if a is not None and a.shape == (NUM_KPTS, 3) and self.cfg.kpt_order is None:
+            return a, NUM_KPTS   # 일반 경로: 재배열/패딩 불필요
+
+        out = np.zeros((NUM_KPTS + 1, 3), np.float64)   # 마지막 행 = 누락점 패딩
+        out[:, 2] = np.nan
+        if a is not None and a.ndim == 2 and a.shape[1] >= 2:
+            n = min(a.shape[0], NUM_KPTS)
+            out[:n, :min(3, a.shape[1])] = a[:n, :3]
+        else:
+            n = min(len(pts), NUM_KPTS)
+            for i in range(n):
+                p = pts[i][:3]
+                out[i, :len(p)] = p
+        g = self._gather.get(n)
+        if g is None:
+            g = self._gather[n] = _gather_index(self.cfg.kpt_order, n)
+        return out[g], n
+
+    def _make_feat_vec(self, kpts, bbox, size: Tuple[int, int]) -> np.ndarray:
+        k, n = self._kpt_array(kpts)
+        vec = kpt_features(k, size, bbox, self.cfg.features, self.cfg.norm)
+        if self.cfg.kpt_order is None and n < NUM_KPTS:
+            # 원본보다 짧은 입력: 누락 점은 정규화 없이 (0, 0, 1)
+            vec[2 * n:2 * NUM_KPTS] = 0.0
+            if self.cfg.features != "xy":
+                vec[2 * NUM_KPTS + n:] = 1.0
+
+        C = self.ring.base
         if vec.shape[0] != C:
             out = np.zeros((C,), dtype=np.float32)
             n = min(C, vec.shape[0])
             out[:n] = vec[:n]
             vec = out
-        return vec.astype(np.float32)
+        return vec
 
-    def reset(self) -> None:
-        self.buf.clear()
-        self._ema = None
+    def new_state(self) -> TCNState:
+        """트랙별 상태 (DerivStage는 상태가 없어 공유)"""
+        return TCNState(FeatureRing(self._C, self._T, deriv=self.deriv))
 
-    def update(self, people: List[Dict[str, Any]], size: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+    def reset(self) -> None:
+        self._state.reset()
+
+    def windows(self, kpt: np.ndarray, bbox: np.ndarray, size: Tuple[int, int], step: int = 1) -> np.ndarray:
+        """
+        오프라인용: 프레임별 키포인트 (T,17,3) / bbox (T,4) → 창이 찬 뒤 step 프레임마다의
+        입력 창 (N,C,T) float32. 실시간 경로와 같은 피처/미분 처리를 거친다.
+        """
+        st = self.new_state()
+        out = []
+        for t in range(len(kpt)):
+            st.ring.push(self._make_feat_vec(kpt[t], bbox[t], size))
+            if len(st.ring) >= st.ring.T and (st.ring.pushed - st.ring.T) % max(1, int(step)) == 0:
+                out.append(st.ring.view()[0].copy())
+        if not out:
+            return np.zeros((0, self._C, self._T), np.float32)
+        return np.stack(out, axis=0)
+
+    def update(self, people, size: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+        """people: PoseFrame/People(선택 인덱스 사용) 또는 레거시 dict 리스트"""
         if self.ok is False or self.session is None:
             return None
 
@@ -235,19 +581,52 @@ class TCNOnnxClassifier:
             self.reset()
             return None
 
-        feat = self._make_feat_vec(person, size)
-        self.buf.append(feat)
-
-        T_need = int(self.expected_T or self.win)
-        if len(self.buf) < T_need:
-            return None
-
-        window = np.stack(list(self.buf)[-T_need:], axis=0)  # (T,C)
-        x = np.transpose(window[None, ...], (0, 2, 1)).astype(np.float32)  # (1,C,T)
+        return self.update_batch([(self._state, person[0], person[1])], size)[0]
 
+    def update_batch(self, items: Sequence[Tuple[TCNState, Any, Any]], size: Tuple[int, int]) -> List[Optional[Dict[str, Any]]]:
+        """
+        items: (상태, 키포인트, bbox) 목록. 각 상태의 창에 피처를 넣고,
+        창이 찬 상태들만 (N,C,T)로 쌓아 session.run 1회 → 항목별 결과(아직이면 None).
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        if self.ok is False or self.session is None:
+            return results
+        ready: List[int] = []
+        for i, (st, kpts, bbox) in enumerate(items):
+            st.ring.push(self._make_feat_vec(kpts, bbox, size))
+            if len(st.ring) >= st.ring.T:
+                ready.append(i)
+        if not ready:
+            return results
+
+        n = len(ready)
+        x = self._batch.get(n)
+        if x is None:
+            x = self._batch[n] = np.zeros((n, self._C, self._T), np.float32)
+        for j, i in enumerate(ready):
+            items[i][0].ring.view(out=x[j])
+
+        probs = self.infer(x) if self.scheduler is None else self.scheduler.run(x)
+        if probs is None:
+            return results
+        for j, i in enumerate(ready):
+            results[i] = self._finish(items[i][0], probs[j])
+        return results
+
+    def infer(self, x: np.ndarray) -> Optional[np.ndarray]:
+        """(N,C,T) 창 → (N,n_cls) 확률 (스무딩 전). 배치 추론이 안 되는 모델이면 1개씩."""
+        if self.max_batch == 1 and len(x) > 1:
+            return self._infer_rows(x)
         try:
-            out = self.session.run(None, {self.input_name: x})
-        except Exception:
+            out = self.session.run(None, {self.input_name: self._model_input(x)})
+        except Exception as e:
+            if len(x) > 1:
+                # 이번 호출만 1개씩 재시도 (일시적 오류로 배치 추론을 영구히 끄지 않음)
+                self._batch_fail += 1
+                if self._batch_fail == 1 or self._batch_fail % 100 == 0:
+                    print(f"[tcn] batched run failed (n={len(x)}, x{self._batch_fail}), "
+                          f"retrying one window at a time: {e}", flush=True)
+                return self._infer_rows(x)
             return None
 
         logits = np.asarray(out[0], dtype=np.float32)
@@ -271,15 +650,19 @@ class TCNOnnxClassifier:
             self.classes = (self.classes or [])[:n_cls]
             while len(self.classes) < n_cls:
                 self.classes.append(f"class_{len(self.classes)}")
+        return probs
 
-        probs_1d = probs[0]
+    def _infer_rows(self, x: np.ndarray) -> Optional[np.ndarray]:
+        rows = [self.infer(x[j:j + 1]) for j in range(len(x))]
+        return None if any(r is None for r in rows) else np.concatenate(rows, axis=0)
 
+    def _finish(self, st: TCNState, probs_1d: np.ndarray) -> Dict[str, Any]:
         if self.cfg.smooth > 1:
-            if self._ema is None:
-                self._ema = probs_1d
-            else:
-                self._ema = (1.0 - self._alpha) * self._ema + self._alpha * probs_1d
-            probs_1d = self._ema
+            f = st.filt
+            if f is None or f.shape != probs_1d.shape:
+                f = st.filt = make_filter(self._prob_filter_kind, probs_1d.shape, alpha=self._alpha,
+                                          win=self.cfg.smooth, freq=self.cfg.fps)
+            probs_1d = f(probs_1d).astype(np.float32)
 
         idx = int(np.argmax(probs_1d))
         score = float(probs_1d[idx])
@@ -0,0 +1,147 @@
+from __future__ import annotations
+from typing import Any, Callable, List, Optional
+import numpy as np
+
+from .label_smoother import LabelSmoother
+from .pose_types import People
+
+class Track:
+    """
+    추적 중인 1명. det는 이번 프레임에 매칭된 검출 인덱스 (-1이면 미검출).
+    conf: 최근 평균 키포인트 conf (EMA) — 코칭 대상 선택용
+    state: 소비자(분류기 등)가 붙이는 트랙별 상태 (예: TCNState)
+    """
+    __slots__ = ("id", "bbox", "det", "hits", "misses", "conf", "state", "labels", "result")
+
+    def __init__(self, tid: int, bbox: np.ndarray, det: int, state: Any = None, conf: float = 0.0):
+        self.id = tid
+        self.bbox = bbox.astype(np.float64)
+        self.det = det
+        self.hits = 1
+        self.conf = float(conf)
+        self.misses = 0
+        self.state = state
+        self.labels = LabelSmoother.from_settings()
+        self.result: Optional[dict] = None
+
+    @property
+    def area(self) -> float:
+        b = self.bbox
+        return max(0.0, b[2] - b[0]) * max(0.0, b[3] - b[1])
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """a (M,4), b (N,4) x1y1x2y2 → (M,N) IoU"""
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.maximum(0.0, ix2 - ix1) * np.maximum(0.0, iy2 - iy1)
+    area_a = np.maximum(0.0, a[:, 2] - a[:, 0]) * np.maximum(0.0, a[:, 3] - a[:, 1])
+    area_b = np.maximum(0.0, b[:, 2] - b[:, 0]) * np.maximum(0.0, b[:, 3] - b[:, 1])
+    uni = area_a[:, None] + area_b[None, :] - inter
+    return np.where(uni > 0, inter / np.where(uni > 0, uni, 1.0), 0.0)
+
+def _greedy(score: np.ndarray, ok: np.ndarray, t_free: np.ndarray, d_free: np.ndarray, higher: bool):
+    """score 순으로 (트랙, 검출) 쌍을 탐욕 매칭. ok=False 쌍은 제외."""
+    pairs = []
+    ti, di = np.nonzero(ok & t_free[:, None] & d_free[None, :])
+    if not len(ti):
+        return pairs
+    s = score[ti, di]
+    for k in np.argsort(-s if higher else s, kind="stable"):
+        t, d = int(ti[k]), int(di[k])
+        if t_free[t] and d_free[d]:
+            t_free[t] = d_free[d] = False
+            pairs.append((t, d))
+    return pairs
+
+class PoseTracker:
+    """
+    경량 IoU + 중심점 추적기 (프레임당 1회 update).
+      1) IoU >= iou_th 쌍을 IoU 큰 순으로 매칭
+      2) 남은 쌍은 중심 거리 / 트랙 bbox 대각선 <= dist_th 이면 가까운 순으로 매칭
+      3) 매칭 안 된 검출 → 새 트랙 (평균 conf 높은 순, max_tracks까지)
+      4) max_misses 프레임 연속 미검출 트랙 삭제
+    트랙 ID는 삭제 후에도 재사용하지 않는다.
+    코칭 대상(primary)은 기존 단일 인물 선택과 같은 기준 (최근 conf → bbox 면적),
+    현재 대상보다 conf가 switch_margin 이상 높아야 교체 (추적 길이는 동점 처리용).
+    """
+    def __init__(self, max_tracks: int = 4, iou_th: float = 0.3, dist_th: float = 0.5,
+                 max_misses: int = 15, make_state: Optional[Callable[[], Any]] = None,
+                 conf_alpha: float = 0.3, switch_margin: float = 0.05):
+        self.max_tracks = max(1, int(max_tracks))
+        self.iou_th = float(iou_th)
+        self.dist_th = float(dist_th)
+        self.max_misses = max(0, int(max_misses))
+        self.make_state = make_state
+        self.conf_alpha = float(conf_alpha)
+        self.switch_margin = float(switch_margin)
+        self.tracks: List[Track] = []
+        self._next_id = 1
+        self._primary: Optional[Track] = None
+
+    def reset(self) -> None:
+        self.tracks = []
+        self._primary = None
+
+    def update(self, people: People) -> List[Track]:
+        """people의 검출을 트랙에 배정 → 현재 트랙 목록 (track.det로 검출 인덱스 확인)"""
+        n = len(people)
+        tracks = self.tracks
+        for t in tracks:
+            t.det = -1
+        d_free = np.ones((n,), bool)
+        cm = people.conf_mean() if n else None
+        if tracks and n:
+            tb = np.array([t.bbox for t in tracks])
+            db = people.bbox.astype(np.float64)
+            t_free = np.ones((len(tracks),), bool)
+            iou = iou_matrix(tb, db)
+            pairs = _greedy(iou, iou >= self.iou_th, t_free, d_free, higher=True)
+            if t_free.any() and d_free.any():
+                tc = 0.5 * (tb[:, :2] + tb[:, 2:])
+                dc = 0.5 * (db[:, :2] + db[:, 2:])
+                diag = np.maximum(1.0, np.hypot(tb[:, 2] - tb[:, 0], tb[:, 3] - tb[:, 1]))
+                dist = np.hypot(*(tc[:, None, :] - dc[None, :, :]).transpose(2, 0, 1)) / diag[:, None]
+                pairs += _greedy(dist, dist <= self.dist_th, t_free, d_free, higher=False)
+            for ti, di in pairs:
+                t = tracks[ti]
+                t.det = di
+                t.bbox = db[di]
+                t.hits += 1
+                t.misses = 0
+                t.conf += self.conf_alpha * (float(cm[di]) - t.conf)
+
+        alive = []
+        for t in tracks:
+            if t.det < 0:
+                t.misses += 1
+                if t.misses > self.max_misses:
+                    continue
+            alive.append(t)
+
+        if d_free.any() and len(alive) < self.max_tracks:
+            for d in sorted(np.nonzero(d_free)[0].tolist(), key=lambda i: -cm[i]):
+                if len(alive) >= self.max_tracks:
+                    break
+                state = self.make_state() if self.make_state is not None else None
+                alive.append(Track(self._next_id, people.bbox[d], d, state, conf=float(cm[d])))
+                self._next_id += 1
+        self.tracks = alive
+        return alive
+
+    def primary(self) -> Optional[Track]:
+        """
+        코칭 대상: 이번 프레임에 검출된 트랙 중 (최근 conf, bbox 면적, 추적 길이) 최대.
+        이전 대상이 아직 검출 중이면 conf가 switch_margin 이상 높은 트랙이 있을 때만 교체.
+        """
+        seen = [t for t in self.tracks if t.det >= 0]
+        if not seen:
+            return None
+        best = max(seen, key=lambda t: (t.conf, t.area, t.hits))
+        cur = self._primary
+        if cur is not None and cur is not best and cur.det >= 0 and cur in self.tracks:
+            if best.conf < cur.conf + self.switch_margin:
+                best = cur
+        self._primary = best
+        return best
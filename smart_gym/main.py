@@ -6,6 +6,9 @@ from PySide6.QtGui import QShortcut, QKeySequence, QFontDatabase, QFont
 from PySide6.QtCore import Qt, QLocale
 from core.context import AppContext
 from core.router import Router
+from core.camera_hub import stop_hub
+from core.infer_scheduler import close_shared
+from core import latency
 
 from views.start_page import StartPage
 from views.exercise_page import ExercisePage
@@ -73,6 +76,10 @@ if __name__ == "__main__":
     set_app_font(font_path, 15)
 
     ctx = AppContext()
+    app.aboutToQuit.connect(ctx.cam.stop)
+    app.aboutToQuit.connect(stop_hub)
+    app.aboutToQuit.connect(close_shared)
+    app.aboutToQuit.connect(latency.dump)
     win = MainWindow(ctx)
     win.showFullScreen()  
     sys.exit(app.exec())
\ No newline at end of file
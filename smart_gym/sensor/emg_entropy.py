@@ -0,0 +1,73 @@
+"""
+emg_entropy.py — EMG 윈도 표본 엔트로피(SampEn) / 다중스케일 엔트로피(MSE)
+- sample_entropy: 템플릿 쌍 체비셰프 거리를 브로드캐스팅으로 한 번에 계산 (파이썬 이중 루프 없음)
+  길이 m 거리 행렬에 마지막 성분 거리만 max 해서 길이 m+1 행렬을 만든다
+- sample_entropy_ref: 기존 squat_service_dual 구현 (검증/벤치마크용)
+- 결과는 기존 구현과 비트 단위로 같다 (같은 float32 차분, 같은 dtype의 r 비교, 같은 쌍 집합)
+"""
+import numpy as np
+
+EPS = 1e-8
+
+_tri_cache: dict = {}
+
+def _upper(n: int) -> np.ndarray:
+    """(n,n) i<j 마스크 (캐시)"""
+    t = _tri_cache.get(n)
+    if t is None:
+        t = _tri_cache[n] = np.triu(np.ones((n, n), bool), 1)
+    return t
+
+def _count(D: np.ndarray, r) -> int:
+    # 기존 구현은 float32 스칼라 <= r 비교 → 그 비교와 같은 dtype으로 맞춤
+    dt = (np.float32(0) - r).dtype
+    ok = (D if D.dtype == dt else D.astype(dt)) <= dt.type(r)
+    return int(np.count_nonzero(ok & _upper(len(D))))
+
+def sample_entropy(x, m=2, r=None):
+    x=x.astype(np.float32); N=len(x)
+    if N<m+2: return 0.0
+    if r is None: r=0.2*np.std(x)+EPS
+    n = N - m + 1                      # 길이 m 템플릿 수 (0..N-m)
+    D = np.zeros((n, n), np.float32)
+    for k in range(m):
+        v = x[k:k+n]
+        np.maximum(D, np.abs(v[:, None] - v[None, :]), out=D)
+    B = _count(D, r)
+    n1 = n - 1                         # 길이 m+1 템플릿 수 (0..N-m-1)
+    v = x[m:m+n1]
+    A = _count(np.maximum(D[:n1, :n1], np.abs(v[:, None] - v[None, :])), r)
+    if B==0 or A==0: return 0.0
+    return float(-np.log((A+EPS)/(B+EPS)))
+
+def sample_entropy_ref(x, m=2, r=None):
+    x=x.astype(np.float32); N=len(x)
+    if N<m+2: return 0.0
+    if r is None: r=0.2*np.std(x)+EPS
+    def _phi(mm):
+        cnt=0
+        for i in range(N-mm):
+            xi=x[i:i+mm]
+            for j in range(i+1,N-mm+1):
+                if np.max(np.abs(xi-x[j:j+mm]))<=r: cnt+=1
+        return cnt
+    A=_phi(m+1); B=_phi(m)
+    if B==0 or A==0: return 0.0
+    return float(-np.log((A+EPS)/(B+EPS)))
+
+def coarse_grain(x, tau):
+    if tau<=1: return x
+    L=(len(x)//tau)*tau
+    if L==0: return x[:0]
+    return x[:L].reshape(-1,tau).mean(axis=1)
+
+def msesen(x, taus=(1,2,3,4), m=2, _sampen=sample_entropy):
+    vals=[]
+    for t in taus:
+        cg=coarse_grain(x,t)
+        if len(cg)<m+2: vals.append(0.0)
+        else: vals.append(_sampen(cg, m=m, r=0.2*np.std(cg)+EPS))
+    return float(np.mean(vals) if vals else 0.0)
+
+def msesen_ref(x, taus=(1,2,3,4), m=2):
+    return msesen(x, taus=taus, m=m, _sampen=sample_entropy_ref)
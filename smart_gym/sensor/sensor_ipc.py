@@ -0,0 +1,219 @@
+"""
+sensor_ipc.py — squat_service_dual ↔ ExercisePage 간 고정 레이아웃 레코드 채널
+- 전송: Unix 도메인 datagram 소켓 (레코드 1개 = datagram 1개, 경계 보존)
+- 구독자(ExercisePage)가 SOCK_PATH에 bind, 서비스는 sendto()만 (구독자가 없으면 버림)
+- 레코드: 헤더(magic, version, kind) + struct 고정 필드. 문자열(단계/등급)은 코드 테이블 인덱스
+- TSV는 AsyncTsvWriter로 별도 스레드에서 기록 (선택)
+
+서비스는 sensor/ 에서 스크립트로 실행되므로 이 모듈은 표준 라이브러리만 사용한다.
+"""
+import os, csv, queue, socket, struct, threading
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+SOCK_PATH = os.environ.get("SENSOR_SOCK", "/tmp/smart_gym_sensor.sock")
+
+MAGIC   = 0x5347   # "SG"
+VERSION = 1
+KIND_PRED = ord("P")
+KIND_IMU  = ord("I")
+
+# 문자열 필드 코드 테이블 (squat_service_dual의 단계 함수 출력과 동일한 문자열)
+FATIGUE_STAGES = ("A_정상", "B_주의", "C_보통", "D_피로", "E_심한피로")
+BI_STAGES      = ("A_매우균형", "B_양호", "C_보통", "D_불균형", "E_심한불균형")
+TEMPO_LEVELS   = ("A_매우안정", "B_안정", "C_보통", "D_불안정", "E_매우불안정")
+PHASES         = {-1: "DESC", 0: "HOLD", 1: "RISE"}
+
+# magic, version, kind | ts, rep_id, FI_L, FI_R, AIF, AI_RMS, AI_iEMG, BI, dir_score, stage_L, stage_R, BI_stage
+_PRED = struct.Struct("<HBBdI7f3Bx")
+# magic, version, kind | ts, ts_ms, side, state, rep_id, desc_ms, rise_ms, tempo_cv, pitch, pitch_vel, score, level
+_IMU  = struct.Struct("<HBBdIcbHHHfffBB")
+
+def _code(table: Sequence[str], s: str) -> int:
+    try:
+        return table.index(s)
+    except ValueError:
+        return 255
+
+def _name(table: Sequence[str], c: int) -> Optional[str]:
+    return table[c] if c < len(table) else None
+
+class PredRecord(NamedTuple):
+    ts: float
+    rep_id: int
+    fi_l: float
+    fi_r: float
+    aif: float
+    ai_rms: float
+    ai_iemg: float
+    bi: float
+    dir_score: float
+    stage_l: Optional[str]
+    stage_r: Optional[str]
+    bi_stage: Optional[str]
+
+    @property
+    def bi_text(self) -> str:
+        """squat_service_dual.bi_text 와 같은 문구"""
+        pct = int(round(max(0.0, min(1.0, self.bi))*100))
+        return (f"왼쪽이 오른쪽보다 {pct}% 불균형" if self.dir_score >= 0 else
+                f"오른쪽이 왼쪽보다 {pct}% 불균형")
+
+class ImuRecord(NamedTuple):
+    ts: float
+    ts_ms: int
+    side: str
+    state: int
+    rep_id: int
+    desc_ms: int
+    rise_ms: int
+    tempo_cv: float
+    pitch: float
+    pitch_vel: float
+    tempo_score: int
+    tempo_level: Optional[str]
+
+    @property
+    def imu_state(self) -> str:
+        return PHASES.get(self.state, "HOLD")
+
+def pack_pred(ts, rep_id, fi_l, fi_r, aif, ai_rms, ai_iemg, bi, dir_score,
+              stage_l, stage_r, bi_stage) -> bytes:
+    return _PRED.pack(MAGIC, VERSION, KIND_PRED, float(ts), int(rep_id) & 0xFFFFFFFF,
+                      fi_l, fi_r, aif, ai_rms, ai_iemg, bi, dir_score,
+                      _code(FATIGUE_STAGES, stage_l), _code(FATIGUE_STAGES, stage_r),
+                      _code(BI_STAGES, bi_stage))
+
+def pack_imu(ts, ts_ms, side, state, rep_id, desc_ms, rise_ms, tempo_cv, pitch, pitch_vel,
+             tempo_score, tempo_level) -> bytes:
+    return _IMU.pack(MAGIC, VERSION, KIND_IMU, float(ts), int(ts_ms) & 0xFFFFFFFF,
+                     str(side)[:1].encode("ascii", "replace") or b"?", int(state),
+                     int(rep_id) & 0xFFFF, int(desc_ms) & 0xFFFF, int(rise_ms) & 0xFFFF,
+                     tempo_cv, pitch, pitch_vel, max(0, min(255, int(tempo_score))),
+                     _code(TEMPO_LEVELS, tempo_level))
+
+def unpack(buf: bytes):
+    """datagram → PredRecord | ImuRecord | None (모르는 형식)"""
+    if len(buf) < 4:
+        return None
+    magic, ver, kind = struct.unpack_from("<HBB", buf, 0)
+    if magic != MAGIC or ver != VERSION:
+        return None
+    if kind == KIND_PRED and len(buf) == _PRED.size:
+        v = _PRED.unpack(buf)[3:]
+        return PredRecord(*v[:9], _name(FATIGUE_STAGES, v[9]), _name(FATIGUE_STAGES, v[10]),
+                          _name(BI_STAGES, v[11]))
+    if kind == KIND_IMU and len(buf) == _IMU.size:
+        v = list(_IMU.unpack(buf)[3:])
+        v[2] = v[2].decode("ascii", "replace")
+        v[11] = _name(TEMPO_LEVELS, v[11])
+        return ImuRecord(*v)
+    return None
+
+class SensorPublisher:
+    """서비스 측. 보내기는 non-blocking, 구독자가 없거나 큐가 차면 버린다 (dropped)."""
+    def __init__(self, path: str = SOCK_PATH):
+        self.path = path
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)
+        self.sent = 0
+        self.dropped = 0
+
+    def send(self, buf: bytes) -> bool:
+        try:
+            self._sock.sendto(buf, self.path)
+            self.sent += 1
+            return True
+        except OSError:   # FileNotFoundError / ConnectionRefusedError / BlockingIOError ...
+            self.dropped += 1
+            return False
+
+    def pred(self, *args) -> bool:
+        return self.send(pack_pred(*args))
+
+    def imu(self, *args) -> bool:
+        return self.send(pack_imu(*args))
+
+    def close(self) -> None:
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+class SensorSubscriber:
+    """
+    페이지 측. SOCK_PATH에 bind (남아 있는 이전 소켓 파일은 지움), non-blocking 수신.
+    fileno()를 QSocketNotifier 등에 연결해 읽을 수 있을 때 poll() 호출.
+    """
+    def __init__(self, path: str = SOCK_PATH):
+        self.path = path
+        if os.path.exists(path):
+            os.unlink(path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(path)
+        self._sock.setblocking(False)
+        self.received = 0
+        self.pred: Optional[PredRecord] = None
+        self.imu: Optional[ImuRecord] = None
+
+    def fileno(self) -> int:
+        return self._sock.fileno()
+
+    def poll(self, max_n: int = 1024) -> Tuple[int, int]:
+        """쌓인 datagram을 모두 읽어 최신 레코드만 유지 → (새 pred 수, 새 imu 수)"""
+        n_p = n_i = 0
+        for _ in range(max_n):
+            try:
+                buf = self._sock.recv(256)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                break
+            rec = unpack(buf)
+            if isinstance(rec, PredRecord):
+                self.pred = rec
+                n_p += 1
+            elif isinstance(rec, ImuRecord):
+                self.imu = rec
+                n_i += 1
+        self.received += n_p + n_i
+        return n_p, n_i
+
+    def close(self) -> None:
+        try:
+            self._sock.close()
+        finally:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+class AsyncTsvWriter:
+    """TSV append 를 전용 스레드에서 (큐가 빌 때마다 flush). 서비스 루프/BLE 콜백을 막지 않음."""
+    def __init__(self, path: str, header: List[str]):
+        new = not os.path.exists(path)
+        self._fp = open(path, "a", newline="")
+        self._wr = csv.writer(self._fp, delimiter="\t")
+        if new:
+            self._wr.writerow(header)
+            self._fp.flush()
+        self._q: "queue.SimpleQueue[Optional[list]]" = queue.SimpleQueue()
+        self._th = threading.Thread(target=self._loop, name="tsv-writer", daemon=True)
+        self._th.start()
+
+    def writerow(self, row: list) -> None:
+        self._q.put(row)
+
+    def _loop(self) -> None:
+        while True:
+            row = self._q.get()
+            if row is None:
+                break
+            self._wr.writerow(row)
+            if self._q.empty():
+                self._fp.flush()
+        self._fp.flush()
+
+    def close(self) -> None:
+        self._q.put(None)
+        self._th.join(timeout=2.0)
+        self._fp.close()
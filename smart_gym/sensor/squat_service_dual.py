@@ -5,13 +5,14 @@ squat_service_dual.py  (name-first BLE resolver, single-process service)
 - 윈도 특징 계산 + 캘리브(MVC/baseline) (좌/우 독립)
 - 멀티태스크 넘파이(.npz/.joblib) 또는 규칙식 추론
 - AIF/AI_RMS/AI_iEMG/BI + 단계/문구 산출
-- reps_pred_dual.tsv (AI 결과) + imu_tempo.tsv (IMU 템포/rep 등) 동시에 append
+- 결과 레코드를 Unix 소켓(sensor_ipc)으로 publish → ExercisePage가 구독
+- reps_pred_dual.tsv (AI 결과) + imu_tempo.tsv (IMU 템포/rep 등) 는 별도 스레드에서 append (--no-tsv로 끔)
 
 실행 예:
   python squat_service_dual.py --user-seq --imu-master L --pair-lag-ms 980 --debug
   python squat_service_dual.py --identity-scale --debug   # 스케일러 우회 테스트
 """
-import os, csv, time, json, struct, asyncio, argparse
+import os, time, json, struct, asyncio, argparse
 from collections import deque
 from typing import Dict, Optional
 import numpy as np
@@ -27,6 +28,13 @@ except Exception:
     joblib = None
 
 from bleak import BleakScanner, BleakClient
+
+try:
+    from sensor_ipc import SensorPublisher, AsyncTsvWriter, SOCK_PATH
+    from emg_entropy import sample_entropy, coarse_grain, msesen
+except ImportError:   # 패키지 경로로 import 된 경우
+    from sensor.sensor_ipc import SensorPublisher, AsyncTsvWriter, SOCK_PATH
+    from sensor.emg_entropy import sample_entropy, coarse_grain, msesen
 # ---------- graceful stop (SIGINT/SIGTERM) ----------
 STOP_EVENT: asyncio.Event | None = None
 
@@ -149,32 +157,7 @@ def mdf(x, fs=FS):
     if k>=len(f): return float(f[-1])
     c0,c1=c[k-1],c[k]; f0,f1=f[k-1],f[k]
     frac=(half-c0)/(c1-c0+1e-12); return float(f0+frac*(f1-f0))
-def sample_entropy(x, m=2, r=None):
-    x=x.astype(np.float32); N=len(x)
-    if N<m+2: return 0.0
-    if r is None: r=0.2*np.std(x)+EPS
-    def _phi(mm):
-        cnt=0
-        for i in range(N-mm):
-            xi=x[i:i+mm]
-            for j in range(i+1,N-mm+1):
-                if np.max(np.abs(xi-x[j:j+mm]))<=r: cnt+=1
-        return cnt
-    A=_phi(m+1); B=_phi(m)
-    if B==0 or A==0: return 0.0
-    return float(-np.log((A+EPS)/(B+EPS)))
-def coarse_grain(x, tau):
-    if tau<=1: return x
-    L=(len(x)//tau)*tau
-    if L==0: return x[:0]
-    return x[:L].reshape(-1,tau).mean(axis=1)
-def msesen(x, taus=(1,2,3,4), m=2):
-    vals=[]
-    for t in taus:
-        cg=coarse_grain(x,t)
-        if len(cg)<m+2: vals.append(0.0)
-        else: vals.append(sample_entropy(cg, m=m, r=0.2*np.std(cg)+EPS))
-    return float(np.mean(vals) if vals else 0.0)
+# sample_entropy / coarse_grain / msesen → emg_entropy.py (벡터화, 기존 결과와 동일)
 
 # ---------------------- calibrator ----------------------
 class Calibrator:
@@ -256,6 +239,11 @@ class SideEngine:
         self.latest = out
         return out
 
+class _NullWriter:
+    """--no-tsv 용"""
+    def writerow(self, row): pass
+    def close(self): pass
+
 # ---------------------- NumPy models & scalers ----------------------
 class DummyScaler:
     def transform(self, X): return X
@@ -421,32 +409,27 @@ async def run_service(name_l, name_r, user_id,
                       mac_l=None, mac_r=None,
                       imu_master="L",
                       pair_lag_s=0.35, stale_sec=None, pain_mode=None,
-                      debug=False, identity_scale=False):
+                      debug=False, identity_scale=False,
+                      tsv=True, ipc_sock=SOCK_PATH):
 
     scaler_mt = load_scaler(MT_SCALER_PATH, MT_SCALER_NPZ)
     _ = load_scaler(FI_SCALER_PATH, FI_SCALER_NPZ)
     mt_model  = load_mt_model()
     _ = load_fi_model()
 
-    # 결과 TSV 준비
-    new_pred = not os.path.exists(OUT_TSV)
-    fp_pred  = open(OUT_TSV, "a", newline="")
-    wr_pred  = csv.writer(fp_pred, delimiter="\t")
-    if new_pred:
-        wr_pred.writerow(["ts","user_id","rep_id","FI_L","FI_R","AIF","AI_RMS","AI_iEMG","BI",
-                          "stage_L","stage_R","BI_stage","BI_text"])
-
-    # IMU TSV 준비
-    new_imu = not os.path.exists(IMU_TSV)
-    fp_imu  = open(IMU_TSV, "a", newline="")
-    wr_imu  = csv.writer(fp_imu, delimiter="\t")
-    if new_imu:
-        wr_imu.writerow([
+    # 결과 채널: 소켓 publish (구독자 없으면 버림) + TSV (선택, 별도 스레드)
+    pub = SensorPublisher(ipc_sock) if ipc_sock else None
+    if tsv:
+        wr_pred = AsyncTsvWriter(OUT_TSV, ["ts","user_id","rep_id","FI_L","FI_R","AIF","AI_RMS","AI_iEMG","BI",
+                                           "stage_L","stage_R","BI_stage","BI_text"])
+        wr_imu = AsyncTsvWriter(IMU_TSV, [
             "ts_unix","user_id","side","ts_ms",
             "imu_state_num","imu_state","rep_id",
             "desc_ms","rise_ms","tempo_cv","tempo_score","tempo_level",
             "pitch_deg","pitch_vel_dps"
         ])
+    else:
+        wr_pred = wr_imu = _NullWriter()
 
     L = SideEngine("L"); R = SideEngine("R")
     PHASE_STR = { -1:"DESC", 0:"HOLD", 1:"RISE" }
@@ -475,17 +458,20 @@ async def run_service(name_l, name_r, user_id,
                     struct.unpack_from('<BIffbHHHf', data, 0)
                 side.feed_imu(ts_ms, pitch, pitch_vel, state, rep_id, desc_ms, rise_ms, tempo_cv)
 
-                # imu_tempo.tsv 즉시 기록
+                # publish + imu_tempo.tsv 기록
+                now = time.time()
                 state_str = PHASE_STR.get(int(state), "HOLD")
                 score = tempo_score_from_cv(tempo_cv)
                 level = tempo_level_from_score(score)
+                if pub:
+                    pub.imu(now, ts_ms, side.name, state, rep_id, desc_ms, rise_ms,
+                            tempo_cv, pitch, pitch_vel, score, level)
                 wr_imu.writerow([
-                    r2(time.time(),3), user_id, side.name, int(ts_ms),
+                    r2(now,3), user_id, side.name, int(ts_ms),
                     int(state), state_str, int(rep_id),
                     int(desc_ms), int(rise_ms), r2(tempo_cv,3), int(score), level,
                     r2(pitch,2), r2(pitch_vel,2)
                 ])
-                fp_imu.flush()
 
         await client.start_notify(UUID_TX, cb)
 
@@ -580,13 +566,15 @@ async def run_service(name_l, name_r, user_id,
                             0.4*(pl["diemg"] - pr["diemg"]) + \
                             0.2*(FI_L - FI_R)
 
+                st_l, st_r, st_bi = fatigue_stage(FI_L), fatigue_stage(FI_R), bi_stage(BI)
+                if pub:
+                    pub.pred(ts_out, rep_id, FI_L, FI_R, AIF, AI_RMS, AI_iEMG, BI, dir_score,
+                             st_l, st_r, st_bi)
                 wr_pred.writerow([
                     f"{ts_out:.3f}", user_id, rep_id,
                     r2(FI_L), r2(FI_R), r2(AIF), r2(AI_RMS), r2(AI_iEMG), r2(BI),
-                    fatigue_stage(FI_L), fatigue_stage(FI_R),
-                    bi_stage(BI), bi_text(BI, dir_score)
+                    st_l, st_r, st_bi, bi_text(BI, dir_score)
                 ])
-                fp_pred.flush()
 
                 if debug:
                     print(f"[PRED] rep={rep_id}  FI_L={r2(FI_L)}  FI_R={r2(FI_R)}  "
@@ -598,8 +586,10 @@ async def run_service(name_l, name_r, user_id,
             except: pass
             try: await cr.stop_notify(UUID_TX)
             except: pass
-            fp_pred.close()
-            fp_imu.close()
+            wr_pred.close()
+            wr_imu.close()
+            if pub:
+                pub.close()
 
 # ---------------------- CLI ----------------------
 def parse_args():
@@ -628,6 +618,12 @@ def parse_args():
     ap.add_argument("--identity-scale", action="store_true",
                     help="표준화(스케일러) 우회하고 원시 특징 그대로 사용")
 
+    # 결과 출력 채널
+    ap.add_argument("--ipc-sock", default=SOCK_PATH,
+                    help="결과 레코드를 보낼 Unix 소켓 경로 (빈 문자열이면 끔)")
+    ap.add_argument("--no-tsv", action="store_true",
+                    help="reps_pred_dual.tsv / imu_tempo.tsv 기록 끔")
+
     return ap.parse_args()
 
 def next_user_id(seq_file=os.path.join(BASE_DIR,"user_seq.json"), prefix="user"):
@@ -655,7 +651,9 @@ def main():
                     stale_sec=args.stale_sec,
                     pain_mode=args.pain_mode,
                     debug=args.debug,
-                    identity_scale=args.identity_scale)
+                    identity_scale=args.identity_scale,
+                    tsv=not args.no_tsv,
+                    ipc_sock=args.ipc_sock)
     )
 
 if __name__ == "__main__":
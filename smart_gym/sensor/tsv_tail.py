@@ -0,0 +1,134 @@
+"""
+tsv_tail.py — 계속 append 되는 TSV 로그(reps_pred_dual.tsv / imu_tempo.tsv)의 증분 리더
+- 파일 오프셋을 기억하고 새로 추가된 바이트만 읽어 파싱 (tail -F 방식)
+- 잘림(크기 < 오프셋) 또는 교체(inode 변경) → 다시 열기
+- (다시) 열 때는 헤더 + 끝에서 init_bytes만 읽음 (오래 쌓인 로그 전체를 읽지 않음)
+- 마지막 줄이 아직 덜 쓰였으면(개행 없음) 다음 poll까지 보류
+- 최근 keep개 행을 문자열 행 + float 배열(파싱 불가 NaN)로 유지
+"""
+import os
+from collections import deque
+from typing import Dict, List, Optional
+import numpy as np
+
+class TsvTail:
+    def __init__(self, path, keep: int = 64, init_bytes: int = 64 * 1024, encoding: str = "utf-8"):
+        self.path = str(path)
+        self.keep = max(1, int(keep))
+        self.init_bytes = max(0, int(init_bytes))
+        self.encoding = encoding
+        self.header: List[str] = []
+        self._col: Dict[str, int] = {}
+        self._rows: deque = deque(maxlen=self.keep)
+        self._vals: Optional[np.ndarray] = None      # (keep, ncols) 링
+        self._n = 0                                  # 누적 행 수
+        self._ino = None
+        self._off = 0
+        self._rest = b""
+
+    def reset(self) -> None:
+        """다음 poll()에서 파일을 다시 열어 끝부분(init_bytes)부터 읽는다"""
+        self._ino = None
+        self._off = 0
+        self._rest = b""
+        self._rows.clear()
+        self._n = 0
+
+    # --- 읽기 ---
+    def _read_header(self, f) -> int:
+        f.seek(0)
+        line = f.readline()
+        if not line.endswith(b"\n"):
+            return 0
+        self.header = line.decode(self.encoding, "replace").rstrip("\r\n").split("\t")
+        self._col = {c: i for i, c in enumerate(self.header)}
+        self._vals = np.full((self.keep, len(self.header)), np.nan)
+        return len(line)
+
+    def _reopen(self, f, st) -> None:
+        """새 파일(또는 잘린 파일): 헤더 읽고 끝에서 init_bytes 지점부터"""
+        self._ino = st.st_ino
+        self._rest = b""
+        self.header, self._col, self._vals = [], {}, None
+        self._rows.clear()
+        self._n = 0
+        start = self._read_header(f)
+        if not self.header:
+            self._off = 0
+            return
+        off = max(start, st.st_size - self.init_bytes)
+        if off > start:
+            f.seek(off - 1)
+            if f.read(1) != b"\n":           # 줄 중간이면 다음 줄부터
+                f.readline()
+            off = f.tell()
+        self._off = off
+
+    def poll(self) -> int:
+        """새로 추가된 완성 행 수 (파일 없음 → 0)"""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return 0
+        if self._ino is not None and st.st_ino == self._ino and st.st_size == self._off:
+            return 0
+        with open(self.path, "rb") as f:
+            if self._ino != st.st_ino or st.st_size < self._off or not self.header:
+                self._reopen(f, st)
+                if not self.header:
+                    return 0
+            f.seek(self._off)
+            data = f.read(st.st_size - self._off)
+        self._off += len(data)
+        data = self._rest + data
+        cut = data.rfind(b"\n") + 1
+        self._rest = data[cut:]
+        if cut == 0:
+            return 0
+        lines = data[:cut].decode(self.encoding, "replace").splitlines()
+        lines = [ln for ln in lines[-self.keep:] if ln]
+        for ln in lines:
+            self._push(ln.split("\t"))
+        return len(lines)
+
+    def _push(self, row: List[str]) -> None:
+        self._rows.append(row)
+        v = self._vals[self._n % self.keep]
+        v[:] = np.nan
+        for i, s in enumerate(row[:len(v)]):
+            try:
+                v[i] = float(s)
+            except ValueError:
+                pass
+        self._n += 1
+
+    # --- 조회 ---
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def last(self) -> Optional[List[str]]:
+        """가장 최근 행 (문자열 필드 목록)"""
+        return self._rows[-1] if self._rows else None
+
+    def last_dict(self) -> Optional[Dict[str, str]]:
+        row = self.last()
+        return None if row is None else dict(zip(self.header, row))
+
+    def rows(self) -> List[List[str]]:
+        """최근 행들 (오래된 → 최신)"""
+        return list(self._rows)
+
+    def values(self) -> np.ndarray:
+        """최근 행들의 float 배열 (n, ncols), 오래된 → 최신"""
+        n = len(self._rows)
+        if self._vals is None or n == 0:
+            return np.zeros((0, len(self.header)))
+        idx = (np.arange(self._n - n, self._n)) % self.keep
+        return self._vals[idx]
+
+    def column(self, name: str) -> np.ndarray:
+        """최근 행들의 한 열 (n,) float, 없는 열이면 빈 배열"""
+        i = self._col.get(name)
+        if i is None:
+            return np.zeros((0,))
+        return self.values()[:, i]
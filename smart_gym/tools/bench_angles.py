@@ -0,0 +1,69 @@
+"""
+관절 각도 배치 계산 벤치마크: 프레임별 compute_joint_angles 루프 vs compute_joint_angles_batch.
+결과는 벡터화 이전 스칼라 구현(compute_joint_angles_ref)과 대조한다.
+
+  cd smart_gym
+  python3 -m tools.bench_angles --frames 100000
+  python3 -m tools.bench_angles --source session.npz     # 녹화 키포인트(*.npz / *.kplog) 사용
+"""
+from __future__ import annotations
+import argparse, time
+
+import numpy as np
+
+from core.evaluators.pose_angles import (
+    compute_joint_angles, compute_joint_angles_batch, compute_joint_angles_ref,
+)
+
+def _load(path: str):
+    """녹화 로그 → 프레임별 첫 번째 사람 (T,17,2), (T,17)"""
+    from core.pose_replay import KeypointReplaySource
+    src = KeypointReplaySource.from_file(path)
+    kpt = src.kpt[src.n > 0, 0]
+    return kpt[:, :, :2], kpt[:, :, 2]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--source", default="", help="*.npz / *.kplog (없으면 난수 포즈)")
+    ap.add_argument("--frames", type=int, default=100000)
+    ap.add_argument("--kpts", type=int, default=17, choices=(17, 33))
+    ap.add_argument("--conf-thr", type=float, default=0.2)
+    ap.add_argument("--legacy-frames", type=int, default=5000, help="프레임별 루프 측정 프레임 수")
+    args = ap.parse_args()
+
+    if args.source:
+        kxy, kcf = _load(args.source)
+        reps = max(1, -(-args.frames // max(1, len(kxy))))
+        kxy = np.tile(kxy, (reps, 1, 1))[:args.frames]
+        kcf = np.tile(kcf, (reps, 1))[:args.frames]
+    else:
+        rng = np.random.default_rng(0)
+        kxy = np.trunc(rng.uniform(0, 640, (args.frames, args.kpts, 2))).astype(np.float32)
+        kcf = rng.uniform(0, 1, (args.frames, args.kpts)).astype(np.float32)
+    T = len(kxy)
+
+    n_old = min(T, args.legacy_frames)
+    t0 = time.perf_counter()
+    ref = [compute_joint_angles(kxy[t], kcf[t], conf_thr=args.conf_thr) for t in range(n_old)]
+    fps_old = n_old / (time.perf_counter() - t0)
+
+    compute_joint_angles_batch(kxy[:16], kcf[:16], conf_thr=args.conf_thr)
+    t0 = time.perf_counter()
+    out = compute_joint_angles_batch(kxy, kcf, conf_thr=args.conf_thr)
+    fps_new = T / (time.perf_counter() - t0)
+
+    n_chk = 0
+    for t in range(n_old):
+        gold = compute_joint_angles_ref(kxy[t], kcf[t], conf_thr=args.conf_thr)
+        for k, v in gold.items():
+            for w in (ref[t][k], out[k][t]):
+                w = np.nan if w is None else w
+                assert (v is None) == bool(np.isnan(w)) and (v is None or abs(v - w) < 1e-6), (t, k, v, w)
+                n_chk += 1
+
+    print(f"frames={T} K={kxy.shape[1]}  (scalar ref 대조 {n_chk} 값 일치)")
+    print(f"  per-frame loop : {fps_old:12,.0f} frames/s  ({n_old} frames)")
+    print(f"  batch          : {fps_new:12,.0f} frames/s  (x{fps_new / max(fps_old, 1e-9):.0f})")
+
+if __name__ == "__main__":
+    main()
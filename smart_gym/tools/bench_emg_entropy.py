@@ -0,0 +1,62 @@
+"""
+EMG 엔트로피 벤치마크: 기존 파이썬 루프(sample_entropy_ref) vs 벡터화(sample_entropy).
+  1) 무작위/양자화(동점 많음) EMG 윈도에서 결과가 완전히 같은지 확인
+  2) 윈도(WIN=125)당 sampen / msesen 시간, 서비스 1 hop(좌/우 2측) 비용
+
+  cd smart_gym
+  python3 -m tools.bench_emg_entropy --windows 200
+"""
+from __future__ import annotations
+import argparse, time
+
+import numpy as np
+
+from sensor.emg_entropy import msesen, msesen_ref, sample_entropy, sample_entropy_ref
+
+def _windows(n: int, win: int, seed: int = 0):
+    """int16 ADC 값처럼 양자화한 EMG 유사 윈도 (서비스와 같은 전처리: float32, 평균 제거)"""
+    rng = np.random.default_rng(seed)
+    out = []
+    for k in range(n):
+        amp = rng.uniform(5, 300)
+        x = rng.normal(0, amp, win) * (1 + 0.5 * np.sin(np.arange(win) / rng.uniform(3, 20)))
+        x = np.round(x).astype(np.int16).astype(np.float32)
+        x -= np.mean(x)
+        out.append(x)
+    return out
+
+def _time(fn, xs, repeat: int = 1) -> float:
+    """윈도당 평균 ms"""
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for x in xs:
+            fn(x)
+    return (time.perf_counter() - t0) * 1000.0 / (repeat * len(xs))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--windows", type=int, default=200, help="검증/측정 윈도 수")
+    ap.add_argument("--win", type=int, default=125, help="윈도 길이 (서비스 WIN)")
+    ap.add_argument("--ref-windows", type=int, default=20, help="기존 구현 측정에 쓸 윈도 수 (느림)")
+    args = ap.parse_args()
+
+    xs = _windows(args.windows, args.win)
+    bad = 0
+    for x in xs:
+        for m in (1, 2, 3):
+            bad += sample_entropy(x, m=m) != sample_entropy_ref(x, m=m)
+        bad += msesen(x) != msesen_ref(x)
+    print(f"check: {len(xs)} windows x (sampen m=1,2,3 + msesen)  mismatches={bad}")
+
+    ref_xs = xs[:max(1, args.ref_windows)]
+    s_ref = _time(sample_entropy_ref, ref_xs)
+    s_new = _time(sample_entropy, xs, repeat=5)
+    m_ref = _time(msesen_ref, ref_xs)
+    m_new = _time(msesen, xs, repeat=5)
+    print(f"sampen  ref {s_ref:9.3f} ms/win   vec {s_new:7.3f} ms/win   x{s_ref / s_new:7.1f}")
+    print(f"msesen  ref {m_ref:9.3f} ms/win   vec {m_new:7.3f} ms/win   x{m_ref / m_new:7.1f}")
+    hop_ref, hop_new = 2 * (s_ref + m_ref), 2 * (s_new + m_new)
+    print(f"per hop (L+R, sampen+msesen): ref {hop_ref:8.2f} ms   vec {hop_new:6.3f} ms   (hop = 125 ms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+TCN 배치 추론 벤치마크.
+  1) 배치 크기 × intra-op 스레드 수별 처리량 (창/초, 배치당 ms)
+  2) InferScheduler: 소스 여러 개가 동시에 창을 제출할 때 처리량 / 평균 배치 / 지연
+
+  cd smart_gym
+  python3 -m tools.bench_infer --batches 1,2,4,8,16 --threads 1,2,4 --sources 4
+"""
+from __future__ import annotations
+import argparse, os, threading, time
+
+import numpy as np
+
+from core import settings as S
+from core.infer_scheduler import InferScheduler, default_threads
+from core.tcn_classifier import TCNOnnxClassifier
+
+def _ints(s: str):
+    return [int(v) for v in s.split(",") if v.strip()]
+
+def _sweep(clf: TCNOnnxClassifier, batches, seconds: float):
+    rng = np.random.default_rng(0)
+    C, T = clf._C, clf._T
+    for n in batches:
+        x = rng.random((n, C, T), dtype=np.float32)
+        clf.infer(x)
+        k = 0
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < seconds:
+            clf.infer(x)
+            k += 1
+        dt = time.perf_counter() - t0
+        print(f"    batch={n:<3d} {k * n / dt:10.1f} win/s   {dt / k * 1000.0:8.2f} ms/batch")
+
+def _sched(clf: TCNOnnxClassifier, sources: int, max_batch: int, deadline_ms: float, seconds: float):
+    sch = InferScheduler(clf.infer, max_batch=max_batch, deadline_ms=deadline_ms)
+    C, T = clf._C, clf._T
+    lat = []
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def source(seed: int):
+        x = np.random.default_rng(seed).random((C, T), dtype=np.float32)
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            sch.submit(x).result()
+            with lock:
+                lat.append((time.perf_counter() - t0) * 1000.0)
+
+    ths = [threading.Thread(target=source, args=(i,), daemon=True) for i in range(sources)]
+    t0 = time.perf_counter()
+    for th in ths:
+        th.start()
+    time.sleep(seconds)
+    stop.set()
+    for th in ths:
+        th.join()
+    dt = time.perf_counter() - t0
+    sch.close()
+    p50, p95 = np.percentile(lat, (50, 95)) if lat else (0.0, 0.0)
+    print(f"    sources={sources:<2d} {len(lat) / dt:10.1f} win/s   mean batch {sch.mean_batch:5.2f}   "
+          f"latency p50 {p50:6.2f} ms  p95 {p95:6.2f} ms")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--onnx", default=S.TCN_ONNX)
+    ap.add_argument("--json", default=S.TCN_JSON)
+    ap.add_argument("--batches", default="1,2,4,8,16")
+    ap.add_argument("--threads", default=f"1,{default_threads()}")
+    ap.add_argument("--sources", type=int, default=4, help="스케줄러 동시 소스 수 (0이면 생략)")
+    ap.add_argument("--max-batch", type=int, default=S.TCN_MAX_BATCH)
+    ap.add_argument("--deadline-ms", type=float, default=S.TCN_DEADLINE_MS)
+    ap.add_argument("--seconds", type=float, default=1.0, help="측정 항목당 시간")
+    args = ap.parse_args()
+
+    print(f"cpu={os.cpu_count()}  default_threads={default_threads()}")
+    for th in sorted(set(_ints(args.threads))):
+        clf = TCNOnnxClassifier(args.onnx, args.json, threads=th)
+        print(f"  intra_op_threads={th}")
+        _sweep(clf, _ints(args.batches), args.seconds)
+        if args.sources > 0:
+            for n in sorted({1, args.sources}):
+                _sched(clf, n, args.max_batch, args.deadline_ms, args.seconds)
+
+if __name__ == "__main__":
+    main()
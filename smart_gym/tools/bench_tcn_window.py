@@ -0,0 +1,57 @@
+"""
+TCN 입력 창 구성 마이크로벤치마크: deque + np.stack + transpose (기존) vs FeatureRing (원형 버퍼).
+
+  cd smart_gym
+  python3 -m tools.bench_tcn_window --channels 51 --win 60 --iters 20000
+"""
+from __future__ import annotations
+import argparse, time
+from collections import deque
+
+import numpy as np
+
+from core.tcn_classifier import FeatureRing
+
+def _bench(fn, iters: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        fn()
+    return (time.perf_counter() - t0) / iters * 1e6
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--channels", type=int, default=51)
+    ap.add_argument("--win", type=int, default=60)
+    ap.add_argument("--iters", type=int, default=20000)
+    args = ap.parse_args()
+    C, T = args.channels, args.win
+
+    rng = np.random.default_rng(0)
+    feats = rng.standard_normal((T * 2, C)).astype(np.float32)
+
+    buf: deque = deque(maxlen=T)
+    ring = FeatureRing(C, T)
+    for v in feats[:T]:
+        buf.append(v); ring.push(v)
+    state = {"old": T, "new": T}
+
+    def legacy():
+        buf.append(feats[state["old"] % len(feats)])
+        state["old"] += 1
+        window = np.stack(list(buf)[-T:], axis=0)
+        return np.transpose(window[None, ...], (0, 2, 1)).astype(np.float32)
+
+    def ringbuf():
+        ring.push(feats[state["new"] % len(feats)])
+        state["new"] += 1
+        return ring.view()
+
+    assert np.array_equal(legacy(), ringbuf())
+    us_old = _bench(legacy, args.iters)
+    us_new = _bench(ringbuf, args.iters)
+    print(f"C={C} T={T}")
+    print(f"  deque+stack+transpose : {us_old:8.2f} us/frame")
+    print(f"  FeatureRing push+view : {us_new:8.2f} us/frame  (x{us_old / max(us_new, 1e-9):.1f})")
+
+if __name__ == "__main__":
+    main()
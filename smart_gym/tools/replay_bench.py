@@ -0,0 +1,108 @@
+"""
+리플레이 벤치마크: 녹화 키포인트(*.npz) 또는 영상을 HailoPoseStream(TCN) → 각도 → 평가기 전체 경로로 재생.
+
+  cd smart_gym
+  python3 -m tools.replay_bench session.npz --speed 0 --expect squat=10 --expect pushup=8
+
+출력: 처리 프레임 수/FPS, 라벨별 프레임 수, 운동별 카운트·평균 점수 (및 --expect 대비 오차, --latency 단계별 지연)
+"""
+from __future__ import annotations
+import argparse, contextlib, io, time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+
+from core import latency
+from core.hailo_pose_stream import HailoPoseStream
+from core.pose_types import PoseFrame
+from core.evaluators import get_evaluator_by_label
+from core.evaluators.pose_angles import SMOOTH_KEYS, update_meta_with_angles
+from core.filters import angle_filter
+
+class _EvalRunner:
+    """ExerciseFrameWorker 의 라벨 → 평가기 전환/카운트 로직을 그대로 재현"""
+    def __init__(self, quiet: bool = True):
+        self.quiet = quiet
+        self.frames = 0
+        self.tcn = 0
+        self.labels: Counter = Counter()
+        self.reps: Counter = Counter()
+        self.scores: Dict[str, list] = {}
+        self._evaluator = None
+        self._last_label: Optional[str] = None
+        self._angle_filter = angle_filter(len(SMOOTH_KEYS))
+
+    def __call__(self, frame, people: PoseFrame, cls, size):
+        self.frames += 1
+        if isinstance(cls, dict) and "label" in cls:
+            self.tcn += 1
+        label = ((cls.get("label_smooth") or cls.get("label")) if isinstance(cls, dict) else None) or "idle"
+        self.labels[label] += 1
+
+        meta: Dict[str, Any] = {"ok": bool(people), "label": label, "src_w": size[0], "src_h": size[1]}
+        if people:
+            ti = people.target
+            update_meta_with_angles(meta, people.kxy(ti), people.kcf(ti), conf_thr=0.5,
+                                    raw=people.angles(ti), filt=self._angle_filter)
+
+        if label != self._last_label:
+            self._last_label = label
+            self._evaluator = get_evaluator_by_label(label) if label != "idle" else None
+            if self._evaluator:
+                self._evaluator.reset()
+        if not self._evaluator:
+            return
+
+        out = io.StringIO() if self.quiet else None
+        with (contextlib.redirect_stdout(out) if out else contextlib.nullcontext()):
+            res = self._evaluator.update(meta)
+        if res and res.rep_inc:
+            self.reps[label] += int(res.rep_inc)
+        if res and res.score is not None:
+            self.scores.setdefault(label, []).append(float(res.score))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("source", help="*.npz 키포인트 로그 또는 영상 파일")
+    ap.add_argument("--speed", type=float, default=0.0, help="0: 최대 속도, 1: 실시간")
+    ap.add_argument("--stride", type=int, default=1)
+    ap.add_argument("--conf-thr", type=float, default=0.65)
+    ap.add_argument("--expect", action="append", default=[], help="label=reps (정확도 비교)")
+    ap.add_argument("--verbose", action="store_true", help="평가기 디버그 출력 표시")
+    ap.add_argument("--latency", action="store_true", help="단계별 지연 p50/p95/p99 출력")
+    args = ap.parse_args()
+
+    runner = _EvalRunner(quiet=not args.verbose)
+    stream = HailoPoseStream(conf_thr=args.conf_thr, stride=args.stride,
+                             source=args.source, speed=args.speed, on_result=runner)
+    t0 = time.perf_counter()
+    stream.start()
+    try:
+        while not stream.wait_done(0.5):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stream.stop()
+    dt = time.perf_counter() - t0
+
+    print(f"frames={runner.frames}  tcn_results={runner.tcn}  wall={dt:.2f}s  fps={runner.frames/max(dt,1e-9):.1f}")
+    print("labels:", dict(runner.labels.most_common()))
+    for lb, n in runner.reps.most_common():
+        sc = runner.scores.get(lb) or []
+        avg = (sum(sc) / len(sc)) if sc else 0.0
+        print(f"  {lb:<20} reps={n:<4} avg_score={avg:.1f}")
+
+    errs = []
+    for item in args.expect:
+        lb, _, n = item.partition("=")
+        want, got = int(n), runner.reps.get(lb, 0)
+        errs.append(abs(got - want) / max(want, 1))
+        print(f"  expect {lb}: want={want} got={got}")
+    if errs:
+        print(f"count_accuracy={100.0 * (1.0 - sum(errs) / len(errs)):.1f}%")
+    if args.latency:
+        latency.dump()
+
+if __name__ == "__main__":
+    main()
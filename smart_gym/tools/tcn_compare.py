@@ -0,0 +1,75 @@
+"""
+TCN 모델 변형(opt / int8) 정확도·지연 비교 하네스.
+녹화 키포인트를 실시간 경로와 같은 입력 창으로 만들어 fp32와 각 변형을 모두 돌리고
+  - fp32 예측 클래스별 일치율 (변형의 argmax == fp32 argmax)
+  - 확률 최대 오차
+  - 창 1개(batch 1) 추론 지연 p50 / p95
+를 출력한다.
+
+  cd smart_gym
+  python3 -m tools.tcn_compare rec1.kplog rec2.npz --variants opt,int8
+"""
+from __future__ import annotations
+import argparse, time
+
+import numpy as np
+
+from core import settings as S
+from core.tcn_classifier import TCNOnnxClassifier
+from tools.tcn_quantize import load_windows
+
+def _latency(clf: TCNOnnxClassifier, x: np.ndarray, n: int):
+    ms = []
+    for i in range(min(n, len(x))):
+        t0 = time.perf_counter()
+        clf.infer(x[i:i + 1])
+        ms.append((time.perf_counter() - t0) * 1000.0)
+    return np.percentile(ms, (50, 95))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("recordings", nargs="+", help="*.kplog / *.npz")
+    ap.add_argument("--onnx", default=S.TCN_ONNX)
+    ap.add_argument("--json", default=S.TCN_JSON)
+    ap.add_argument("--variants", default="opt,int8")
+    ap.add_argument("--step", type=int, default=1)
+    ap.add_argument("--threads", type=int, default=1)
+    ap.add_argument("--latency-windows", type=int, default=300)
+    args = ap.parse_args()
+
+    ref = TCNOnnxClassifier(args.onnx, args.json, threads=args.threads)
+    x = load_windows(args.recordings, ref, step=args.step)
+    if not len(x):
+        raise SystemExit("no windows (recordings too short?)")
+    classes = ref.classes
+    ref.infer(x[:1])
+    p_ref = np.concatenate([ref.infer(x[i:i + 64]) for i in range(0, len(x), 64)], axis=0)
+    y_ref = p_ref.argmax(axis=1)
+    l50, l95 = _latency(ref, x, args.latency_windows)
+    print(f"windows={len(x)}")
+    print(f"{'fp32':<6} agree 100.00%   max|dp| 0.0000   latency p50 {l50:6.2f} ms  p95 {l95:6.2f} ms")
+
+    rows = []
+    for v in [s.strip() for s in args.variants.split(",") if s.strip()]:
+        clf = TCNOnnxClassifier(args.onnx, args.json, threads=args.threads, variant=v)
+        if clf.variant != v:
+            print(f"{v:<6} (not available)")
+            continue
+        clf.infer(x[:1])
+        p = np.concatenate([clf.infer(x[i:i + 64]) for i in range(0, len(x), 64)], axis=0)
+        y = p.argmax(axis=1)
+        l50, l95 = _latency(clf, x, args.latency_windows)
+        print(f"{v:<6} agree {100.0 * (y == y_ref).mean():6.2f}%   max|dp| {np.abs(p - p_ref).max():.4f}   "
+              f"latency p50 {l50:6.2f} ms  p95 {l95:6.2f} ms")
+        rows.append((v, y))
+
+    if rows:
+        print()
+        print(f"{'class (fp32)':<20} {'n':>6} " + " ".join(f"{v:>8}" for v, _ in rows))
+        for c in np.unique(y_ref):
+            m = y_ref == c
+            print(f"{classes[c]:<20} {int(m.sum()):>6} " +
+                  " ".join(f"{100.0 * (y[m] == c).mean():7.2f}%" for _v, y in rows))
+
+if __name__ == "__main__":
+    main()
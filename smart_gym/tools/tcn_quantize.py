@@ -0,0 +1,100 @@
+"""
+TCN 모델 변형 생성: 그래프 최적화(opt) + INT8 정적 양자화(int8).
+보정 데이터는 녹화 키포인트(*.kplog / *.npz)에서 실시간 경로와 같은 방식으로 만든 입력 창.
+출력은 기본적으로 런타임 캐시 경로(variant_path)에 저장 → TCN_VARIANT=opt|int8 로 바로 사용.
+
+  cd smart_gym
+  python3 -m tools.tcn_quantize rec1.kplog rec2.kplog --step 5 --max-windows 2000
+"""
+from __future__ import annotations
+import argparse, os, tempfile
+from typing import List
+
+import numpy as np
+
+from core import settings as S
+from core.pose_replay import KeypointReplaySource
+from core.tcn_classifier import TCNOnnxClassifier, optimize_model, variant_path
+
+def load_windows(paths: List[str], clf: TCNOnnxClassifier, step: int = 1) -> np.ndarray:
+    """녹화 파일들 → (N,C,T) 입력 창 (프레임별 평균 conf 최대 1인)"""
+    out = []
+    for path in paths:
+        src = KeypointReplaySource.from_file(path)
+        valid = np.nonzero(src.n > 0)[0]
+        if not len(valid):
+            continue
+        conf = src.kpt[valid, :, :, 2].mean(axis=2)
+        conf[np.arange(src.kpt.shape[1])[None, :] >= src.n[valid, None]] = -1.0
+        best = conf.argmax(axis=1)
+        out.append(clf.windows(src.kpt[valid, best], src.bbox[valid, best], src.size, step=step))
+    if not out:
+        return np.zeros((0, clf._C, clf._T), np.float32)
+    return np.concatenate(out, axis=0)
+
+def to_model_layout(clf: TCNOnnxClassifier, x: np.ndarray) -> np.ndarray:
+    return x if clf.channels_first else np.ascontiguousarray(x.transpose(0, 2, 1))
+
+class _Reader:
+    """onnxruntime.quantization.CalibrationDataReader 호환"""
+    def __init__(self, name: str, x: np.ndarray):
+        self.name = name
+        self.x = x
+        self.i = 0
+
+    def get_next(self):
+        if self.i >= len(self.x):
+            return None
+        self.i += 1
+        return {self.name: self.x[self.i - 1:self.i]}
+
+    def rewind(self):
+        self.i = 0
+
+def quantize_int8(src: str, dst: str, clf: TCNOnnxClassifier, windows: np.ndarray, per_channel: bool = True) -> str:
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
+    with tempfile.TemporaryDirectory() as td:
+        pre = os.path.join(td, "pre.onnx")
+        quant_pre_process(src, pre, skip_symbolic_shape=True)
+        tmp = dst + ".tmp.onnx"
+        quantize_static(
+            pre, tmp, _Reader(clf.input_name, to_model_layout(clf, windows)),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=per_channel,
+            calibrate_method=CalibrationMethod.MinMax,
+        )
+        os.replace(tmp, dst)
+    return dst
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("recordings", nargs="+", help="보정용 *.kplog / *.npz")
+    ap.add_argument("--onnx", default=S.TCN_ONNX)
+    ap.add_argument("--json", default=S.TCN_JSON)
+    ap.add_argument("--step", type=int, default=5, help="창 추출 간격 (프레임)")
+    ap.add_argument("--max-windows", type=int, default=2000)
+    ap.add_argument("--no-per-channel", action="store_true")
+    ap.add_argument("--skip-opt", action="store_true")
+    ap.add_argument("--out-int8", default="", help="기본: 런타임 캐시 경로")
+    args = ap.parse_args()
+
+    clf = TCNOnnxClassifier(args.onnx, args.json)
+    x = load_windows(args.recordings, clf, step=args.step)
+    if not len(x):
+        raise SystemExit("no calibration windows (recordings too short?)")
+    if len(x) > args.max_windows:
+        x = x[np.linspace(0, len(x) - 1, args.max_windows).astype(np.int64)]
+    print(f"calibration windows: {len(x)}  shape={x.shape[1:]}")
+
+    if not args.skip_opt:
+        print("opt  ->", optimize_model(args.onnx, variant_path(args.onnx, "opt")))
+    dst = args.out_int8 or variant_path(args.onnx, "int8")
+    print("int8 ->", quantize_int8(args.onnx, dst, clf, x, per_channel=not args.no_per_channel))
+
+if __name__ == "__main__":
+    main()
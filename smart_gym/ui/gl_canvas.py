@@ -0,0 +1,108 @@
+from typing import Optional
+import numpy as np
+from PySide6.QtCore import Qt, QRectF, QLineF, QSize
+from PySide6.QtGui import QColor, QImage, QPainter, QPen
+
+from ui.overlay_painter import VideoCanvas
+
+try:
+    from PySide6.QtOpenGLWidgets import QOpenGLWidget
+    HAS_GL = True
+except Exception:
+    from PySide6.QtWidgets import QWidget as QOpenGLWidget
+    HAS_GL = False
+
+class GLVideoSurface(QOpenGLWidget):
+    """
+    프레임을 텍스처로 올려 GPU에서 cover/contain 스케일 후 그리는 표면.
+    스켈레톤은 프레임 좌표계 선분 (M,4) [x1,y1,x2,y2] 를 벡터로 그린다
+    (프레임 버퍼에 그리지 않으므로 CPU 복사/그리기 없음).
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._img: Optional[QImage] = None
+        self._lines: Optional[np.ndarray] = None
+        self._fit_mode = "cover"
+        self.line_color = QColor(144, 238, 144)
+        self.line_width = 2.0      # 프레임 픽셀 기준 (화면에서는 함께 스케일됨)
+
+    def set_fit_mode(self, mode: str):
+        self._fit_mode = "cover" if str(mode).lower() == "cover" else "contain"
+        self.update()
+
+    def set_image(self, qimage: Optional[QImage], lines: Optional[np.ndarray] = None):
+        self._img = qimage
+        self._lines = lines
+        self.update()
+
+    def _target_rect(self, w: int, h: int) -> QRectF:
+        W, H = self.width(), self.height()
+        sx, sy = W / w, H / h
+        s = max(sx, sy) if self._fit_mode == "cover" else min(sx, sy)
+        dw, dh = w * s, h * s
+        return QRectF((W - dw) / 2.0, (H - dh) / 2.0, dw, dh)
+
+    def paintGL(self):
+        p = QPainter(self)
+        p.fillRect(self.rect(), Qt.black)
+        img = self._img
+        if img is not None and not img.isNull() and self.width() > 0 and self.height() > 0:
+            w, h = img.width(), img.height()
+            dst = self._target_rect(w, h)
+            # GL 페인트 엔진: 이미지 → 텍스처 업로드, 스케일/크롭은 GPU 샘플링(선형 필터)
+            p.setRenderHint(QPainter.SmoothPixmapTransform, True)
+            p.drawImage(dst, img)
+
+            lines = self._lines
+            if lines is not None and len(lines):
+                p.setRenderHint(QPainter.Antialiasing, True)
+                p.translate(dst.x(), dst.y())
+                p.scale(dst.width() / w, dst.height() / h)
+                p.setPen(QPen(self.line_color, self.line_width, Qt.SolidLine, Qt.RoundCap))
+                p.drawLines([QLineF(x1, y1, x2, y2) for x1, y1, x2, y2 in lines.tolist()])
+        p.end()
+
+class GLVideoCanvas(VideoCanvas):
+    """
+    VideoCanvas와 같은 API (오버레이 그리드/fit mode/set_frame) 에
+    QLabel 대신 GLVideoSurface를 영상 레이어로 사용.
+    gpu=True: 프레임은 원본 크기 그대로, 스켈레톤은 set_frame(lines=...)로 받는다.
+    """
+    gpu = True
+
+    def __init__(self, min_size: QSize | None = None, parent=None):
+        super().__init__(min_size, parent)
+        old = self._video
+        self._video = GLVideoSurface(self)
+        if min_size:
+            self._video.setMinimumSize(min_size)
+        old.hide()
+        old.deleteLater()
+        self._video.lower()
+        self._video.set_fit_mode(self._fit_mode)
+
+    def set_fit_mode(self, mode: str):
+        super().set_fit_mode(mode)
+        self._video.set_fit_mode(self._fit_mode)
+
+    def _position_layers(self):
+        rect = self._compute_target_rect()
+        self._video.setGeometry(rect)
+        self._overlay_root.setGeometry(rect)
+        self._overlay_root.raise_()
+
+    def set_frame(self, qimage: QImage, owner=None, copy: bool = True, lines: Optional[np.ndarray] = None):
+        """owner 규칙은 VideoCanvas.set_frame과 동일. lines: 프레임 좌표계 스켈레톤 선분 (M,4)"""
+        prev_owner, self._owner = self._owner, owner
+        if qimage is None or qimage.isNull():
+            self._last_qimage = None
+            self._img_w = self._img_h = None
+            self._video.set_image(None)
+            if prev_owner is not None: prev_owner.release()
+            return
+        self._last_qimage = qimage if (owner is not None or not copy) else qimage.copy()
+        self._img_w = self._last_qimage.width()
+        self._img_h = self._last_qimage.height()
+        self._video.set_image(self._last_qimage, lines)
+        # 이전 프레임 텍스처는 다음 paintGL에서 교체되므로 여기서 버퍼를 돌려줘도 된다
+        if prev_owner is not None: prev_owner.release()
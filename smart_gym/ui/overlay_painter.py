@@ -9,6 +9,7 @@ class VideoCanvas(QWidget):
         "center-left": (1,0), "center": (1,1), "center-right": (1,2),
         "bottom-left": (2,0), "bottom-center": (2,1), "bottom-right": (2,2),
     }
+    gpu = False   # True면 스케일/스켈레톤을 캔버스가 직접 처리 (ui.gl_canvas.GLVideoCanvas)
 
     def __init__(self, min_size: QSize | None = None, parent=None):
         super().__init__(parent)
@@ -38,6 +39,7 @@ class VideoCanvas(QWidget):
                 grid.addWidget(self._cells[r][c], r, c, alignment=v_align)
 
         self._last_qimage: QImage | None = None
+        self._owner = None   # QImage가 참조하는 버퍼(FrameBuffer) 수명 유지용
         self._img_w = None
         self._img_h = None
 
@@ -58,19 +60,34 @@ class VideoCanvas(QWidget):
 
         if self._last_qimage is not None and rect.width() > 0 and rect.height() > 0:
             aspect_flag = Qt.KeepAspectRatioByExpanding if self._fit_mode == "cover" else Qt.KeepAspectRatio
-            pm = QPixmap.fromImage(self._last_qimage).scaled(
-                rect.width(), rect.height(), aspect_flag, Qt.SmoothTransformation
-            )
+            img = self._last_qimage
+            size = img.size().scaled(rect.width(), rect.height(), aspect_flag)
+            pm = QPixmap.fromImage(img)
+            if size != img.size():   # 이미 표시 크기로 스케일된 프레임이면 그대로 사용
+                pm = pm.scaled(size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
             self._video.setPixmap(pm)
             self._video.setAlignment(Qt.AlignCenter)
 
-    def set_frame(self, qimage: QImage):
+    @property
+    def fit_mode(self) -> str:
+        return self._fit_mode
+
+    def set_frame(self, qimage: QImage, owner=None, copy: bool = True, lines=None):
+        """
+        owner가 주어지면 qimage는 owner 버퍼를 직접 참조하는 것으로 보고 복사하지 않는다.
+        owner(retain()/release() 지원)는 다음 프레임이 들어올 때 release 된다.
+        copy=False: qimage가 자체 데이터를 가진 경우 (예: 워커 스레드에서 스케일한 프레임)
+        lines: 스켈레톤 선분 — gpu 캔버스 전용, 여기서는 무시 (프레임에 이미 그려져 있음)
+        """
+        prev_owner, self._owner = self._owner, owner
         if qimage is None or qimage.isNull():
             self._last_qimage = None
             self._img_w = self._img_h = None
             self._video.clear()
+            if prev_owner is not None: prev_owner.release()
             return
-        self._last_qimage = qimage.copy()
+        self._last_qimage = qimage if (owner is not None or not copy) else qimage.copy()
+        if prev_owner is not None: prev_owner.release()
         self._img_w = self._last_qimage.width()
         self._img_h = self._last_qimage.height()
         self._position_layers()
@@ -427,10 +427,10 @@ class EnrollPage(PageBase):
     def on_enter(self, ctx):
         self.ctx = ctx
 
-        # 기존 cam 정지
+        # 포즈 cam → 얼굴 스트림 전환
         try:
             if hasattr(self.ctx, "cam") and self.ctx.cam:
-                self.ctx.cam.stop()
+                self.ctx.cam.yield_camera()
         except Exception:
             pass
 
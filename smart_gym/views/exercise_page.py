@@ -1,23 +1,26 @@
 import time
-import cv2
 import sys
 import os, subprocess, signal
-import numpy as np
 from pathlib import Path
 from datetime import datetime
 
-from PySide6.QtCore import QTimer ,QUrl
+from PySide6.QtCore import QTimer ,QUrl, QSocketNotifier
 from PySide6.QtGui import QImage, QColor
 from PySide6.QtWidgets import QVBoxLayout
 from PySide6.QtMultimedia import QSoundEffect
 
-from core.evaluators.pose_angles import update_meta_with_angles
 from core.page_base import PageBase
 from core.hailo_cam_adapter import HailoCamAdapter
-from core.evaluators import get_evaluator_by_label, EvalResult, ExerciseEvaluator, get_advice_with_sfx  
+from core import settings as S
+from core.latency import STATS as LAT
+from core.evaluators import EvalResult, get_advice_with_sfx
 
 from ui.score_painter import ScoreOverlay
 from ui.overlay_painter import VideoCanvas, ExerciseCard, ScoreAdvicePanel, ActionButtons, AIMetricsPanel
+from ui.gl_canvas import GLVideoCanvas, HAS_GL
+from views.exercise_worker import ExerciseFrameWorker, FrameResult
+from sensor.sensor_ipc import SensorSubscriber
+from sensor.tsv_tail import TsvTail
 
 PROJ_ROOT = Path("~/workspace/python/smart_gym_project/app").expanduser().resolve()
 
@@ -80,7 +83,7 @@ class ExercisePage(PageBase):
 
         self._svc_proc = None
 
-        self.canvas = VideoCanvas()
+        self.canvas = GLVideoCanvas() if (S.UI_GL_CANVAS and HAS_GL) else VideoCanvas()
         self.canvas.setContentsMargins(0, 0, 0, 0)
         self.canvas.set_fit_mode("cover")
 
@@ -103,22 +106,25 @@ class ExercisePage(PageBase):
         self.score_overlay.setGeometry(self.rect())
         self.score_overlay.raise_()
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self._tick)
-        self.PAGE_FPS_MS = 33
+        # 프레임 그리기/각도/평가는 전용 스레드, GUI 스레드는 결과 표시만
+        self._worker = ExerciseFrameWorker(self)
+        self._worker.gpu = self.canvas.gpu
+        self._worker.ready.connect(self._on_frame)
 
         self.ai_timer = QTimer(self)
         self.ai_timer.timeout.connect(self._poll_tsv)
         self.AI_POLL_MS = 250
 
         self._title_hold = {"label": None, "cnt": 0}
-        self._evaluator: ExerciseEvaluator | None = None
         self._last_eval_label: str | None = None
 
-        self._last_pred_size = 0
-        self._last_imu_size = 0
+        # 소켓 레코드가 없을 때(이전 버전 서비스) 쓰는 TSV 증분 리더
+        self._pred_tail = TsvTail(PRED_TSV, keep=8)
+        self._imu_tail = TsvTail(IMU_TSV, keep=8)
+        # 센서 서비스 결과 구독 (소켓으로 받은 적이 있으면 TSV는 읽지 않음)
+        self._sensor_sub: SensorSubscriber | None = None
+        self._sensor_notifier: QSocketNotifier | None = None
 
-        self._angles_prev = None
         self._tempo_level_latest: str | None = None
 
         self._sfx_enabled = True
@@ -275,41 +281,67 @@ class ExercisePage(PageBase):
                 self.ai_panel.set_imu(tempo_score=None, tempo_level=None, imu_state=None)
                 return 
 
-            if PRED_TSV.exists():
-                sz = PRED_TSV.stat().st_size
-                if sz != self._last_pred_size and sz > 0:
-                    self._last_pred_size = sz
-                    with PRED_TSV.open("r", encoding="utf-8") as f:
-                        lines = f.readlines()
-                    if len(lines) >= 2:
-                        last = lines[-1].strip().split("\t")
-                        fi_l     = float(last[3]) if len(last) > 3 else None
-                        fi_r     = float(last[4]) if len(last) > 4 else None
-                        bi       = float(last[8]) if len(last) > 8 else None
-                        stage_l  = last[9]  if len(last) > 9  else None
-                        stage_r  = last[10] if len(last) > 10 else None
-                        bi_stage = last[11] if len(last) > 11 else None
-                        bi_text  = last[12] if len(last) > 12 else None
-                        self.ai_panel.set_ai(fi_l=fi_l, fi_r=fi_r, stage_l=stage_l, stage_r=stage_r,
-                                             bi=bi, bi_stage=bi_stage, bi_text=bi_text)
-
-            if IMU_TSV.exists():
-                sz2 = IMU_TSV.stat().st_size
-                if sz2 != self._last_imu_size and sz2 > 0:
-                    self._last_imu_size = sz2
-                    with IMU_TSV.open("r", encoding="utf-8") as f:
-                        lines2 = f.readlines()
-                    if len(lines2) >= 2:
-                        last2 = lines2[-1].strip().split("\t")
-                        imu_state   = last2[5] if len(last2) > 5 else None
-                        tempo_score = int(float(last2[10])) if len(last2) > 10 else None
-                        tempo_level = last2[11] if len(last2) > 11 else None
-                        self.ai_panel.set_imu(tempo_score=tempo_score,
-                                              tempo_level=tempo_level, imu_state=imu_state)
-                        self._tempo_level_latest = tempo_level
+            sub = self._sensor_sub
+            if sub is not None and sub.received:
+                p, m = sub.pred, sub.imu
+                if p is not None:
+                    self.ai_panel.set_ai(fi_l=p.fi_l, fi_r=p.fi_r, stage_l=p.stage_l, stage_r=p.stage_r,
+                                         bi=p.bi, bi_stage=p.bi_stage, bi_text=p.bi_text)
+                if m is not None:
+                    self.ai_panel.set_imu(tempo_score=m.tempo_score,
+                                          tempo_level=m.tempo_level, imu_state=m.imu_state)
+                    self._tempo_level_latest = m.tempo_level
+                return
+
+            if self._pred_tail.poll():
+                last = self._pred_tail.last()
+                if last:
+                    fi_l     = float(last[3]) if len(last) > 3 else None
+                    fi_r     = float(last[4]) if len(last) > 4 else None
+                    bi       = float(last[8]) if len(last) > 8 else None
+                    stage_l  = last[9]  if len(last) > 9  else None
+                    stage_r  = last[10] if len(last) > 10 else None
+                    bi_stage = last[11] if len(last) > 11 else None
+                    bi_text  = last[12] if len(last) > 12 else None
+                    self.ai_panel.set_ai(fi_l=fi_l, fi_r=fi_r, stage_l=stage_l, stage_r=stage_r,
+                                         bi=bi, bi_stage=bi_stage, bi_text=bi_text)
+
+            if self._imu_tail.poll():
+                last2 = self._imu_tail.last()
+                if last2:
+                    imu_state   = last2[5] if len(last2) > 5 else None
+                    tempo_score = int(float(last2[10])) if len(last2) > 10 else None
+                    tempo_level = last2[11] if len(last2) > 11 else None
+                    self.ai_panel.set_imu(tempo_score=tempo_score,
+                                          tempo_level=tempo_level, imu_state=imu_state)
+                    self._tempo_level_latest = tempo_level
         except Exception:
             pass  
 
+    def _open_sensor_ipc(self):
+        self._close_sensor_ipc()
+        try:
+            self._sensor_sub = SensorSubscriber()
+        except OSError as e:
+            print("[ExercisePage] sensor ipc unavailable:", e)
+            return
+        self._sensor_notifier = QSocketNotifier(self._sensor_sub.fileno(), QSocketNotifier.Read, self)
+        self._sensor_notifier.activated.connect(self._drain_sensor_ipc)
+
+    def _drain_sensor_ipc(self, *_):
+        # 읽을 수 있을 때마다 비워 둠 (소켓 큐가 짧음), 화면 갱신은 _poll_tsv 주기로
+        if self._sensor_sub is not None:
+            self._sensor_sub.poll()
+
+    def _close_sensor_ipc(self):
+        if self._sensor_notifier is not None:
+            self._sensor_notifier.setEnabled(False)
+            self._sensor_notifier.deleteLater()
+            self._sensor_notifier = None
+        if self._sensor_sub is not None:
+            self._sensor_sub.close()
+            self._sensor_sub = None
+
     def _info_clicked(self):
         try:
             if hasattr(self.ctx, "goto_profile"):
@@ -326,7 +358,6 @@ class ExercisePage(PageBase):
         self._reset_state()
         self._init_per_stats()
 
-        self._evaluator = None
         self._last_eval_label = None
         self._no_person_since = None
         self._entered_at = time.time()
@@ -339,7 +370,10 @@ class ExercisePage(PageBase):
         self.ai_panel.set_ai(fi_l=None, fi_r=None, stage_l=None, stage_r=None, bi=None, bi_stage=None, bi_text=None)
 
         try:
-            self.ctx.face.stop_stream()
+            if S.SHARED_CAMERA and S.FACE_REID_FPS > 0:
+                self.ctx.face.start_stream(rate=S.FACE_REID_FPS)   # 운동 중 저속 재식별
+            else:
+                self.ctx.face.stop_stream()
         except Exception:
             pass
 
@@ -347,16 +381,19 @@ class ExercisePage(PageBase):
             self.ctx.cam = HailoCamAdapter()
         self.ctx.cam.start()
         print("[ExercisePage 임정민2] cam started")
+        self._open_sensor_ipc()
         self._start_service_if_needed()
         
         
         self._active = True
-        if self.timer.isActive():
-            self.timer.stop()
-        self.timer.start(self.PAGE_FPS_MS)
+        self._stop_worker()
+        self._worker.cam = self.ctx.cam
+        self._worker.reset()
+        self._sync_worker_view()
+        self._worker.start()
 
-        self._last_pred_size = 0
-        self._last_imu_size = 0
+        self._pred_tail.reset()   # 다시 열어 마지막 행부터 표시
+        self._imu_tail.reset()
 
         if self.ai_timer.isActive():
             self.ai_timer.stop()
@@ -364,30 +401,38 @@ class ExercisePage(PageBase):
 
     def on_leave(self, ctx):
         self._active = False
-        if self.timer.isActive(): self.timer.stop()
+        self._stop_worker()
         if self.ai_timer.isActive(): self.ai_timer.stop()
         try:
-            ctx.cam.stop()
+            ctx.cam.pause()
         except Exception:
             pass
 
         self._stop_service()
+        self._close_sensor_ipc()
 
+        self.canvas.set_frame(None)   # 표시 중인 풀 버퍼 반환
         self.canvas.clear_overlays()
-        self._evaluator = None
         self._last_eval_label = None
 
+    def _stop_worker(self):
+        self._worker.stop()
+
+    def _sync_worker_view(self):
+        self._worker.set_view(self.canvas.width(), self.canvas.height(), self.canvas.fit_mode)
+
     # End Button
     def _end_clicked(self):
         self._active = False
-        if self.timer.isActive(): self.timer.stop()
+        self._stop_worker()
         if self.ai_timer.isActive(): self.ai_timer.stop()
         try:
-            self.ctx.cam.stop()
+            self.ctx.cam.pause()
         except Exception:
             pass
 
         self._stop_service()
+        self._close_sensor_ipc()
 
         summary = self._build_summary()
         try:
@@ -395,86 +440,54 @@ class ExercisePage(PageBase):
         except Exception:
             pass
         if hasattr(self.ctx, "goto_summary"): self.ctx.goto_summary(summary)
+        self.canvas.set_frame(None)
         self.canvas.clear_overlays()
 
-    # Tick (기존 포즈 & 점수 로직 유지)
-    def _tick(self):
-        if not self._active or not self.timer.isActive():
+    # 워커 결과 (GUI 스레드: 표시 + 위젯 갱신만)
+    def _on_frame(self):
+        qimg, r, events = self._worker.take()
+        if r is None:
+            return
+        if not self._active or r.session != self._worker.session:
+            r.release()   # 이전 세션 결과
             return
 
-        meta = self.ctx.cam.meta() or {}
         now = time.time()
         in_grace = (now - self._entered_at) < self.NO_PERSON_GRACE_SEC
-
-        m_ok = bool(meta.get("ok", False))
         if in_grace:
             self._no_person_since = None
         else:
-            if not m_ok:
+            if not r.ok:
                 if self._no_person_since is None:
                     self._no_person_since = now
                 elif (now - self._no_person_since) >= self.NO_PERSON_TIMEOUT_SEC:
+                    r.release()
                     self._active = False
+                    self._stop_worker()
                     try:
-                        if self.timer.isActive(): self.timer.stop()
-                    except Exception:
-                        pass
-                    try:
-                        self.ctx.cam.stop()
+                        self.ctx.cam.pause()
                     except Exception:
                         pass
                     self._stop_service()
+                    self._close_sensor_ipc()
+                    self.canvas.set_frame(None)
                     self._no_person_since = None
                     self._goto("guide")
                     return
             else:
                 self._no_person_since = None
 
-        frame = self.ctx.cam.frame()
-        if frame is not None:
-            try:
-                bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                people = self.ctx.cam.people()
-                EDGES = [(5,7),(7,9),(6,8),(8,10),(5,6),(11,12),(5,11),(6,12),(11,13),(13,15),(12,14),(14,16)]
-                if people:
-                    H, W = bgr.shape[:2]
-                    max_len2 = (max(W, H)*0.6) ** 2
-                    LINE_COLOR = (144, 238, 144)
-                    for p in people:
-                        pts = p.get("kpt", [])
-                        vis = [len(pt)>=3 and float(pt[2])>=0.65 for pt in pts]
-                        for a,b in EDGES:
-                            if a<len(pts) and b<len(pts) and vis[a] and vis[b]:
-                                x1_,y1_ = int(pts[a][0]), int(pts[a][1])
-                                x2_,y2_ = int(pts[b][0]), int(pts[b][1])
-                                dx,dy = x1_-x2_, y1_-y2_
-                                if (dx*dx + dy*dy) <= max_len2:
-                                    cv2.line(bgr, (x1_,y1_), (x2_,y2_), LINE_COLOR, 2)
-
-                try:
-                    if people:
-                        kpt = people[0].get("kpt", [])
-                        if kpt and len(kpt) >= 17:
-                            kxy = np.array([[pt[0], pt[1]] for pt in kpt], dtype=np.float32)
-                            kcf = np.array([(pt[2] if len(pt) > 2 else 1.0) for pt in kpt], dtype=np.float32)
-                            angles = update_meta_with_angles(
-                                meta, kxy, kcf, conf_thr=0.5, ema=0.2,
-                                prev=getattr(self, "_angles_prev", None),
-                            )
-                            self._angles_prev = angles
-                            meta["_kpt"] = kpt
-                except Exception:
-                    pass
-
-                frame_rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
-                h, w, ch = frame_rgb.shape
-                qimg = QImage(frame_rgb.data, w, h, ch * w, QImage.Format_RGB888).copy()
-                if self._active:
-                    self.canvas.set_frame(qimg)
-            except cv2.error:
-                return
+        if r.frame_id < 0:
+            return   # 새 프레임 없음 (타임아웃 확인용 결과)
 
-        raw_label = meta.get("label", None)
+        if not qimg.isNull():
+            self.canvas.set_frame(qimg, owner=r.owner, copy=False, lines=r.lines)
+            r.owner = None
+            LAT.since("paint", r.t_emit)
+            if r.stamps is not None:
+                LAT.since("e2e", r.stamps.get("cb"))
+
+        raw_label = r.raw_label
         title_kor = _LABEL_KO.get(raw_label, (raw_label if raw_label else "휴식중"))
         hold = self._title_hold
         if hold["label"] != title_kor:
@@ -486,33 +499,30 @@ class ExercisePage(PageBase):
             self.card.set_title(title_kor)
             self._last_label = title_kor
 
-        label = raw_label if raw_label else "idle"
-        if self._last_eval_label != label:
+        label = r.label
+        if r.label_changed:
             self._last_eval_label = label
-            self._evaluator = get_evaluator_by_label(label) if label not in (None, "idle") else None
-            if self._evaluator: 
-                self._evaluator.reset()
-
             if label != "squat":
                 self.ai_panel.set_ai(fi_l=None, fi_r=None, stage_l=None, stage_r=None,
                                     bi=None, bi_stage=None, bi_text=None)
                 self.ai_panel.set_imu(tempo_score=None, tempo_level=None, imu_state=None)
                 self._tempo_level_latest = None
 
-        if label in (None, "idle") or not self._evaluator:
-            self.panel.set_advice("올바른 자세로 준비하세요.")
-            return
+        # rep/점수는 합쳐진(건너뛴) 프레임 것까지 이벤트 큐로 받는다
+        for ev_label, ev_res in events:
+            self._apply_eval_event(ev_label, ev_res)
 
-        try:
-            res: EvalResult = self._evaluator.update(meta)
-        except Exception:
-            return
-        if not res:
+        if label in (None, "idle") or not r.has_evaluator:
+            self.panel.set_advice("올바른 자세로 준비하세요.")
             return
 
-        if res.advice:
+        res: EvalResult = r.res
+        if res and res.advice:
             self.panel.set_advice(res.advice)
-             # --- 점수에 따른 SFX 재생 (선택) ---
+
+    def _apply_eval_event(self, label: str, res: EvalResult):
+        """rep 증가/점수 이벤트 1건 반영 (SFX, 카운트, 점수 오버레이, 통계)"""
+        # --- 점수에 따른 SFX 재생 (선택) ---
         if res.score is not None:
             try:
                 _text_unused, _bucket, sfx_key = get_advice_with_sfx(label, int(res.score), ctx=None)
@@ -588,6 +598,7 @@ class ExercisePage(PageBase):
         self._sync_panel_sizes()
         self.score_overlay.setGeometry(self.rect())
         self.score_overlay.raise_()
+        self._sync_worker_view()
 
     # Reset State
     def _reset_state(self):
@@ -597,8 +608,7 @@ class ExercisePage(PageBase):
         self.panel.set_avg(0)
         self.panel.set_advice("올바른 자세로 준비하세요.")
         self._tempo_level_latest = None 
-        if self._evaluator:
-            self._evaluator.reset()
+        self._worker.reset()
 
         self.ai_panel.set_imu(tempo_score=None, tempo_level=None, imu_state=None)
         self.ai_panel.set_ai(fi_l=None, fi_r=None, stage_l=None, stage_r=None, bi=None, bi_stage=None, bi_text=None)
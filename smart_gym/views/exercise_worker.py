@@ -0,0 +1,296 @@
+import time
+import threading
+from collections import deque
+import numpy as np
+
+from PySide6.QtCore import Qt, QThread, Signal, QLineF
+from PySide6.QtGui import QColor, QImage, QPainter, QPen
+
+from core.evaluators.pose_angles import SMOOTH_KEYS, update_meta_with_angles
+from core.filters import angle_filter
+from core.latency import STATS as LAT, now as lat_now
+from core.evaluators import get_evaluator_by_label, EvalResult, ExerciseEvaluator
+
+EDGES = [(5,7),(7,9),(6,8),(8,10),(5,6),(11,12),(5,11),(6,12),(11,13),(13,15),(12,14),(14,16)]
+_EA = np.array([a for a, _ in EDGES])
+_EB = np.array([b for _, b in EDGES])
+LINE_COLOR = (144, 238, 144)
+
+def skeleton_lines(pose, W: int, H: int, conf: float = 0.65) -> np.ndarray:
+    """
+    그릴 스켈레톤 선분 (M,4) int32 [x1,y1,x2,y2] (프레임 좌표).
+    양 끝 conf >= conf 이고 길이 <= 긴 변의 0.6 인 선분만 (튀는 키포인트 제외).
+    """
+    if not pose:
+        return np.zeros((0, 4), np.int32)
+    xy = pose.kpt[:, :, :2].astype(np.int32)
+    vis = pose.kpt[:, :, 2] >= conf
+    a, b = xy[:, _EA], xy[:, _EB]
+    d = (a - b).astype(np.int64)
+    max_len2 = (max(W, H)*0.6) ** 2
+    ok = vis[:, _EA] & vis[:, _EB] & ((d * d).sum(axis=2) <= max_len2)
+    return np.concatenate([a, b], axis=2)[ok]
+
+class FrameResult:
+    """
+    워커 → ExercisePage 전달용 프레임 1장 분석 결과.
+      ok            : 사람 검출 여부 (meta["ok"])
+      label         : 평가기 선택 라벨 (없으면 "idle")
+      label_changed : 이번 프레임에서 평가기가 바뀌었는지
+      has_evaluator : 현재 라벨에 평가기가 있는지
+      res           : evaluator.update() 결과 (없으면 None)
+      stamps        : 프레임 단계별 시각 (core.latency)
+      t_emit        : 신호 보낸 시각 (lat_now, "paint" 측정용)
+      owner         : gpu 모드 — QImage가 참조하는 FrameBuffer (캔버스에 넘기거나 release())
+      lines         : gpu 모드 — 스켈레톤 선분 (M,4), 프레임 좌표
+      session       : 워커 세션 번호 (start() 마다 증가, 이전 세션 결과 무시용)
+    """
+    __slots__ = ("frame_id", "ok", "raw_label", "label", "label_changed", "has_evaluator", "res",
+                 "stamps", "t_emit", "owner", "lines", "session")
+
+    def __init__(self, frame_id: int = -1, ok: bool = False, raw_label=None, label: str = "idle",
+                 label_changed: bool = False, has_evaluator: bool = False,
+                 res: EvalResult | None = None, stamps=None):
+        self.frame_id = frame_id
+        self.ok = ok
+        self.raw_label = raw_label
+        self.label = label
+        self.label_changed = label_changed
+        self.has_evaluator = has_evaluator
+        self.res = res
+        self.stamps = stamps
+        self.t_emit = 0.0
+        self.owner = None
+        self.lines = None
+        self.session = 0
+
+    def release(self):
+        """캔버스에 넘기지 못한 프레임 버퍼 반환"""
+        fb, self.owner = self.owner, None
+        if fb is not None:
+            fb.release()
+
+class ExerciseFrameWorker(QThread):
+    """
+    ExercisePage 프레임 파이프라인 전용 스레드.
+      snapshot → 관절 각도/필터 → 평가기 update → 화면 크기로 미리 스케일 → 스켈레톤 그리기
+    결과는 최신 1장 슬롯에 두고 ready() 신호(queued)로 알린다. GUI 스레드는 take()로 가져가
+    표시와 위젯 갱신만 한다. 가져가기 전에 새 결과가 나오면 슬롯을 교체하고 신호는 다시 보내지
+    않는다 (GUI가 느려도 이벤트 큐에 프레임이 쌓이지 않음).
+    rep/점수가 있는 EvalResult는 교체로 잃지 않도록 별도 큐(events)로 전달한다.
+    새 프레임이 없으면 idle_emit_sec 마다 이미지 없이 결과만 보낸다 (사람 없음 타임아웃용).
+    gpu=True (GL 캔버스): 그리기/스케일을 생략하고 풀 버퍼를 그대로 감싼 QImage(owner 포함)와
+    스켈레톤 선분만 보낸다 — 스케일/선 그리기는 캔버스가 GPU에서 처리.
+    이때 페이지 쪽이 잡는 풀 버퍼는 슬롯의 1장 + 캔버스에 표시 중인 1장뿐이다
+    (슬롯이 교체되면 이전 버퍼는 바로 release → appsink 풀이 고갈되지 않음).
+    """
+    ready = Signal()
+
+    def __init__(self, parent=None, wait_sec: float = 0.05, idle_emit_sec: float = 0.1):
+        super().__init__(parent)
+        self.cam = None
+        self.wait_sec = float(wait_sec)
+        self.idle_emit_sec = float(idle_emit_sec)
+        self._stop = False
+        self._reset = True
+        self._view = (0, 0, True)               # (w, h, cover)
+        self.gpu = False
+        self._angle_filter = angle_filter(len(SMOOTH_KEYS))
+        self._evaluator: ExerciseEvaluator | None = None
+        self._eval_label: str | None = None
+        self._last_frame_id = -1
+        self.session = 0
+        self._lock = threading.Lock()
+        self._slot = None                       # (QImage, FrameResult) — GUI가 아직 가져가지 않은 최신 결과
+        self._events = deque(maxlen=64)         # (session, label, EvalResult) — rep/점수 이벤트
+        self._inflight = False                  # ready 신호를 보냈고 take() 전
+
+    # --- GUI 스레드에서 호출 ---
+    def set_view(self, w: int, h: int, fit_mode: str = "cover"):
+        """표시 영역 크기 (0이면 스케일 없이 원본 크기로 전달)"""
+        self._view = (max(0, int(w)), max(0, int(h)), str(fit_mode).lower() == "cover")
+
+    def reset(self):
+        """각도 필터/평가기 상태 초기화 요청 (다음 루프에서 워커 스레드가 처리)"""
+        self._reset = True
+
+    def stop(self, timeout_ms: int = 1000):
+        self._stop = True
+        if self.isRunning():
+            self.wait(timeout_ms)
+        self._drop_pending()
+
+    def start(self, *args, **kwargs):
+        self._drop_pending()
+        self.session += 1
+        self._stop = False
+        super().start(*args, **kwargs)
+
+    def take(self):
+        """ready 수신 시: (QImage, FrameResult, [(label, EvalResult), ...]) — 가져갈 결과가 없으면 r=None"""
+        with self._lock:
+            slot, self._slot = self._slot, None
+            events = [(lbl, res) for sid, lbl, res in self._events if sid == self.session]
+            self._events.clear()
+            self._inflight = False
+        if slot is None:
+            return QImage(), None, events
+        return slot[0], slot[1], events
+
+    def _drop_pending(self):
+        with self._lock:
+            slot, self._slot = self._slot, None
+            self._events.clear()
+            self._inflight = False
+        if slot is not None:
+            slot[1].release()
+
+    # --- 워커 스레드 ---
+    def run(self):
+        session = self.session
+        last_emit = 0.0
+        while not self._stop:
+            cam = self.cam
+            if cam is None:
+                self.msleep(int(self.wait_sec * 1000))
+                continue
+            if self._reset:
+                self._reset = False
+                self._angle_filter.reset()
+                if self._evaluator:
+                    self._evaluator.reset()
+                self._evaluator = None
+                self._eval_label = None
+                self._last_frame_id = -1
+
+            try:
+                snap = cam.snapshot(block=True, timeout=self.wait_sec)
+            except Exception:
+                self.msleep(int(self.wait_sec * 1000))
+                continue
+            fb, snap.frame = snap.frame, None
+            if fb is None or fb.frame_id == self._last_frame_id:
+                if fb is not None:
+                    fb.release()   # 새 프레임 없음 → 다시 그리지 않음
+                now = time.monotonic()
+                if now - last_emit >= self.idle_emit_sec:
+                    last_emit = now
+                    meta = snap.meta or {}
+                    r = FrameResult(ok=bool(meta.get("ok", False)), raw_label=meta.get("label"),
+                                    label=self._eval_label or "idle")
+                    self._publish(QImage(), r, session, idle=True)
+                continue
+
+            t_ui = lat_now()
+            self._last_frame_id = fb.frame_id
+            meta = snap.meta or {}
+            gpu = self.gpu
+            try:
+                if gpu:
+                    qimg, lines = self._wrap(fb.array, snap.pose, meta)
+                else:
+                    qimg = self._render(fb.array, snap.pose, meta)
+            except Exception as e:
+                # 스레드가 죽지 않도록 이 프레임만 건너뜀
+                print("[ExerciseFrameWorker] render error:", e)
+                fb.release()
+                continue
+            if not gpu:
+                fb.release()
+            r = self._evaluate(meta)
+            if gpu:
+                r.owner, r.lines = fb, lines
+            r.frame_id = self._last_frame_id
+            r.stamps = snap.stamps
+            LAT.since("ui", t_ui)
+            last_emit = time.monotonic()
+            r.t_emit = lat_now()
+            self._publish(qimg, r, session)
+
+    def _publish(self, qimg: QImage, r: FrameResult, session: int, idle: bool = False):
+        """최신 슬롯 교체 (+ rep/점수 이벤트 적재). GUI가 이전 신호를 처리한 뒤에만 ready 재전송"""
+        r.session = session
+        old = None
+        with self._lock:
+            if idle and self._slot is not None:
+                return                  # 아직 안 가져간 프레임이 있으면 idle 결과는 불필요
+            old = self._slot
+            if old is not None and old[1].label_changed:
+                r.label_changed = True  # 교체돼도 라벨 변경 알림은 유지
+            res = r.res
+            if res is not None and (res.rep_inc or res.score is not None):
+                self._events.append((session, r.label, res))
+            self._slot = (qimg, r)
+            emit = not self._inflight
+            self._inflight = True
+        if old is not None:
+            old[1].release()            # 표시되지 못한 프레임 버퍼 반환
+        if emit:
+            self.ready.emit()
+
+    def _render(self, bgr: np.ndarray, pose, meta: dict) -> QImage:
+        """
+        표시 크기로 스케일한 독립 QImage 위에 스켈레톤을 그린다.
+        풀 버퍼는 다른 소비자(녹화/얼굴 등)와 공유되므로 읽기 전용으로만 쓴다.
+        """
+        H, W = bgr.shape[:2]
+        lines = skeleton_lines(pose, W, H)
+        self._angles(pose, meta)
+        img = self._scale(bgr)
+        if len(lines):
+            s = img.width() / W          # 비율 유지 스케일 → x/y 같은 배율
+            p = QPainter(img)
+            p.setRenderHint(QPainter.Antialiasing, True)
+            p.setPen(QPen(QColor(*LINE_COLOR), max(1.0, 2.0 * s), Qt.SolidLine, Qt.RoundCap))
+            p.drawLines([QLineF(x1*s, y1*s, x2*s, y2*s) for x1, y1, x2, y2 in lines.tolist()])
+            p.end()
+        return img
+
+    def _angles(self, pose, meta: dict):
+        try:
+            if pose:
+                ti = pose.target
+                update_meta_with_angles(
+                    meta, pose.kxy(ti), pose.kcf(ti), conf_thr=0.5,
+                    raw=pose.angles(ti), filt=self._angle_filter,
+                )
+                meta["_kpt"] = pose.kpt[ti]
+        except Exception:
+            pass
+
+    def _wrap(self, bgr: np.ndarray, pose, meta: dict):
+        """gpu 모드: 풀 버퍼를 복사 없이 감싼 QImage + 스켈레톤 선분"""
+        H, W = bgr.shape[:2]
+        lines = skeleton_lines(pose, W, H)
+        self._angles(pose, meta)
+        return QImage(bgr.data, W, H, bgr.strides[0], QImage.Format_BGR888), lines
+
+    def _scale(self, bgr: np.ndarray) -> QImage:
+        """표시 크기(set_view)로 스케일한 RGB32 사본 (원본 버퍼는 건드리지 않음)"""
+        h, w, ch = bgr.shape
+        src = QImage(bgr.data, w, h, bgr.strides[0], QImage.Format_BGR888)
+        tw, th, cover = self._view
+        if tw <= 0 or th <= 0:
+            return src.convertToFormat(QImage.Format_RGB32)
+        aspect_flag = Qt.KeepAspectRatioByExpanding if cover else Qt.KeepAspectRatio
+        return src.scaled(tw, th, aspect_flag, Qt.SmoothTransformation).convertToFormat(QImage.Format_RGB32)
+
+    def _evaluate(self, meta: dict) -> FrameResult:
+        raw_label = meta.get("label", None)
+        label = raw_label if raw_label else "idle"
+        r = FrameResult(ok=bool(meta.get("ok", False)), raw_label=raw_label, label=label)
+        if self._eval_label != label:
+            self._eval_label = label
+            self._evaluator = get_evaluator_by_label(label) if label not in (None, "idle") else None
+            if self._evaluator:
+                self._evaluator.reset()
+            r.label_changed = True
+
+        r.has_evaluator = self._evaluator is not None
+        if label in (None, "idle") or not self._evaluator:
+            return r
+        try:
+            r.res = self._evaluator.update(meta)
+        except Exception:
+            r.res = None
+        return r
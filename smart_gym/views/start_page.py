@@ -371,6 +371,12 @@ class StartPage(PageBase):
     # ========= Lifecycle =========
     def on_enter(self, ctx):
         self.ctx = ctx
+        # 얼굴 스트림으로 카메라 전환 (공유 카메라면 포즈 분기만 닫힘)
+        try:
+            if getattr(self.ctx, "cam", None):
+                self.ctx.cam.yield_camera()
+        except Exception:
+            pass
         try:
             self.ctx.face.start_stream() 
         except Exception: